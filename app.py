@@ -8,7 +8,8 @@ This app starts the Food carbon and nutrition Dashboard w/ Streamlit.
 
 import streamlit as st  # pip install streamlit
 from apps import home, main
-from util import bg_image
+from util import bg_image, profiling
+from util.assets import ASSETS
 import config
 
 if __name__ == "__main__":
@@ -19,6 +20,7 @@ if __name__ == "__main__":
         layout="wide",
         initial_sidebar_state="collapsed",  # auto, expanded
     )
+    profiling.start_rerun()  # no-op unless PROFILING=1
 
     # ---- HIDE STREAMLIT STYLE ----
     hide_st_style = """
@@ -31,15 +33,21 @@ if __name__ == "__main__":
     st.markdown(hide_st_style, unsafe_allow_html=True)
 
     # Apply css style
-    with open(config.PATH_TO_CSS) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    st.markdown(ASSETS.style("style.css"), unsafe_allow_html=True)
 
     # Load background image
-    bg_image.set_png_as_page_bg(
-        f"{config.PATH_TO_IMAGES}/bg/background_opacity_100_new_bgcolor_shift.png"
-    )
+    bg_image.set_png_as_page_bg(config.PATH_TO_BACKGROUND)
 
     # Load homepage
     # home.navbar()
-    home.title()
-    main.main()
+    try:
+        home.title()
+        main.main()
+    finally:  # also log reruns interrupted by st.experimental_rerun/st.stop
+        summary = profiling.end_rerun(
+            st.session_state, user=st.session_state.get("username")
+        )
+
+    # Profiling panel (admin only)
+    if summary is not None and st.session_state.get("username") == "admin":
+        profiling.show_panel(summary)
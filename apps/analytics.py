@@ -7,30 +7,98 @@ from ast import parse
 from os import environ
 import pandas as pd
 import numpy as np
-from datetime import datetime
+import copy
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from time import sleep
+import threading
 import streamlit as st
 from util import plots
+from util.aggregator import PERIODS, PeriodAggregator
+from util.budgets import budgets_from_profile, calc_budget_adherence
+from util import profiling, utils
+from util.cache import MemoryBoundedCache
+from util.export import EXPORT_FORMATS, export_meal_logs, iter_firestore_meal_log_pages
+from util.forecast import CO2Forecast, CO2Forecaster
+from util.meal_logs import explode_meal_logs, rank_dish_contributions
 from util.utils import DBTools, Firebase
+import config
+
+
+METRIC_COLUMNS = ["CO2e", "Calories", "Carbs", "Protein", "Fat"]
+
+
+@dataclass(frozen=True)
+class AnalyticsSummary:
+    """Carbon and nutrition totals of a user's meal log.
+
+    Attributes:
+        daily (pd.DataFrame): Totals of METRIC_COLUMNS per day, indexed by day.
+        today (pd.Series): Totals of METRIC_COLUMNS today.
+        this_month (pd.Series): Totals of METRIC_COLUMNS this month.
+        total (pd.Series): Totals of METRIC_COLUMNS over the whole meal log.
+        n_days (int): Number of days with at least one meal log.
+    """
+
+    daily: pd.DataFrame
+    today: pd.Series
+    this_month: pd.Series
+    total: pd.Series
+    n_days: int
+
+    @property
+    def CO2_daily_average(self):
+        if self.n_days == 0:
+            return 0.0
+        return self.total["CO2e"] / self.n_days
+
+    @property
+    def nTrees(self):
+        """
+        Number of trees needed to offset the user's CO2 emissions in 1 year.
+        Assume 24 kgCO2 / tree / year. Source: https://www.encon.be/en/calculation-co2-offsetting-trees
+        """
+        return self.CO2_daily_average / (24 / 365)
+
+
+def summarise_meal_log(df_user, now=None):
+    """Summarise a meal log with a single groupby over the day of each meal.
+
+    Args:
+        df_user (pd.DataFrame): User's meal log dataframe.
+        now (datetime, optional): Reference time for "today" and "this month". Defaults to now.
+
+    Returns:
+        (AnalyticsSummary): Daily, today, this month and total figures.
+    """
+    today = pd.Timestamp(now or datetime.now()).normalize()
+    day = df_user["Datetime"].dt.normalize()
+    daily = df_user[METRIC_COLUMNS].groupby(day).sum()
+    daily.index.name = "Day"
+
+    if today in daily.index:
+        totals_today = daily.loc[today]
+    else:
+        totals_today = pd.Series(0.0, index=METRIC_COLUMNS)
+    this_month = daily[
+        (daily.index.year == today.year) & (daily.index.month == today.month)
+    ].sum()
+
+    return AnalyticsSummary(
+        daily=daily,
+        today=totals_today,
+        this_month=this_month,
+        total=daily.sum(),
+        n_days=len(daily),
+    )
 
 
 def calc_CO2_today(df_user):
-    current_day = datetime.now().day
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    CO2_today = df_user.query(
-        "Datetime.dt.day == @current_day & Datetime.dt.month == @current_month & Datetime.dt.year == @current_year"
-    )["CO2e"].sum()
-    return CO2_today
+    return summarise_meal_log(df_user).today["CO2e"]
 
 
 def calc_CO2_this_month(df_user):
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    CO2_this_month = df_user.query(
-        "Datetime.dt.month == @current_month & Datetime.dt.year == @current_year"
-    )["CO2e"].sum()
-    return CO2_this_month
+    return summarise_meal_log(df_user).this_month["CO2e"]
 
 
 def calc_CO2_total(df_user):
@@ -38,10 +106,7 @@ def calc_CO2_total(df_user):
 
 
 def calc_CO2_daily_average(df_user):
-    CO2_total = calc_CO2_total(df_user)
-    nDays = len(df_user.Datetime.dt.date.unique())
-    CO2_daily_average = CO2_total / nDays
-    return CO2_daily_average
+    return summarise_meal_log(df_user).CO2_daily_average
 
 
 def calc_nTrees_offset_CO2(df_user):
@@ -49,56 +114,260 @@ def calc_nTrees_offset_CO2(df_user):
     Calculate the number of trees needed to offset the user's CO2 emissions in 1 year.
     Assume 24 kgCO2 / tree / year. Source: https://www.encon.be/en/calculation-co2-offsetting-trees
     """
-    CO2_daily_average = calc_CO2_daily_average(df_user)
-    nTrees = CO2_daily_average / (24 / 365)
-    return nTrees
+    return summarise_meal_log(df_user).nTrees
 
 
 def calc_calories_today(df_user):
-    current_day = datetime.now().day
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    calories_today = df_user.query(
-        "Datetime.dt.day == @current_day & Datetime.dt.month == @current_month & Datetime.dt.year == @current_year"
-    )["Calories"].sum()
-    return calories_today
+    return summarise_meal_log(df_user).today["Calories"]
 
 
 def calc_carbs_today(df_user):
-    current_day = datetime.now().day
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    carbs_today = df_user.query(
-        "Datetime.dt.day == @current_day & Datetime.dt.month == @current_month & Datetime.dt.year == @current_year"
-    )["Carbs"].sum()
-    return carbs_today
+    return summarise_meal_log(df_user).today["Carbs"]
 
 
 def calc_fat_today(df_user):
-    current_day = datetime.now().day
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    fat_today = df_user.query(
-        "Datetime.dt.day == @current_day & Datetime.dt.month == @current_month & Datetime.dt.year == @current_year"
-    )["Fat"].sum()
-    return fat_today
+    return summarise_meal_log(df_user).today["Fat"]
 
 
 def calc_protein_today(df_user):
-    current_day = datetime.now().day
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    protein_today = df_user.query(
-        "Datetime.dt.day == @current_day & Datetime.dt.month == @current_month & Datetime.dt.year == @current_year"
-    )["Protein"].sum()
-    return protein_today
+    return summarise_meal_log(df_user).today["Protein"]
+
+
+def meal_log_datetimes(df_meal_log):
+    """Meal log datetimes from the integer `Epoch` field.
 
+    Only logs saved before the `Epoch` field existed fall back to parsing the `Datetime` string.
 
-def environment_analytics(df_user):
-    CO2_today = calc_CO2_today(df_user)
-    CO2_this_month = calc_CO2_this_month(df_user)
-    CO2_total = calc_CO2_total(df_user)
-    nTrees = calc_nTrees_offset_CO2(df_user)
+    Args:
+        df_meal_log (pd.DataFrame): User's meal log dataframe.
+
+    Returns:
+        (pd.Series): Datetime of each meal log.
+    """
+    if "Epoch" not in df_meal_log:
+        return pd.to_datetime(df_meal_log["Datetime"])
+    datetimes = pd.to_datetime(df_meal_log["Epoch"], unit="s")
+    missing = df_meal_log["Epoch"].isna()
+    if missing.any():
+        datetimes[missing] = pd.to_datetime(df_meal_log.loc[missing, "Datetime"])
+    return datetimes
+
+
+@dataclass(frozen=True)
+class AnalyticsResults:
+    """Everything the Analytics page renders for one version of a user's meal log.
+
+    Attributes:
+        df_meal_log (pd.DataFrame): Meal log columns shown in the table.
+        summary (AnalyticsSummary): Today, this month and total figures.
+        figures (dict): Plotly figures by name.
+        budget_adherence (dict): BudgetAdherence of each budgeted metric.
+        forecast (CO2Forecast): Projected month-end and year-end CO2e.
+    """
+
+    df_meal_log: pd.DataFrame
+    summary: AnalyticsSummary
+    figures: dict
+    budget_adherence: dict
+    forecast: CO2Forecast
+
+
+# Shared by all sessions, keyed by (user localId, newest log datetime, log count, today)
+ANALYTICS_CACHE = MemoryBoundedCache(max_bytes=config.ANALYTICS_CACHE_MAX_BYTES)
+
+
+# CO2e forecaster of each user, keyed by user localId
+FORECASTERS = MemoryBoundedCache(max_bytes=config.ANALYTICS_CACHE_MAX_BYTES // 16)
+
+
+def meal_log_version(doc_dict):
+    """Cheap version key of a meal log: (newest log datetime, log count).
+
+    Args:
+        doc_dict (list): Meal log documents as dicts.
+
+    Returns:
+        (tuple): newest Datetime string, number of logs.
+    """
+    newest = max(doc["Datetime"] for doc in doc_dict)
+    return newest, len(doc_dict)
+
+
+@profiling.timed("analytics.build_analytics")
+def build_analytics(df_meal_log, budgets=None, forecaster=None):
+    """Compute the summary and figures of the Analytics page.
+
+    Args:
+        df_meal_log (pd.DataFrame): User's meal log dataframe with parsed Datetime.
+        budgets (dict, optional): Daily budget of each metric, e.g. {"CO2e": 2.72}.
+        forecaster (CO2Forecaster, optional): Forecaster fitted on an earlier version of
+            this meal log, updated in place. Defaults to fitting a new one.
+
+    Returns:
+        (AnalyticsResults): Table, summary and figures to render.
+    """
+    summary = summarise_meal_log(df_meal_log)
+
+    # Month-end and year-end projections
+    now = datetime.now()
+    today = pd.Timestamp(now).normalize()
+    if forecaster is None:
+        forecaster = CO2Forecaster()
+    forecaster.update(summary.daily["CO2e"], today)
+    forecast = forecaster.forecast(summary.daily["CO2e"], today)
+
+    # Which dishes drove the CO2e this month
+    df_dishes = explode_meal_logs(df_meal_log, utils.get_menu_catalog())
+    this_month = (df_dishes["Datetime"].dt.year == now.year) & (
+        df_dishes["Datetime"].dt.month == now.month
+    )
+    df_rank = rank_dish_contributions(df_dishes[this_month], metric="CO2e")
+
+    figures = {
+        "CO2e": plots.plot_user_CO2e(df_meal_log),
+        "Calories": plots.plot_user_calories(df_meal_log),
+        "Macros": plots.plot_user_macros(df_meal_log),
+        "MacroSplit": plots.plot_user_macro_split(df_meal_log),
+        "DishContributions": plots.bar_chart_dish_contributions(
+            df_rank, title="Dishes that drove your CO2e this month (kgCO2e)"
+        ),
+    }
+    df_table = df_meal_log[
+        [
+            "Datetime",
+            "DishTypes",
+            "DishNames",
+            "Amount",
+            "CO2e",
+            "Calories",
+            "Carbs",
+            "Protein",
+            "Fat",
+        ]
+    ]
+    return AnalyticsResults(
+        df_meal_log=df_table,
+        summary=summary,
+        figures=figures,
+        budget_adherence=calc_budget_adherence(summary.daily, budgets or {}),
+        forecast=forecast,
+    )
+
+
+def get_analytics(user_localid, doc_dict, budgets=None):
+    """Analytics results of a user, only recomputed when the meal log or budgets change.
+
+    Args:
+        user_localid (str): user localId (created by Firebase create_user).
+        doc_dict (list): Meal log documents as dicts.
+        budgets (dict, optional): Daily budget of each metric, e.g. {"CO2e": 2.72}.
+
+    Returns:
+        (AnalyticsResults): Table, summary and figures to render.
+    """
+
+    def compute():
+        df_meal_log = pd.DataFrame.from_dict(doc_dict)
+        df_meal_log["Datetime"] = meal_log_datetimes(df_meal_log)
+        # Continue from the previous fit, so only the newly completed days are fed to it
+        forecaster = copy.deepcopy(FORECASTERS.get(user_localid)) or CO2Forecaster()
+        results = build_analytics(df_meal_log, budgets, forecaster)
+        FORECASTERS.set(user_localid, forecaster)
+        return results
+
+    # "today" and "this month" move on at midnight even if the log doesn't change
+    key = (
+        user_localid,
+        *meal_log_version(doc_dict),
+        datetime.now().date(),
+        tuple(sorted((budgets or {}).items())),
+    )
+    return ANALYTICS_CACHE.get_or_compute(key, compute)
+
+
+# (PeriodAggregator, logs it holds, meal log version) of each user, keyed by (user localId, period)
+PERIOD_AGGREGATORS = MemoryBoundedCache(max_bytes=config.ANALYTICS_CACHE_MAX_BYTES // 4)
+_period_aggregators_lock = threading.Lock()
+
+
+def meal_log_datetime(doc):
+    """Datetime of a single meal log document."""
+    if doc.get("Epoch") is not None:
+        # Epoch counts wall-clock time as if it were UTC
+        return datetime.fromtimestamp(doc["Epoch"], timezone.utc).replace(tzinfo=None)
+    return datetime.strptime(doc["Datetime"], "%Y-%m-%d %H:%M:%S")
+
+
+def get_period_totals(user_localid, doc_dict, period):
+    """Totals per day, week or month of a user's meal log.
+
+    The first call fills a PeriodAggregator from the whole log. Later calls return
+    it as is while the meal log version is unchanged, and otherwise only add the
+    new logs and remove the deleted ones, touching just their buckets.
+
+    Args:
+        user_localid (str): user localId (created by Firebase create_user).
+        doc_dict (list): Meal log documents as dicts.
+        period (str): One of aggregator.PERIODS.
+
+    Returns:
+        (pd.DataFrame): One row per period with the METRIC_COLUMNS totals and a "Meals" count.
+    """
+    version = meal_log_version(doc_dict)
+    with _period_aggregators_lock:
+        state = PERIOD_AGGREGATORS.get((user_localid, period))
+        if state is not None and state[2] == version:
+            return state[0].to_frame()  # no log added or deleted: nothing to diff or resize
+        logs = {doc["Datetime"]: doc for doc in doc_dict}
+        if state is None:
+            df_meal_log = pd.DataFrame.from_dict(doc_dict)
+            df_meal_log["Datetime"] = meal_log_datetimes(df_meal_log)
+            aggregator = PeriodAggregator.from_frame(df_meal_log, period, METRIC_COLUMNS)
+            seen = {
+                key: (meal_log_datetime(doc), [doc[c] for c in METRIC_COLUMNS])
+                for key, doc in logs.items()
+            }
+        else:
+            aggregator, seen, _ = state
+            for key in seen.keys() - logs.keys():  # deleted logs
+                aggregator.remove(*seen.pop(key))
+            for key in logs.keys() - seen.keys():  # new logs
+                doc = logs[key]
+                seen[key] = (meal_log_datetime(doc), [doc[c] for c in METRIC_COLUMNS])
+                aggregator.add(*seen[key])
+        PERIOD_AGGREGATORS.set((user_localid, period), (aggregator, seen, version))
+        return aggregator.to_frame()
+
+
+def get_period_figures(user_localid, doc_dict, period):
+    """Per-period CO2e and calories charts, only rebuilt when the meal log changes.
+
+    Args:
+        user_localid (str): user localId (created by Firebase create_user).
+        doc_dict (list): Meal log documents as dicts.
+        period (str): One of aggregator.PERIODS.
+
+    Returns:
+        (dict): Plotly figures by metric name.
+    """
+
+    def compute():
+        df_period = get_period_totals(user_localid, doc_dict, period)
+        return {
+            "CO2e": plots.plot_user_period_totals(df_period, "CO2e", period),
+            "Calories": plots.plot_user_period_totals(df_period, "Calories", period),
+        }
+
+    key = (user_localid, *meal_log_version(doc_dict), datetime.now().date(), period)
+    return ANALYTICS_CACHE.get_or_compute(key, compute)
+
+
+def environment_analytics(results, period_figures):
+    summary = results.summary
+    CO2_today = summary.today["CO2e"]
+    CO2_this_month = summary.this_month["CO2e"]
+    CO2_total = summary.total["CO2e"]
+    nTrees = summary.nTrees
 
     st.subheader("Your Carbon footprint :factory:")
     col1, col2, col3 = st.columns(3)
@@ -112,15 +381,20 @@ def environment_analytics(df_user):
     st.caption(
         f"You need {int(np.ceil(nTrees))} :deciduous_tree: to offset your food carbon emissions this year!"
     )
-    fig_user_CO2e = plots.plot_user_CO2e(df_user)
-    st.plotly_chart(fig_user_CO2e, use_container_width=True)
+    col1, col2, _ = st.columns(3)
+    col1.metric("Projected this month: ", f"{results.forecast.month_end:.1f} kgCO2e", "")
+    col2.metric("Projected this year: ", f"{results.forecast.year_end:.1f} kgCO2e", "")
+    st.plotly_chart(results.figures["CO2e"], use_container_width=True)
+    st.plotly_chart(period_figures["CO2e"], use_container_width=True)
+    st.plotly_chart(results.figures["DishContributions"], use_container_width=True)
 
 
-def nutrition_analytics(df_user):
-    calories_today = calc_calories_today(df_user)
-    carbs_today = calc_carbs_today(df_user)
-    fat_today = calc_fat_today(df_user)
-    protein_today = calc_protein_today(df_user)
+def nutrition_analytics(results, period_figures):
+    summary = results.summary
+    calories_today = summary.today["Calories"]
+    carbs_today = summary.today["Carbs"]
+    fat_today = summary.today["Fat"]
+    protein_today = summary.today["Protein"]
 
     # Nutrition analytics today
     st.subheader("Your Nutrition Today :muscle:")
@@ -135,23 +409,78 @@ def nutrition_analytics(df_user):
         col4.metric("Fat: ", f"{fat_today:.1f} g", "")
 
     col1, col2 = st.columns(2)
-    fig_user_calories = plots.plot_user_calories(df_user)
-    col1.plotly_chart(fig_user_calories, use_container_width=True)
-    fig_user_macros = plots.plot_user_macros(df_user)
-    col2.plotly_chart(fig_user_macros, use_container_width=True)
+    col1.plotly_chart(results.figures["Calories"], use_container_width=True)
+    col2.plotly_chart(results.figures["Macros"], use_container_width=True)
+    st.plotly_chart(period_figures["Calories"], use_container_width=True)
 
     # average macro split
-    fig_user_macro_split = plots.plot_user_macro_split(df_user)
     st.subheader("Your Macro Split (average)")
-    st.plotly_chart(fig_user_macro_split, use_container_width=True)
+    st.plotly_chart(results.figures["MacroSplit"], use_container_width=True)
+
+
+def budget_analytics(results):
+    if not results.budget_adherence:
+        st.info("Set your daily budgets in your Profile to track them here.")
+        return
+
+    st.subheader("Your Budgets :dart:")
+    CO2 = results.budget_adherence.get("CO2e")
+    if CO2 is not None:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Days under CO2e budget: ", f"{CO2.days_under}", "")
+        col2.metric("Current streak: ", f"{CO2.current_streak} days", "")
+        col3.metric("Longest streak: ", f"{CO2.longest_streak} days", "")
+        col4.metric("Average overshoot: ", f"{CO2.average_overshoot:.1f} kgCO2e", "")
+
+    df_adherence = pd.DataFrame.from_dict(
+        {metric: vars(adherence) for metric, adherence in results.budget_adherence.items()},
+        orient="index",
+    )
+    df_adherence.columns = [
+        "Budget",
+        "Days under",
+        "Days over",
+        "Current streak",
+        "Longest streak",
+        "Average overshoot",
+    ]
+    st.dataframe(df_adherence)
+
+
+def export_meal_log_form(pages_factory, file_stem, key):
+    """Export meal logs page by page and offer the file for download.
+
+    Args:
+        pages_factory (callable): Returns an iterable of pages of meal logs (see util.export).
+        file_stem (str): File name without extension.
+        key (str): Unique widget key prefix.
+    """
+    st.caption(f"Exports are limited to {config.EXPORT_MAX_ROWS:,} meal logs.")
+    col1, col2 = st.columns(2)
+    file_format = col1.radio("Format", list(EXPORT_FORMATS), key=f"{key}_format")
+    if col2.button("Prepare export", key=f"{key}_prepare"):
+        with st.spinner("Exporting meal logs..."):
+            try:
+                data, n_rows = export_meal_logs(pages_factory(), file_format)
+            except ValueError as e:
+                col2.error(e)
+                return
+        extension, mime = EXPORT_FORMATS[file_format]
+        col2.download_button(
+            f"Download {n_rows} meal logs",
+            data,
+            file_name=f"{file_stem}.{extension}",
+            mime=mime,
+            key=f"{key}_download",
+        )
 
 
 def delete_user_meal_log_form():
     delete_user_meal_log_form = st.form("delete_user_meal_log")
     delete_user_meal_log_form.subheader("Delete Meal Log")
     Datetime = delete_user_meal_log_form.text_input("Datetime", key="Datetime_key")
-    Datetime_str = str(pd.to_datetime(Datetime))  # convert to datetime string
     if delete_user_meal_log_form.form_submit_button("Delete"):
+        Datetime_str = str(pd.to_datetime(Datetime))  # convert to datetime string
         ### Local: Delete usersmeallogs in sqlite3 database ###
         # result = DBTools.delete_user_meal_log(st.session_state.username, datetime=Datetime_str)
         
@@ -173,22 +502,36 @@ def delete_user_meal_log_form():
         st.experimental_rerun()
 
 
-def main():
+def main(user_profile=None):
+    """Analytics page of the logged in user.
+
+    Args:
+        user_profile (dict, optional): User profile from firestore `userstable`, as already
+            read by the calling page in this rerun. Defaults to reading it again.
+    """
     ### Local: Check for exisiting usersmeallogs info in sqlite3 database ###
     # user_meal_log = DBTools.view_usermeallog(st.session_state.username)
 
     # if user_meal_log: # found meal log for user
-    #     df_meal_log = pd.DataFrame(user_meal_log, columns=["Username", "Datetime", "DishTypes", "DishNames", "Amount", "CO2e", "Calories", "Carbs", "Protein", "Fat"])
-    #     df_meal_log['Datetime'] = pd.to_datetime(df_meal_log['Datetime'])
+    #     df_meal_log = pd.DataFrame(user_meal_log, columns=["Username", "Datetime", "DishTypes", "DishNames", "Amount", "CO2e", "Calories", "Carbs", "Protein", "Fat", "Epoch", "DayNum"])
+    #     df_meal_log['Datetime'] = pd.to_datetime(df_meal_log['Epoch'], unit="s")
+    #     # Numeric columns only (index-only scan): DBTools.view_usermeallog_range(st.session_state.username)
+
+    #     results = build_analytics(df_meal_log)
+
+    #     period_figures = {
+    #         "CO2e": plots.plot_user_period_totals(results.summary.daily, "CO2e", "day"),
+    #         "Calories": plots.plot_user_period_totals(results.summary.daily, "Calories", "day"),
+    #     }
 
     #     # Environment
-    #     environment_analytics(df_meal_log)
+    #     environment_analytics(results, period_figures)
 
     #     # Nutrition
-    #     nutrition_analytics(df_meal_log)
+    #     nutrition_analytics(results, period_figures)
 
     #     # view full meal log
-    #     st.dataframe(df_meal_log)
+    #     st.dataframe(results.df_meal_log)
 
     #     # delete a meal log
     #     delete_user_meal_log_form()
@@ -204,35 +547,41 @@ def main():
         .collection("meallogs")
     )
     doc_dict = []
-    for doc in mealogs_ref.stream():
-        doc_dict.append(doc.to_dict())
-
-    if doc_dict is not None:
-        df_meal_log = pd.DataFrame.from_dict(doc_dict)
-        df_meal_log["Datetime"] = pd.to_datetime(df_meal_log["Datetime"])
+    with profiling.timer("firestore.stream_meal_logs"):
+        for doc in mealogs_ref.stream():
+            doc_dict.append(doc.to_dict())
+
+    if doc_dict:
+        user_localid = st.session_state["firebase_user"]["localId"]
+        if user_profile is None:
+            user_profile = firebase.check_user(user_localid)
+        budgets = budgets_from_profile(user_profile)
+        results = get_analytics(user_localid, doc_dict, budgets)
+        period = st.selectbox(
+            "Show totals per", PERIODS, index=0, format_func=str.title
+        )
+        period_figures = get_period_figures(user_localid, doc_dict, period)
 
         # Environment
-        environment_analytics(df_meal_log)
+        environment_analytics(results, period_figures)
 
         # Nutrition
-        nutrition_analytics(df_meal_log)
+        nutrition_analytics(results, period_figures)
+
+        # Budgets
+        budget_analytics(results)
 
         # view full meal log
-        st.dataframe(
-            df_meal_log.drop(columns=["email", "localID"])[
-                [
-                    "Datetime",
-                    "DishTypes",
-                    "DishNames",
-                    "Amount",
-                    "CO2e",
-                    "Calories",
-                    "Carbs",
-                    "Protein",
-                    "Fat",
-                ]
-            ]
+        st.dataframe(results.df_meal_log)
+
+        # export meal log
+        st.subheader("Export Meal Log")
+        export_meal_log_form(
+            lambda: iter_firestore_meal_log_pages(firebase_db, user_localid),
+            file_stem="meal_log",
+            key="export_meal_log",
         )
+        # Local: lambda: iter_sqlite_meal_log_pages(DBTools.conn, st.session_state.username)
 
         # delete a meal log
         delete_user_meal_log_form()
@@ -8,10 +8,16 @@ import pandas as pd
 import os
 from datetime import datetime
 import streamlit as st  # pip install streamlit
-from util import utils, plots  # utility functions for graphics
+from util import utils, plots, profiling  # utility functions for graphics
+from util.assets import ASSETS  # static CSS/HTML
+from util.rdi import load_rdi  # recommended daily intake
 from util.utils import DBTools, Firebase  # database management
 import config
 
+# Session state of the meal being designed: catalog row of each dish and its amount
+DISH_IDS_DTYPE = np.int32
+DISH_GRAMS_DTYPE = np.int16  # slider amounts are 0-250 g
+
 
 class MealDesign:
     """A meal design class to select different dishes and set amounts."""
@@ -26,10 +32,7 @@ class MealDesign:
             Dishes dataframe.
         """
         self.username = username
-        self.df = utils.get_data_from_json("data/menu_edr_dishes_only.json")
-        self.df["MenuItemName"] = self.df["MenuItemName"].apply(
-            lambda x: x.lower()
-        )  # Convert menu item names to lower case
+        self.df = utils.get_menu_catalog()  # menu item names in lower case
 
     def select_dishes(self, form_name, location="main"):
         """Select your dishes.
@@ -52,8 +55,9 @@ class MealDesign:
         if self.location not in ["main", "sidebar"]:
             raise ValueError("Location must be one of 'main' or 'sidebar'")
 
-        if "df_selection" not in st.session_state:
-            st.session_state["df_selection"] = []
+        if "dish_ids" not in st.session_state:
+            st.session_state["dish_ids"] = np.empty(0, dtype=DISH_IDS_DTYPE)
+            st.session_state["dish_grams"] = np.empty(0, dtype=DISH_GRAMS_DTYPE)
         if "multi_dish_select" not in st.session_state:
             st.session_state["multi_dish_select"] = True
         if "new_meal" not in st.session_state or st.session_state["new_meal"] == True:
@@ -63,8 +67,7 @@ class MealDesign:
             meal_placeholder = st.empty()
             meal_form = meal_placeholder.container()
         elif self.location == "sidebar":
-            with open(config.PATH_TO_CSS) as f:
-                st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+            st.markdown(ASSETS.style("style.css"), unsafe_allow_html=True)
             meal_placeholder = st.sidebar.empty()
             meal_form = meal_placeholder.container()
 
@@ -119,18 +122,20 @@ class MealDesign:
         )
 
         # Choose custom amount (g) for each dish
+        dish_ids = []
         custom_amount_in_grams = []
         for item in menu_item_name:
+            with profiling.timer("pandas.query"):
+                df_item = self.df.query("MenuItemName == @item")
+            dish_ids.append(self.df.index.get_loc(df_item.index[0]))
 
             amount_in_grams_total = np.nansum(
-                np.array(
-                    np.nansum(self.df.query("MenuItemName == @item")["AmountInGrams"])
-                )
+                np.array(np.nansum(df_item["AmountInGrams"]))
             )
 
             try:  # extract the number of servings the recipe was designed for
                 nServings = int(
-                    self.df.query("MenuItemName == @item")["AmountServings"]
+                    df_item["AmountServings"]
                     .values[0]
                     .split("/")[1]
                     .split()[0]
@@ -147,17 +152,15 @@ class MealDesign:
             )  # Default amount is serving size
             custom_amount_in_grams.append(amount)
 
-        df_selection = self.df.query("MenuItemName == @menu_item_name").copy()
-        df_selection["CustomAmountInGrams"] = custom_amount_in_grams
-
         if meal_form.button("Submit"):
-            st.session_state["df_selection"] = df_selection
-            st.session_state["custom_amount_in_grams"] = custom_amount_in_grams
-            st.session_state["menu_item_name"] = menu_item_name
-            st.session_state["meal_placeholder"] = meal_placeholder
+            # Only the catalog rows and amounts are kept, the dishes are looked up on demand
+            st.session_state["dish_ids"] = np.array(dish_ids, dtype=DISH_IDS_DTYPE)
+            st.session_state["dish_grams"] = np.array(
+                custom_amount_in_grams, dtype=DISH_GRAMS_DTYPE
+            )
             st.session_state["save"] = False
 
-        if len(st.session_state["df_selection"]) > 0:
+        if len(st.session_state["dish_ids"]) > 0:
             # Save button
             if st.session_state["multi_dish_select"]:
                 st.session_state["save"] = st.sidebar.button("Save")
@@ -175,14 +178,34 @@ class MealDesign:
                 st.session_state["menu_item_asian_key"] = []
                 st.session_state["menu_item_international_key"] = []
                 st.session_state["menu_item_dessert_key"] = []
-                st.session_state["menu_item_name"] = []
                 st.session_state["new_meal"] = True
-                st.session_state["df_selection"] = []
+                st.session_state["dish_ids"] = np.empty(0, dtype=DISH_IDS_DTYPE)
+                st.session_state["dish_grams"] = np.empty(0, dtype=DISH_GRAMS_DTYPE)
                 st.session_state["multi_dish_select"] = True
-                st.session_state["meal_placeholder"].empty()
+                meal_placeholder.empty()
                 st.experimental_rerun()
 
-        return st.session_state["df_selection"]
+        return selected_dishes(self.df)
+
+
+def selected_dishes(df_catalog=None):
+    """Dishes of the meal in session state, looked up in the shared menu catalog.
+
+    Session state only holds the catalog row of each dish ("dish_ids") and its
+    amount ("dish_grams"), so the rows are built on demand, once per rerun.
+
+    Args:
+        df_catalog (pd.DataFrame, optional): Menu catalog. Defaults to utils.get_menu_catalog().
+
+    Returns:
+        (pd.DataFrame): Catalog rows of the dishes, in the order they were selected,
+            with their CustomAmountInGrams.
+    """
+    if df_catalog is None:
+        df_catalog = utils.get_menu_catalog()
+    dish_ids = st.session_state.get("dish_ids", [])
+    dish_grams = st.session_state.get("dish_grams", [])
+    return df_catalog.iloc[dish_ids].assign(CustomAmountInGrams=dish_grams)
 
 
 def get_carbon_footprint_for_dish_ingredients(df_selection):
@@ -201,7 +224,7 @@ def get_carbon_footprint_for_dish_ingredients(df_selection):
             df_selection["RawIngredientsChinese"].values[0],
         )
     )
-    values = df_selection["CarbonFootprint"].values[0]
+    values = df_selection["CarbonFootprintIngredients"].values[0]
     descending_ix = np.array(values).argsort()[
         ::-1
     ]  # sort values from largest to smallest
@@ -294,6 +317,54 @@ def get_nutrition_label_for_dishes_per_custom_amount(df_selection):
     return calories, carb, fat, protein
 
 
+# Nutrients of the donut charts: label, unit and color
+NUTRIENTS = [
+    ("Energy", "kcal", "lightsalmon"),
+    ("Carbs", "g", "lightblue"),
+    ("Fat", "g", "crimson"),
+    ("Protein", "g", "green"),
+]
+
+
+def nutrition_charts(values, budgets, per):
+    """Display the nutrient metrics and their donut charts against the daily budgets.
+
+    Args:
+        values (tuple): Calories, carbs, fat and protein of the dish or meal.
+        budgets (tuple): RDI or user budget of each nutrient, in the same order.
+        per (str): Quantity the values are for, e.g. "100g" or "serving".
+    """
+    labels = [label for label, _, _ in NUTRIENTS]
+    colors = [color for _, _, color in NUTRIENTS]
+    if config.NUTRITION_COMBINED_CHART:
+        # one figure: a single payload and browser mount for the four donuts
+        cols = st.columns(len(NUTRIENTS))
+        for col, (label, unit, _), value in zip(cols, NUTRIENTS, values):
+            col.metric(label, f"{value:.1f} {unit}", "")
+        st.plotly_chart(
+            plots.donut_chart_nutrition_combined(
+                values, budgets, labels, per=per, marker_colors=colors
+            ),
+            use_container_width=True,
+        )
+        return
+
+    for row in range(0, len(NUTRIENTS), 2):
+        cols = st.columns(2)
+        for col, (label, unit, color), value, budget in zip(
+            cols, NUTRIENTS[row : row + 2], values[row : row + 2], budgets[row : row + 2]
+        ):
+            col.metric(label, f"{value:.1f} {unit}", "")
+            fig_nutrient = plots.donut_chart_nutrition(
+                nutrient_value=value,
+                rdi_value=budget,
+                nutrient_label=label,
+                per=per,
+                marker_colors=[color, "lightgray"],
+            )
+            col.plotly_chart(fig_nutrient, use_container_width=True)
+
+
 def meal_analysis(df_selection):
     """Displaying information of selected dish
 
@@ -357,53 +428,11 @@ def meal_analysis(df_selection):
         calories, carb, fat, protein = get_nutrition_label_for_dish_per_100g(
             df_selection
         )
-        df_rdi = pd.read_csv(config.PATH_TO_NUTRITION_RDI)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            col1.metric("Energy", f"{calories:.1f} kcal", "")
-            fig_calories_per_100g = plots.donut_chart_nutrition(
-                nutrient_value=calories,
-                rdi_value=df_rdi["Energ_Kcal"].values[0],
-                nutrient_label="Energy",
-                per="100g",
-                marker_colors=["lightsalmon", "lightgray"],
-            )
-            col1.plotly_chart(fig_calories_per_100g, use_container_width=True)
-
-        with col2:
-            col2.metric("Carbs", f"{carb:.1f} g", "")
-            fig_carb_per_100g = plots.donut_chart_nutrition(
-                nutrient_value=carb,
-                rdi_value=df_rdi["Carbohydrt_(g)"].values[0],
-                nutrient_label="Carbs",
-                per="100g",
-                marker_colors=["lightblue", "lightgray"],
-            )
-            col2.plotly_chart(fig_carb_per_100g, use_container_width=True)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            col1.metric("Fat", f"{fat:.1f} g", "")
-            fig_fat_per_100g = plots.donut_chart_nutrition(
-                nutrient_value=fat,
-                rdi_value=df_rdi["Lipid_Tot_(g)"].values[0],
-                nutrient_label="Fat",
-                per="100g",
-                marker_colors=["crimson", "lightgray"],
-            )
-            col1.plotly_chart(fig_fat_per_100g, use_container_width=True)
-
-        with col2:
-            col2.metric("Protein", f"{protein:.1f} g", "")
-            fig_protein_per_100g = plots.donut_chart_nutrition(
-                nutrient_value=protein,
-                rdi_value=df_rdi["Protein_(g)"].values[0],
-                nutrient_label="Protein",
-                per="100g",
-                marker_colors=["green", "lightgray"],
-            )
-            col2.plotly_chart(fig_protein_per_100g, use_container_width=True)
+        nutrition_charts(
+            values=(calories, carb, fat, protein),
+            budgets=tuple(load_rdi().vector()),  # same order as the values
+            per="100g",
+        )
 
     else:  # multi-dish
         # Display user chosen menu
@@ -413,10 +442,12 @@ def meal_analysis(df_selection):
         )
 
         user_selections = ""
-        for i in range(len(st.session_state["menu_item_name"])):
+        for i, (dish_name, amount) in enumerate(
+            zip(df_selection["MenuItemName"], df_selection["CustomAmountInGrams"])
+        ):
             user_selections += f"""<div class='notice notice-success'> 
-                                        <strong>{str(i+1)}. {st.session_state['menu_item_name'][i]}</strong> 
-                                        ({str(st.session_state['custom_amount_in_grams'][i])}g) 
+                                        <strong>{str(i+1)}. {dish_name}</strong> 
+                                        ({str(amount)}g) 
                                     </div>"""
 
         html_str = f"""
@@ -425,8 +456,7 @@ def meal_analysis(df_selection):
             </div>
         """
         with st.container():
-            with open(f"{config.PATH_TO_HTML_CSS}/design_your_meal.css") as f:
-                st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+            st.markdown(ASSETS.style("design_your_meal.css"), unsafe_allow_html=True)
             st.markdown(
                 html_str,
                 unsafe_allow_html=True,
@@ -517,66 +547,21 @@ def meal_analysis(df_selection):
         protein_budget = df_budget["protein"].values[0]
 
         # Display macro donut charts
-        col1, col2 = st.columns(2)
-        with col1:
-            col1.metric("Energy", f"{calories:.1f} kcal", "")
-            fig_calories_per_serving = plots.donut_chart_nutrition(
-                nutrient_value=calories,
-                rdi_value=calories_budget,
-                nutrient_label="Energy",
-                per="serving",
-                marker_colors=["lightsalmon", "lightgray"],
-            )
-            col1.plotly_chart(fig_calories_per_serving, use_container_width=True)
-
-        with col2:
-            col2.metric("Carbs", f"{carb:.1f} g", "")
-            fig_carb_per_serving = plots.donut_chart_nutrition(
-                nutrient_value=carb,
-                rdi_value=carbs_budget,
-                nutrient_label="Carbs",
-                per="serving",
-                marker_colors=["lightblue", "lightgray"],
-            )
-            col2.plotly_chart(fig_carb_per_serving, use_container_width=True)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            col1.metric("Fat", f"{fat:.1f} g", "")
-            fig_fat_per_serving = plots.donut_chart_nutrition(
-                nutrient_value=fat,
-                rdi_value=fat_budget,
-                nutrient_label="Fat",
-                per="serving",
-                marker_colors=["crimson", "lightgray"],
-            )
-            col1.plotly_chart(fig_fat_per_serving, use_container_width=True)
-
-        with col2:
-            col2.metric("Protein", f"{protein:.1f} g", "")
-            fig_protein_per_serving = plots.donut_chart_nutrition(
-                nutrient_value=protein,
-                rdi_value=protein_budget,
-                nutrient_label="Protein",
-                per="serving",
-                marker_colors=["green", "lightgray"],
-            )
-            col2.plotly_chart(fig_protein_per_serving, use_container_width=True)
+        nutrition_charts(
+            values=(calories, carb, fat, protein),
+            budgets=(calories_budget, carbs_budget, fat_budget, protein_budget),
+            per="serving",
+        )
 
 
 def results2df():
+    df_selection = selected_dishes()
     results = {
         "Datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Username": st.session_state["username"],
-        "DishTypes": ";".join(
-            st.session_state["df_selection"]["MenuItemType"].values.astype(str)
-        ),
-        "DishNames": ";".join(
-            st.session_state["df_selection"]["MenuItemName"].values.astype(str)
-        ),
-        "Amount": ";".join(
-            st.session_state["df_selection"]["CustomAmountInGrams"].values.astype(str)
-        ),
+        "DishTypes": ";".join(df_selection["MenuItemType"].values.astype(str)),
+        "DishNames": ";".join(df_selection["MenuItemName"].values.astype(str)),
+        "Amount": ";".join(df_selection["CustomAmountInGrams"].values.astype(str)),
         "CO2e": st.session_state["kgCO2e_per_custom_amount"],
         "Calories": st.session_state["calories_per_custom_amount"],
         "Carbs": st.session_state["carb_per_custom_amount"],
@@ -594,6 +579,7 @@ def save_data():
     Save user results to csv file.
     """
     results = results2df()
+    epoch, daynum = utils.datetime_to_epoch(results["Datetime"])
 
     ### Local sqlite3 database auth: userscontacts ###
     # DBTools.create_usersmeallogs()
@@ -624,6 +610,8 @@ def save_data():
             "localID": st.session_state["firebase_user"]["localId"],
             "email": st.session_state["username"],
             "Datetime": results["Datetime"],
+            "Epoch": epoch,
+            "DayNum": daynum,
             "DishTypes": results["DishTypes"],
             "DishNames": results["DishNames"],
             "Amount": results["Amount"],
@@ -5,7 +5,7 @@ This is the homepage of the app.
 import streamlit as st  # pip install streamlit
 from streamlit_lottie import st_lottie  # pip install streamlit-lottie
 from util import lottie  # utility functions for graphics
-from util.utils import read_html
+from util.assets import ASSETS
 import config
 
 
@@ -69,11 +69,9 @@ def title():
 
 def main():
     # ---- MAINPAGE ----
-    with open(f"{config.PATH_TO_HTML_CSS}/home.css") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    st.markdown(ASSETS.style("home.css"), unsafe_allow_html=True)
     with st.container():
-        contents = read_html(f"{config.PATH_TO_HTML}/home.html")
-        st.markdown(contents, unsafe_allow_html=True)
+        st.markdown(ASSETS.text("home.html"), unsafe_allow_html=True)
     with st.container():
         _, col2, _ = st.columns([1, 5, 1])
         with col2:
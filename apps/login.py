@@ -16,8 +16,8 @@ import ast
 from requests.exceptions import HTTPError
 from streamlit_option_menu import option_menu
 import extra_streamlit_components as stx
-from apps import design_your_meal, analytics, profile
-from util.utils import DBTools, Security, read_html, Firebase
+from util.assets import ASSETS
+from util.utils import DBTools, Security, Firebase
 import config
 
 
@@ -132,8 +132,7 @@ class Authenticate:
                 with st.container():
                     col1, col2 = st.columns(2)
                     with col1:
-                        contents = read_html(f"{config.PATH_TO_HTML}/login.html")
-                        st.markdown(contents, unsafe_allow_html=True)
+                        st.markdown(ASSETS.text("login.html"), unsafe_allow_html=True)
                     with col2:
                         if self.location == "main":
                             login_form = st.form("Login")
@@ -250,6 +249,9 @@ def logged_in_page(username):
         reset_user_form()
         user_result = DBTools.view_all_users()
         st.dataframe(user_result)
+        from apps import org_dashboard  # imported on first use, like the pages below
+
+        org_dashboard.main()
     else:
 
         ### Local: check for user in sqlite3 db ###
@@ -272,14 +274,14 @@ def logged_in_page(username):
             )
 
         if task == "Design Your Meal":
+            from apps import design_your_meal
+
             meal_designer = design_your_meal.MealDesign(username=username)
             df_selection = meal_designer.select_dishes("Your Meal", "sidebar")
-            if len(st.session_state["df_selection"]) == 0:
+            if len(df_selection) == 0:
                 st.warning("Please choose your dishes.")
             else:
-                design_your_meal.meal_analysis(
-                    df_selection=st.session_state["df_selection"]
-                )
+                design_your_meal.meal_analysis(df_selection=df_selection)
                 if st.session_state["save"]:
                     design_your_meal.save_data()
                     st.sidebar.markdown(
@@ -292,7 +294,11 @@ def logged_in_page(username):
                         unsafe_allow_html=True,
                     )
         elif task == "Analytics":
-            analytics.main()
+            from apps import analytics
+
+            analytics.main(user_profile=doc_dict)
 
         elif task == "Profile":
+            from apps import profile
+
             profile.main()
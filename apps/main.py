@@ -3,7 +3,6 @@ This is the main function to navigate between the different pages of the app.
 """
 import streamlit as st  # pip install streamlit
 from streamlit_option_menu import option_menu
-from apps import home, login, signup
 from util.utils import DBTools
 
 
@@ -40,11 +39,18 @@ def main():
     DBTools.create_userscontacts()
     DBTools.create_usersbudgets()
     DBTools.create_usersmeallogs()
+    DBTools.create_usersdailysummary()
 
-    # Choose page
+    # Choose page (page modules are imported on first use)
     if choice == "Home":
+        from apps import home
+
         home.main()
     elif choice == "Sign in":
+        from apps import login
+
         login.sign_in_outcomes()
     elif choice == "Create an account":
+        from apps import signup
+
         signup.signup_form()
@@ -0,0 +1,151 @@
+"""
+This is the organisation-wide dining dashboard for the canteen operator (admin only).
+
+It aggregates the carbon footprint and macros of all users' meal logs
+per day, per station and per dish.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import streamlit as st
+from apps.analytics import METRIC_COLUMNS, export_meal_log_form, meal_log_datetimes
+from util import plots, profiling, utils
+from util.export import iter_org_meal_log_pages
+from util.meal_logs import explode_meal_logs
+from util.utils import Firebase
+import config
+
+AGGREGATES = ["day", "station", "dish"]
+
+
+def aggregate_user_meal_logs(firebase_db, user_localid, df_catalog):
+    """Partial aggregates of the meal logs of one user.
+
+    Args:
+        firebase_db (firestore.Client): Firestore database.
+        user_localid (str): user localId (created by Firebase create_user).
+        df_catalog (pd.DataFrame): Menu catalog with lower case MenuItemName.
+
+    Returns:
+        (dict, None): Totals per "day", "station" and "dish", or None if the user has no meal log.
+    """
+    mealogs_ref = (
+        firebase_db.collection("usersmeallogs")
+        .document(user_localid)
+        .collection("meallogs")
+    )
+    doc_dict = [doc.to_dict() for doc in mealogs_ref.stream()]
+    if not doc_dict:
+        return None
+
+    df_meal_log = pd.DataFrame.from_dict(doc_dict)
+    df_meal_log["Datetime"] = meal_log_datetimes(df_meal_log)
+    day = df_meal_log["Datetime"].dt.normalize().rename("Day")
+    per_day = df_meal_log.groupby(day)[METRIC_COLUMNS].sum()
+    per_day["Meals"] = df_meal_log.groupby(day).size()
+    per_day["Users"] = 1  # active users per day once merged
+
+    df_dishes = explode_meal_logs(df_meal_log, df_catalog)
+    per_station = df_dishes.groupby("Station")[["Grams"] + METRIC_COLUMNS].sum()
+    per_station["Servings"] = df_dishes.groupby("Station").size()
+    dishes = df_dishes.groupby("DishName", observed=True)
+    per_dish = dishes[["Grams"] + METRIC_COLUMNS].sum()
+    per_dish["Servings"] = dishes.size()
+    per_dish.index = per_dish.index.astype(str)
+
+    return {"day": per_day, "station": per_station, "dish": per_dish}
+
+
+def merge_aggregates(partials):
+    """Merge the partial aggregates of several users by summing them.
+
+    Args:
+        partials (iterable): dicts returned by aggregate_user_meal_logs (None entries are skipped).
+
+    Returns:
+        (dict): Totals per "day", "station" and "dish" over all users, and the number of "users".
+    """
+    partials = [partial for partial in partials if partial is not None]
+    merged = {"users": len(partials)}
+    for name in AGGREGATES:
+        frames = [partial[name] for partial in partials]
+        if frames:
+            merged[name] = pd.concat(frames).groupby(level=0).sum()
+        else:
+            merged[name] = pd.DataFrame()
+    return merged
+
+
+@st.experimental_memo(ttl=config.ORG_DASHBOARD_TTL_S, show_spinner=False)
+def get_org_aggregates():
+    """Aggregates over all users, reading their meal logs concurrently.
+
+    Returns:
+        (dict): Totals per "day", "station" and "dish" over all users, and the number of "users".
+    """
+    firebase_db = Firebase().db()
+    df_catalog = utils.get_menu_catalog()
+    user_ids = [
+        doc_ref.id
+        for doc_ref in firebase_db.collection("usersmeallogs").list_documents()
+    ]
+    with ThreadPoolExecutor(max_workers=config.ORG_DASHBOARD_MAX_WORKERS) as executor:
+        partials = executor.map(
+            lambda user_localid: aggregate_user_meal_logs(
+                firebase_db, user_localid, df_catalog
+            ),
+            user_ids,
+        )
+        return merge_aggregates(partials)
+
+
+def main():
+    st.subheader("Canteen Dashboard :bar_chart:")
+    with st.spinner("Aggregating the meal logs of all users..."), profiling.timer(
+        "org_dashboard.get_org_aggregates"
+    ):
+        aggregates = get_org_aggregates()
+
+    per_day = aggregates["day"]
+    if per_day.empty:
+        st.error("No meal log available.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total: ", f"{per_day['CO2e'].sum():.1f} kgCO2e", "")
+    col2.metric("Meals: ", f"{int(per_day['Meals'].sum())}", "")
+    col3.metric("Users: ", f"{aggregates['users']}", "")
+
+    st.plotly_chart(
+        plots.bar_chart_totals(per_day, "CO2e", "Canteen CO2e per day (kgCO2e)"),
+        use_container_width=True,
+    )
+    col1, col2 = st.columns(2)
+    col1.plotly_chart(
+        plots.bar_chart_totals(
+            aggregates["station"], "CO2e", "CO2e per station (kgCO2e)"
+        ),
+        use_container_width=True,
+    )
+    col2.plotly_chart(
+        plots.bar_chart_totals(
+            aggregates["station"], ["Carbs", "Protein", "Fat"], "Macros per station (g)"
+        ),
+        use_container_width=True,
+    )
+
+    st.subheader("Dishes")
+    per_dish = aggregates["dish"].sort_values("CO2e", ascending=False)
+    st.plotly_chart(
+        plots.bar_chart_dish_contributions(
+            per_dish.head(10), title="Top 10 emitters across the canteen (kgCO2e)"
+        ),
+        use_container_width=True,
+    )
+    st.dataframe(per_dish)
+
+    st.subheader("Export Meal Logs")
+    export_meal_log_form(
+        lambda: iter_org_meal_log_pages(Firebase().db()),
+        file_stem="canteen_meal_logs",
+        key="export_org_meal_logs",
+    )
@@ -1,5 +1,6 @@
 import pandas as pd
 import streamlit as st
+from util.rdi import load_rdi
 from util.utils import DBTools, Security, read_html, Firebase
 import config  # paths to files
 import time
@@ -19,14 +20,14 @@ def update_profile_form():
     # if user_budget:
     #     _, co2_val, calories_val, carbs_val, protein_val, fat_val = user_budget[0]
     # else:
-    #     df_rdi = pd.read_csv(config.PATH_TO_NUTRITION_RDI)
+    #     rdi = load_rdi()
     #     livelca_CO2_budget = 2.72  # (kg) based on LiveLCA threshold
     #     co2_val, calories_val, carbs_val, protein_val, fat_val = (
     #         livelca_CO2_budget,
-    #         df_rdi["Energ_Kcal"].values[0],
-    #         df_rdi["Carbohydrt_(g)"].values[0],
-    #         df_rdi["Protein_(g)"].values[0],
-    #         df_rdi["Lipid_Tot_(g)"].values[0],
+    #         rdi.energy_kcal,
+    #         rdi.carbs_g,
+    #         rdi.protein_g,
+    #         rdi.fat_g,
     #     )
 
     ### Firebase: Check for exisiting user contact and budget info###
@@ -48,14 +49,14 @@ def update_profile_form():
         )
     else:
         name_val, age_val, gender_val, email_val = "", "", "", st.session_state["username"]
-        df_rdi = pd.read_csv(config.PATH_TO_NUTRITION_RDI)
+        rdi = load_rdi()
         livelca_CO2_budget = 2.72  # (kg) based on LiveLCA threshold
         co2_val, calories_val, carbs_val, protein_val, fat_val = (
             livelca_CO2_budget,
-            df_rdi["Energ_Kcal"].values[0],
-            df_rdi["Carbohydrt_(g)"].values[0],
-            df_rdi["Protein_(g)"].values[0],
-            df_rdi["Lipid_Tot_(g)"].values[0],
+            f"{rdi.energy_kcal:g}",  # 2000 rather than 2000.0 in the text inputs
+            f"{rdi.carbs_g:g}",
+            f"{rdi.protein_g:g}",
+            f"{rdi.fat_g:g}",
         )
 
     # Form
@@ -2,7 +2,8 @@ from multiprocessing.sharedctypes import Value
 import streamlit as st
 from requests.exceptions import HTTPError
 import ast
-from util.utils import DBTools, Security, read_html, Firebase
+from util.assets import ASSETS
+from util.utils import DBTools, Security, Firebase
 import config
 
 
@@ -18,8 +19,7 @@ def signup_form():
             with st.container():
                 col1, col2 = st.columns(2)
                 with col1:
-                    contents = read_html(f"{config.PATH_TO_HTML}/signup.html")
-                    st.markdown(contents, unsafe_allow_html=True)
+                    st.markdown(ASSETS.text("signup.html"), unsafe_allow_html=True)
                 with col2:
                     create_account_form = st.form("create_new_account")
                     create_account_form.subheader("Create New Account")
@@ -0,0 +1,104 @@
+"""
+Benchmark of the render path of the figure builders of util.plots.
+
+st.plotly_chart passes what it gets to
+`plotly.tools.return_figure_from_figure_or_data(figure, validate_figure=True)`:
+a dict is validated again into a Figure, a Figure is only copied to a dict.
+Each chart is timed through that call, built without the figure cache, served
+from the cache, passed as a prebuilt plain dict (validation alone) and, for
+the line chart, built with px.line.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_figure_specs [--repeat 200]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import plotly.tools
+
+from util import plots
+
+
+def synthetic_meal_log(n_rows):
+    """Meal log with n_rows meals, one every 8 hours."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Datetime": pd.date_range("2022-01-01", periods=n_rows, freq=pd.Timedelta(hours=8)),
+            "CO2e": rng.gamma(2.0, 0.5, n_rows),
+            "Calories": rng.normal(700, 150, n_rows),
+            "Carbs": rng.normal(80, 20, n_rows),
+            "Fat": rng.normal(25, 8, n_rows),
+            "Protein": rng.normal(30, 10, n_rows),
+        }
+    )
+
+
+def render(figure_or_data):
+    """What st.plotly_chart does with a figure before serializing it."""
+    return plotly.tools.return_figure_from_figure_or_data(figure_or_data, True)
+
+
+def as_spec(figure):
+    """The figure as a plain dict, without the default template go.Figure adds."""
+    spec = figure.to_dict()
+    if figure.layout.template == pio.templates[pio.templates.default]:
+        del spec["layout"]["template"]
+    return spec
+
+
+def cases():
+    """(name, builder, cached builder or None, px reference or None) of each chart type."""
+    df = synthetic_meal_log(500)
+    donut_args = (123.4, 2000, "Energy", "serving", ("lightsalmon", "lightgray"))
+    return [
+        (
+            "donut",
+            lambda: plots.donut_chart_nutrition.uncached(*donut_args),
+            lambda: plots.donut_chart_nutrition(*donut_args),
+            None,
+        ),
+        (
+            "gauge",
+            lambda: plots.gauge_chart_carbon_budget.uncached(1.8, 4.08, 2.72),
+            lambda: plots.gauge_chart_carbon_budget(1.8, 4.08, 2.72),
+            None,
+        ),
+        (
+            "line",
+            lambda: plots.plot_user_CO2e(df),
+            None,
+            lambda: px.line(df, x="Datetime", y="CO2e").update_layout(
+                template=plots.LINES_TEMPLATE
+            ),
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=200, help="Renders per case.")
+    args = parser.parse_args()
+
+    def ms(fn):
+        return f"{timeit.timeit(fn, number=args.repeat) / args.repeat * 1e3:12.3f}"
+
+    print(f"{'chart':<8}{'build (ms)':>12}{'cached (ms)':>12}{'dict (ms)':>12}{'px (ms)':>12}")
+    for name, build, build_cached, build_px in cases():
+        spec = as_spec(build())
+        print(
+            f"{name:<8}"
+            + ms(lambda: render(build()))
+            + (ms(lambda: render(build_cached())) if build_cached else f"{'-':>12}")
+            + ms(lambda: render(spec))  # validation alone of a prebuilt dict
+            + (ms(lambda: render(build_px())) if build_px else f"{'-':>12}")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Import-time benchmark of the app's cold start.
+
+Imports the app in fresh interpreters with `python -X importtime` and sums the
+self time of every imported module per top-level package (median of several
+runs). The result can be saved as a baseline and later runs compared with it,
+to catch a heavy dependency creeping back into the startup path.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_import_time              # report
+    python -m benchmarks.bench_import_time --update     # save the baseline
+    python -m benchmarks.bench_import_time --compare    # exit 1 on regressions (after --update)
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).with_name("import_time_baseline.json")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def parse_importtime(stderr):
+    """Self time (us) of each package from `-X importtime` output.
+
+    Args:
+        stderr (str): Output of `python -X importtime`.
+
+    Returns:
+        (dict): Top-level package -> sum of the self times of its modules.
+    """
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, _, module = match.groups()
+            packages[module.split(".")[0]] += int(self_us)
+    return dict(packages)
+
+
+def measure(module="app", runs=5):
+    """Median self time per package of importing `module` in a fresh interpreter.
+
+    Args:
+        module (str, optional): Module to import. Defaults to "app".
+        runs (int, optional): Number of interpreters. Defaults to 5.
+
+    Returns:
+        (dict): "total_us" and "packages" (package -> median self time in us).
+    """
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+        samples.append(parse_importtime(result.stderr))
+
+    names = set().union(*samples)
+    packages = {
+        name: int(statistics.median(sample.get(name, 0) for sample in samples))
+        for name in names
+    }
+    return {"total_us": sum(packages.values()), "packages": packages}
+
+
+def compare(result, baseline, tolerance, min_us):
+    """Regressions of `result` against `baseline`.
+
+    Args:
+        result (dict): Output of measure.
+        baseline (dict): Saved output of measure.
+        tolerance (float): Allowed relative increase, e.g. 0.2 for 20%.
+        min_us (int): Increases below this many us are ignored (noise).
+
+    Returns:
+        (list): Description of each regression.
+    """
+    regressions = []
+    total, total_baseline = result["total_us"], baseline["total_us"]
+    if total - total_baseline > max(min_us, tolerance * total_baseline):
+        regressions.append(
+            f"total: {total_baseline / 1e3:.1f} ms -> {total / 1e3:.1f} ms"
+        )
+    for name, us in sorted(result["packages"].items(), key=lambda item: -item[1]):
+        us_baseline = baseline["packages"].get(name, 0)
+        if us - us_baseline > max(min_us, tolerance * us_baseline):
+            regressions.append(
+                f"{name}: {us_baseline / 1e3:.1f} ms -> {us / 1e3:.1f} ms"
+                + (" (new)" if name not in baseline["packages"] else "")
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="app", help="Module to import.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters.")
+    parser.add_argument("--top", type=int, default=15, help="Packages to report.")
+    parser.add_argument("--update", action="store_true", help="Save the baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare with the baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed increase.")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="Ignored increase.")
+    args = parser.parse_args()
+    if args.compare and not args.update and not BASELINE.exists():
+        sys.exit(f"No baseline at {BASELINE}: record one first with --update.")
+
+    result = measure(args.module, args.runs)
+    print(f"import {args.module}: {result['total_us'] / 1e3:.1f} ms")
+    top = sorted(result["packages"].items(), key=lambda item: -item[1])[: args.top]
+    for name, us in top:
+        print(f"  {name:<30}{us / 1e3:8.1f} ms")
+
+    if args.update:
+        BASELINE.write_text(json.dumps(result, indent=2, sort_keys=True))
+        print(f"Baseline saved to {BASELINE}")
+    if args.compare:
+        baseline = json.loads(BASELINE.read_text())
+        regressions = compare(result, baseline, args.tolerance, args.min_ms * 1e3)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regression")
+
+
+if __name__ == "__main__":
+    main()
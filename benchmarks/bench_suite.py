@@ -0,0 +1,395 @@
+"""
+Benchmark suite of the app's hot paths on synthetic data.
+
+Covers the dish lookups of MealDesign.select_dishes, the rebuilding of the
+selected dishes from session state (selected_dishes), the get_* label functions
+of the Design your meal page, every calc_* analytics function (plus
+summarise_meal_log, explode_meal_logs and rank_dish_contributions) and the
+util.plots figure builders. The lookups and label functions run on synthetic
+catalogs of 400 / 10k / 100k dishes, the analytics functions and the plots on
+synthetic meal logs of 100 / 10k / 1M rows.
+
+The result can be saved as a baseline and later runs compared with it, to
+catch a slowdown before it reaches users.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_suite                    # report
+    python -m benchmarks.bench_suite --update           # save the baseline
+    python -m benchmarks.bench_suite --compare          # exit 1 on regressions (after --update)
+    python -m benchmarks.bench_suite --filter plots --log-sizes 100 10000
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+import types
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apps import analytics, design_your_meal
+from util import meal_logs, plots
+from util.budgets import calc_budget_adherence
+
+BASELINE = Path(__file__).with_name("bench_suite_baseline.json")
+
+CATALOG_SIZES = [400, 10_000, 100_000]
+LOG_SIZES = [100, 10_000, 1_000_000]
+
+# Number of dishes of a synthetic meal (and of a select_dishes selection)
+DISHES_PER_MEAL = 5
+
+DISH_TYPES = [
+    "Eggs-and-Beans-蛋及豆類",
+    "Meat-肉類",
+    "Seafood-海鮮",
+    "Vegetables-蔬菜",
+    "Rice-and-Noodles-飯麵",
+    "Dessert-甜品",
+]
+INGREDIENTS = [
+    ("egg", "蛋"),
+    ("beef", "牛肉"),
+    ("pork", "豬肉"),
+    ("chicken", "雞肉"),
+    ("fish", "魚"),
+    ("shrimp", "蝦"),
+    ("tofu", "豆腐"),
+    ("rice", "米"),
+    ("noodles", "麵"),
+    ("cabbage", "椰菜"),
+    ("tomato", "番茄"),
+    ("potato", "薯仔"),
+    ("onion", "洋蔥"),
+    ("milk", "牛奶"),
+    ("sugar", "糖"),
+    ("oil", "油"),
+]
+
+
+# ------------------------------------------------------------------
+# Synthetic data
+
+
+def synthetic_catalog(n_dishes, seed=0):
+    """Menu catalog with the columns of utils.get_menu_catalog used by the app.
+
+    Args:
+        n_dishes (int): Number of dishes.
+        seed (int, optional): Random seed.
+
+    Returns:
+        (pd.DataFrame): One row per dish, lower case unique MenuItemName.
+    """
+    rng = np.random.default_rng(seed)
+    n_ingredients = rng.integers(1, 9, n_dishes)
+    ingredient_ix = [rng.choice(len(INGREDIENTS), n, replace=False) for n in n_ingredients]
+    grams = [np.round(rng.uniform(50, 5000, n), 1) for n in n_ingredients]
+    footprints = [rng.gamma(2.0, 0.2, n) * g / 1000 for g, n in zip(grams, n_ingredients)]
+    recipe_grams = np.array([g.sum() for g in grams])
+    recipe_CO2 = np.array([f.sum() for f in footprints])
+    servings = np.maximum(1, (recipe_grams / rng.uniform(100, 300, n_dishes)).astype(int))
+
+    per_100g = {
+        "Calories": rng.uniform(50, 400, n_dishes),
+        "Carbohydrate": rng.uniform(0, 60, n_dishes),
+        "Fat": rng.uniform(0, 30, n_dishes),
+        "Protein": rng.uniform(0, 30, n_dishes),
+    }
+    df = pd.DataFrame(
+        {
+            "MenuItemName": [f"dish {i:06d}" for i in range(n_dishes)],
+            "MenuItemType": rng.choice(DISH_TYPES, n_dishes),
+            "RawIngredientsEngSimple": [[INGREDIENTS[i][0] for i in ix] for ix in ingredient_ix],
+            "RawIngredientsChinese": [[INGREDIENTS[i][1] for i in ix] for ix in ingredient_ix],
+            "AmountInGrams": [list(g) for g in grams],
+            "AmountServings": [f"{max(1, s // 20)} 盆/{s} 人份量" for s in servings],
+            "CarbonFootprintIngredients": [list(f) for f in footprints],
+            "CarbonLabelMenuItem": recipe_CO2,
+            "CarbonLabelMenuItemPer100g": recipe_CO2 / recipe_grams * 100,
+        }
+    )
+    for nutrient, values in per_100g.items():
+        df[f"NutritionLabelMenuItemPer100g.{nutrient}"] = values
+    return df
+
+
+def synthetic_meal_log(n_rows, df_catalog, now=None, seed=0):
+    """Meal log of n_rows meals of DISHES_PER_MEAL catalog dishes, up to now.
+
+    Args:
+        n_rows (int): Number of meal logs.
+        df_catalog (pd.DataFrame): Catalog the dishes are drawn from.
+        now (datetime, optional): Datetime of the newest meal. Defaults to now.
+        seed (int, optional): Random seed.
+
+    Returns:
+        (pd.DataFrame): Meal logs as analytics.build_analytics receives them.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(now or datetime.now()).floor("s")
+    datetimes = end - pd.to_timedelta(np.sort(rng.uniform(0, 365 * 86400, n_rows))[::-1], unit="s")
+
+    dish_ix = rng.integers(0, len(df_catalog), (n_rows, DISHES_PER_MEAL))
+    grams = rng.integers(50, 250, (n_rows, DISHES_PER_MEAL))
+    names = df_catalog["MenuItemName"].values[dish_ix]
+    types = df_catalog["MenuItemType"].values[dish_ix]
+
+    df = pd.DataFrame(
+        {
+            "Datetime": datetimes,
+            "Epoch": datetimes.astype("int64") // 10**9,
+            "Username": "benchmark",
+            "DishTypes": [";".join(row) for row in types],
+            "DishNames": [";".join(row) for row in names],
+            "Amount": [";".join(row) for row in grams.astype(str)],
+        }
+    )
+    for metric, column in meal_logs.CATALOG_PER_100G_COLUMNS.items():
+        df[metric] = (df_catalog[column].values[dish_ix] * grams / 100).sum(axis=1)
+    return df
+
+
+# ------------------------------------------------------------------
+# Cases
+
+
+def selection_state(df_catalog, n_dishes=DISHES_PER_MEAL):
+    """Session state of a selection of n_dishes dishes, as select_dishes keeps it."""
+    dish_ids = np.arange(0, len(df_catalog), max(1, len(df_catalog) // n_dishes))[:n_dishes]
+    return {
+        "dish_ids": dish_ids.astype(design_your_meal.DISH_IDS_DTYPE),
+        "dish_grams": np.full(len(dish_ids), 150, dtype=design_your_meal.DISH_GRAMS_DTYPE),
+    }
+
+
+def selected_dishes(df_catalog, session_state):
+    """design_your_meal.selected_dishes run with the given session state."""
+    st = design_your_meal.st
+    design_your_meal.st = types.SimpleNamespace(session_state=session_state)
+    try:
+        return design_your_meal.selected_dishes(df_catalog)
+    finally:
+        design_your_meal.st = st
+
+
+def select_dishes_lookups(df_catalog, menu_item_name):
+    """The catalog lookups of MealDesign.select_dishes: catalog row of each chosen item."""
+    return [
+        df_catalog.index.get_loc(df_catalog.query("MenuItemName == @item").index[0])
+        for item in menu_item_name
+    ]
+
+
+def catalog_cases(df_catalog):
+    """(name, function) of the cases run on a catalog."""
+    session_state = selection_state(df_catalog)
+    df_selection = selected_dishes(df_catalog, session_state)
+    df_dish = df_selection[:1]
+    menu_item_name = list(df_selection["MenuItemName"])
+    return [
+        ("select_dishes_lookups", lambda: select_dishes_lookups(df_catalog, menu_item_name)),
+        ("selected_dishes", lambda: selected_dishes(df_catalog, session_state)),
+        (
+            "get_carbon_footprint_for_dish_ingredients",
+            lambda: design_your_meal.get_carbon_footprint_for_dish_ingredients(df_dish),
+        ),
+        (
+            "get_carbon_label_for_dishes_per_custom_amount",
+            lambda: design_your_meal.get_carbon_label_for_dishes_per_custom_amount(df_selection),
+        ),
+        (
+            "get_nutrition_label_for_dishes_per_custom_amount",
+            lambda: design_your_meal.get_nutrition_label_for_dishes_per_custom_amount(df_selection),
+        ),
+    ]
+
+
+def meal_log_cases(df_meal_log, df_catalog):
+    """(name, function) of the analytics and plots cases run on a meal log."""
+    df_dishes = meal_logs.explode_meal_logs(df_meal_log, df_catalog)
+    df_rank = meal_logs.rank_dish_contributions(df_dishes)
+    daily = analytics.summarise_meal_log(df_meal_log).daily
+    cases = [
+        ("analytics.summarise_meal_log", lambda: analytics.summarise_meal_log(df_meal_log)),
+        ("meal_logs.explode_meal_logs", lambda: meal_logs.explode_meal_logs(df_meal_log, df_catalog)),
+        ("meal_logs.rank_dish_contributions", lambda: meal_logs.rank_dish_contributions(df_dishes)),
+    ]
+    cases += [
+        (f"analytics.{name}", lambda func=func: func(df_meal_log))
+        for name, func in sorted(vars(analytics).items())
+        if name.startswith("calc_") and getattr(func, "__module__", None) == analytics.__name__
+    ]
+    cases.append(
+        (
+            "budgets.calc_budget_adherence",
+            lambda: calc_budget_adherence(daily, {"CO2e": 2.72, "Calories": 2000}),
+        )
+    )
+    cases += [
+        (f"plots.{name}", lambda func=getattr(plots, name): func(df_meal_log))
+        for name in [
+            "plot_user_CO2e",
+            "plot_user_calories",
+            "plot_user_macros",
+            "plot_user_carbs",
+            "plot_user_fat",
+            "plot_user_protein",
+            "plot_user_macro_split",
+        ]
+    ]
+    cases += [
+        ("plots.plot_user_period_totals", lambda: plots.plot_user_period_totals(daily, "CO2e", "day")),
+        ("plots.bar_chart_totals", lambda: plots.bar_chart_totals(daily, "CO2e", "CO2e per day")),
+        ("plots.bar_chart_dish_contributions", lambda: plots.bar_chart_dish_contributions(df_rank)),
+    ]
+    return cases
+
+
+def fixed_size_cases():
+    """(name, function) of the plots builders whose input doesn't scale with the data.
+
+    The memoized builders are timed uncached. gauge_chart_carbon_multidish is left
+    out: it only reads the budgets from st.session_state and calls
+    gauge_chart_carbon_budget.
+    """
+    uncached = lambda func: getattr(func, "uncached", func)  # noqa: E731
+    labels = np.array([("beef", "牛肉"), ("rice", "米"), ("cabbage", "椰菜")])
+    values = np.array([1.2, 0.3, 0.1])
+    return [
+        ("plots.donut_chart_carbon", lambda: uncached(plots.donut_chart_carbon)(labels, values)),
+        ("plots.gauge_chart_carbon", lambda: uncached(plots.gauge_chart_carbon)(0.5, 12.0, "50 盆/1000 人份量")),
+        ("plots.gauge_chart_carbon_budget", lambda: uncached(plots.gauge_chart_carbon_budget)(1.8, 4.08, 2.72)),
+        (
+            "plots.donut_chart_nutrition",
+            lambda: uncached(plots.donut_chart_nutrition)(
+                123.4, 2000, "Energy", "serving", ("lightsalmon", "lightgray")
+            ),
+        ),
+        (
+            "plots.donut_chart_nutrition_combined",
+            lambda: uncached(plots.donut_chart_nutrition_combined)(
+                (650.0, 80.0, 25.0, 30.0),
+                (2000.0, 275.0, 78.0, 50.0),
+                ("Energy", "Carbs", "Fat", "Protein"),
+                "serving",
+                ("lightsalmon", "lightblue", "crimson", "gold"),
+            ),
+        ),
+    ]
+
+
+# ------------------------------------------------------------------
+# Runner
+
+
+def time_case(func, repeat=3):
+    """Best time per call (ms) of `func`, over `repeat` runs of at least 0.2 s each."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e3
+
+
+def run(catalog_sizes, log_sizes, pattern=None, repeat=3):
+    """Time every case whose name contains `pattern`.
+
+    Args:
+        catalog_sizes (list): Number of dishes of the synthetic catalogs.
+        log_sizes (list): Number of rows of the synthetic meal logs.
+        pattern (str, optional): Only run the cases whose name contains it.
+        repeat (int, optional): Runs per case, the best one is kept.
+
+    Returns:
+        (dict): Case name ("<function>[<size>]") -> ms per call.
+    """
+    def groups():
+        for n_dishes in catalog_sizes:
+            yield f"catalog={n_dishes}", lambda n=n_dishes: catalog_cases(synthetic_catalog(n))
+        # the meal logs are drawn from a catalog of the real size
+        df_catalog = synthetic_catalog(CATALOG_SIZES[0])
+        for n_rows in log_sizes:
+            yield f"log={n_rows}", lambda n=n_rows: meal_log_cases(
+                synthetic_meal_log(n, df_catalog), df_catalog
+            )
+        yield "fixed", fixed_size_cases
+
+    results = {}
+    for size, make_cases in groups():
+        cases = [
+            (f"{name}[{size}]", func)
+            for name, func in make_cases()
+            if pattern is None or pattern in f"{name}[{size}]"
+        ]
+        for name, func in cases:
+            results[name] = time_case(func, repeat)
+            print(f"  {name:<70}{results[name]:12.3f} ms", flush=True)
+    return results
+
+
+def compare(result, baseline, tolerance, min_ms):
+    """Regressions of `result` against `baseline`.
+
+    Args:
+        result (dict): "cases" of the current run.
+        baseline (dict): "cases" of the saved run.
+        tolerance (float): Allowed relative increase, e.g. 0.2 for 20%.
+        min_ms (float): Increases below this many ms are ignored (noise).
+
+    Returns:
+        (list): Description of each regression.
+    """
+    regressions = []
+    for name, ms in result.items():
+        if name not in baseline:
+            continue
+        ms_baseline = baseline[name]
+        if ms - ms_baseline > max(min_ms, tolerance * ms_baseline):
+            regressions.append(
+                f"{name}: {ms_baseline:.3f} ms -> {ms:.3f} ms ({ms / ms_baseline:.2f}x)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--catalog-sizes", type=int, nargs="*", default=CATALOG_SIZES)
+    parser.add_argument("--log-sizes", type=int, nargs="*", default=LOG_SIZES)
+    parser.add_argument("--filter", help="Only run the cases whose name contains it.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case.")
+    parser.add_argument("--update", action="store_true", help="Save the baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare with the baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed increase.")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="Ignored increase.")
+    args = parser.parse_args()
+    if args.compare and not args.update and not BASELINE.exists():
+        sys.exit(f"No baseline at {BASELINE}: record one first with --update.")
+
+    cases = run(args.catalog_sizes, args.log_sizes, args.filter, args.repeat)
+    result = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "cases": cases,
+    }
+
+    if args.update:
+        if BASELINE.exists():  # keep the cases this run didn't cover
+            result["cases"] = {**json.loads(BASELINE.read_text())["cases"], **cases}
+        BASELINE.write_text(json.dumps(result, indent=2, sort_keys=True))
+        print(f"Baseline saved to {BASELINE}")
+    if args.compare:
+        baseline = json.loads(BASELINE.read_text())
+        regressions = compare(cases, baseline["cases"], args.tolerance, args.min_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regression")
+
+
+if __name__ == "__main__":
+    main()
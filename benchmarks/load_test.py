@@ -0,0 +1,483 @@
+"""
+Headless load test of concurrent sessions of the app.
+
+Runs N simulated sessions in threads, each going through the Sign in page:
+login -> Design Your Meal (select dishes, Submit) -> Save -> Analytics. A rerun
+is one run of the page function (login.sign_in_outcomes), as streamlit runs
+the script on each interaction. Streamlit is replaced by a fake module that
+answers widgets from a script and keeps one session_state per session, and
+Firebase by tests/fake_firebase.py with a configurable latency, so the load test
+measures the app's own CPU and memory cost per session.
+
+Reports the throughput, the p50/p95/p99 rerun latency and Firestore reads and
+writes per rerun of each step, and the memory of each session (pickled size
+of its session_state). A session fails if an Analytics rerun goes over its
+Firestore read budget (read_budget).
+
+Usage (from the repository root):
+    python -m benchmarks.load_test --sessions 50 --latency-ms 20
+"""
+
+import argparse
+import contextlib
+import json
+import resource
+import sys
+import threading
+import time
+import types
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.tools
+import plotly.utils
+import streamlit
+
+from apps import analytics, design_your_meal, login, profile  # patched by patch_app
+from benchmarks.bench_suite import synthetic_meal_log
+from util import utils
+from util.profiling import session_state_sizes
+from tests.fake_firebase import FakeBackend
+
+PASSWORD = "load-test-password"
+
+
+# ------------------------------------------------------------------
+# Fake streamlit
+
+
+class RerunRequested(Exception):
+    """Raised by st.experimental_rerun."""
+
+
+class StopRequested(Exception):
+    """Raised by st.stop."""
+
+
+class SessionState(dict):
+    """st.session_state: a dict that also supports attribute access."""
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        del self[key]
+
+
+def options_list(options):
+    """Options of a widget as streamlit sees them (first column of a DataFrame)."""
+    if isinstance(options, pd.DataFrame):
+        return options.iloc[:, 0].tolist()
+    return list(options)
+
+
+class FakeDeltaGenerator:
+    """Page, sidebar, column, form or placeholder of a FakeSession.
+
+    Widgets return the session's scripted answer (by key, then by label) or their
+    default value, and elements only count what they render.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):  # markdown, metric, dataframe, ...: rendered as no-ops
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._session.render
+
+    # ---- Layout ----
+    def columns(self, spec, **kwargs):
+        n = spec if isinstance(spec, int) else len(spec)
+        return [FakeDeltaGenerator(self._session) for _ in range(n)]
+
+    def container(self):
+        return FakeDeltaGenerator(self._session)
+
+    def empty(self):
+        return FakeDeltaGenerator(self._session)
+
+    def form(self, key, **kwargs):
+        return FakeDeltaGenerator(self._session)
+
+    def expander(self, label, expanded=False):
+        return FakeDeltaGenerator(self._session)
+
+    def spinner(self, text=""):
+        return contextlib.nullcontext()
+
+    # ---- Elements ----
+    def plotly_chart(self, figure_or_data, **kwargs):
+        # as streamlit: dicts are validated, figures only copied, then sent as JSON
+        figure = plotly.tools.return_figure_from_figure_or_data(figure_or_data, True)
+        json.dumps(figure, cls=plotly.utils.PlotlyJSONEncoder)
+        self._session.render()
+
+    # ---- Widgets ----
+    def button(self, label, key=None, **kwargs):
+        return bool(self._session.answer(key, label, False, keep=False))
+
+    form_submit_button = button
+    download_button = button
+
+    def text_input(self, label, value="", key=None, **kwargs):
+        return self._session.answer(key, label, value)
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        return self._session.answer(key, label, value if value is not None else min_value or 0)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        return self._session.answer(key, label, value if value is not None else min_value)
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        return self._session.answer(key, label, options_list(options)[index], options)
+
+    radio = selectbox
+
+    def multiselect(self, label, options, default=None, key=None, **kwargs):
+        return list(self._session.answer(key, label, list(default or []), options))
+
+
+class FakeStreamlit(FakeDeltaGenerator):
+    """The streamlit module as seen by the scripts of one session."""
+
+    def __init__(self, session):
+        super().__init__(session)
+        self.session_state = session.session_state
+        self.sidebar = FakeDeltaGenerator(session)
+
+    def experimental_rerun(self):
+        raise RerunRequested()
+
+    def stop(self):
+        raise StopRequested()
+
+
+class FakeSession:
+    """State of one simulated browser session: session_state, cookies and widget answers."""
+
+    def __init__(self):
+        self.session_state = SessionState()
+        self.cookies = {}
+        self.answers = {}  # widget key or label -> value, or callable(options) -> value
+        self.elements = 0
+        self.st = FakeStreamlit(self)
+
+    def render(self, *args, **kwargs):
+        self.elements += 1
+
+    def answer(self, key, label, default, options=None, keep=True):
+        """Scripted value of a widget, keyed widgets keeping theirs in session_state."""
+        for name in (key, label):
+            if name is not None and name in self.answers:
+                value = self.answers[name]
+                if callable(value):
+                    value = value(options_list(options))
+                break
+        else:
+            value = self.session_state.get(key, default) if key is not None else default
+        if key is not None and keep:
+            self.session_state[key] = value
+        return value
+
+
+class FakeCookieManager:
+    """extra_streamlit_components.CookieManager of the session of the calling thread."""
+
+    def get(self, cookie):
+        return _local.session.cookies.get(cookie)
+
+    def set(self, cookie, val, **kwargs):
+        _local.session.cookies[cookie] = val
+
+    def delete(self, cookie, **kwargs):
+        _local.session.cookies.pop(cookie, None)
+
+
+class StreamlitProxy:
+    """Stands in for the streamlit module in the app modules.
+
+    The app modules are shared by all sessions, so attribute access is dispatched
+    to the fake streamlit of the session running in the calling thread.
+    """
+
+    def __getattr__(self, name):
+        return getattr(_local.session.st, name)
+
+
+_local = threading.local()  # session running in this thread
+
+
+def patch_app(backend):
+    """Replace streamlit, the cookie manager and Firebase in the loaded app modules.
+
+    Page modules imported after this call would still use the real ones.
+
+    Args:
+        backend (FakeBackend): Fake Firebase the sessions use.
+    """
+    proxy = StreamlitProxy()
+    firebase, fake_firebase = utils.Firebase, backend.firebase_class()
+    for name, module in list(sys.modules.items()):
+        if not name.startswith(("apps.", "util.")) or module is None:
+            continue
+        if getattr(module, "st", None) is streamlit:
+            module.st = proxy
+        if name.startswith("apps.") and getattr(module, "Firebase", None) is firebase:
+            module.Firebase = fake_firebase
+    login.stx = types.SimpleNamespace(CookieManager=FakeCookieManager)
+
+
+# ------------------------------------------------------------------
+# Sessions
+
+
+def seed_user(backend, i, history, df_catalog):
+    """Auth user with a profile and `history` meal logs.
+
+    Returns:
+        (str): Email of the user.
+    """
+    email = f"user{i:05d}@example.com"
+    user = backend.add_user(email, PASSWORD)
+    db = backend.firebase_class()().db()
+    db.collection("userstable").document(user["localId"]).set(
+        {
+            "localID": user["localId"],
+            "name": f"User {i}",
+            "age": 30,
+            "gender": "Other",
+            "email": email,
+            "co2_budget": 2.72,
+            "calories_budget": 2000.0,
+            "carbs_budget": 275.0,
+            "protein_budget": 50.0,
+            "fat_budget": 78.0,
+        }
+    )
+    if history:
+        df = synthetic_meal_log(history, df_catalog, seed=i)
+        df["Datetime"] = df["Datetime"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        df["DayNum"] = df["Epoch"] // 86400
+        df["localID"], df["email"] = user["localId"], email
+        meal_logs = db.collection("usersmeallogs").document(user["localId"]).collection("meallogs")
+        for doc in df.drop(columns="Username").to_dict("records"):
+            meal_logs.document(doc["Datetime"]).set(doc)
+    return email
+
+
+def pick(n, rng, chosen):
+    """Widget answer choosing n random options not in `chosen` (some dishes are in two stations)."""
+
+    def answer(options):
+        options = [option for option in options if option not in chosen]
+        picked = list(rng.choice(options, size=min(n, len(options)), replace=False))
+        chosen.update(picked)
+        return picked
+
+    return answer
+
+
+def flow(email, rng):
+    """(step, widget answers) of each rerun of a session."""
+    chosen = set()
+    return [
+        ("login", {"Username": email, "Password": PASSWORD, "Login": True}),
+        (
+            "design",
+            {
+                "Please choose an option": "Design Your Meal",
+                "menu_item_breakfast_key": pick(1, rng, chosen),
+                "menu_item_asian_key": pick(1, rng, chosen),
+                "menu_item_dessert_key": pick(1, rng, chosen),
+                "Submit": True,
+            },
+        ),
+        ("save", {"Please choose an option": "Design Your Meal", "Save": True}),
+        ("analytics", {"Please choose an option": "Analytics"}),
+    ]
+
+
+def read_budget(step, history):
+    """Most Firestore reads a rerun of a step may make (None: no budget).
+
+    Analytics streams the meal logs (the seeded ones and the one saved by the
+    flow) and must reuse the profile read by the login page.
+    """
+    return {"analytics": history + 2}.get(step)
+
+
+def run_session(backend, email, seed, think_s, start_barrier, history):
+    """Go through the flow in a new session.
+
+    Returns:
+        (dict): "reruns" (step, seconds, Firestore reads, Firestore writes) of each
+            rerun, "error" and "session_bytes" (size of each session_state key).
+    """
+    session = FakeSession()
+    _local.session = session
+    rng = np.random.default_rng(seed)
+    reruns = []
+    error = None
+    start_barrier.wait()
+    try:
+        for step, answers in flow(email, rng):
+            session.answers = answers
+            while True:  # st.experimental_rerun runs the page again, without interaction
+                start = time.perf_counter()
+                budget = backend.budget(reads=read_budget(step, history), this_thread=True)
+                with budget as counts:
+                    try:
+                        login.sign_in_outcomes()
+                        rerun = False
+                    except RerunRequested:
+                        rerun = True
+                    except StopRequested:
+                        rerun = False
+                totals = counts.totals()
+                reruns.append(
+                    (step, time.perf_counter() - start, totals["reads"], totals["writes"])
+                )
+                if not rerun:
+                    break
+                session.answers = {}
+            if think_s:
+                time.sleep(think_s)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        _local.session = None
+    return {
+        "reruns": reruns,
+        "error": error,
+        "session_bytes": session_state_sizes(session.session_state),
+    }
+
+
+# ------------------------------------------------------------------
+# Report
+
+
+def rerun_stats(reruns):
+    """Latency percentiles and Firestore reads/writes per rerun of (step, seconds, reads, writes)."""
+    if not reruns:  # every session failed before its first rerun
+        return {"reruns": 0}
+    _, seconds, reads, writes = zip(*reruns)
+    ms = np.array(seconds) * 1e3
+    return {
+        "reruns": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "reads": float(np.mean(reads)),
+        "writes": float(np.mean(writes)),
+    }
+
+
+def report(results, wall_s):
+    """Throughput, rerun latency per step and session memory of a load test."""
+    by_step = defaultdict(list)
+    for result in results:
+        for rerun in result["reruns"]:
+            by_step[rerun[0]].append(rerun)
+    all_reruns = [rerun for reruns in by_step.values() for rerun in reruns]
+    session_bytes = np.array([sum(result["session_bytes"].values()) for result in results])
+    df_keys = pd.DataFrame([result["session_bytes"] for result in results]).fillna(0)
+    return {
+        "sessions": len(results),
+        "errors": [result["error"] for result in results if result["error"]],
+        "wall_s": wall_s,
+        "sessions_per_s": len(results) / wall_s,
+        "reruns_per_s": len(all_reruns) / wall_s,
+        "latency": {
+            "all": rerun_stats(all_reruns),
+            **{step: rerun_stats(reruns) for step, reruns in by_step.items()},
+        },
+        "session_kib": {
+            "mean": float(session_bytes.mean() / 1024),
+            "max": float(session_bytes.max() / 1024),
+            "by_key": (df_keys.mean() / 1024).sort_values(ascending=False).to_dict(),
+        },
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=20, help="Simulated sessions.")
+    parser.add_argument("--threads", type=int, help="Concurrent sessions. Defaults to all.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Firebase round trip.")
+    parser.add_argument("--history", type=int, default=100, help="Meal logs per user.")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between steps.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    backend = FakeBackend(latency_s=0.0)  # no latency while seeding
+    df_catalog = utils.get_menu_catalog()
+    emails = [seed_user(backend, i, args.history, df_catalog) for i in range(args.sessions)]
+    backend.latency_s = args.latency_ms / 1e3
+    patch_app(backend)
+
+    threads = args.threads or args.sessions
+    start_barrier = threading.Barrier(min(threads, args.sessions))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [
+            pool.submit(
+                run_session, backend, email, i, args.think_ms / 1e3, start_barrier, args.history
+            )
+            for i, email in enumerate(emails)
+        ]
+        results = [future.result() for future in futures]
+    summary = report(results, time.perf_counter() - start)
+
+    print(
+        f"{summary['sessions']} sessions ({threads} concurrent), Firebase latency "
+        f"{args.latency_ms:g} ms: {summary['sessions_per_s']:.2f} sessions/s, "
+        f"{summary['reruns_per_s']:.2f} reruns/s"
+    )
+    print(
+        f"{'step':<12}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+        f"{'reads':>8}{'writes':>8}"
+    )
+    for step, stats in summary["latency"].items():
+        if stats["reruns"]:
+            print(
+                f"{step:<12}{stats['reruns']:>8}{stats['p50_ms']:10.1f}{stats['p95_ms']:10.1f}"
+                f"{stats['p99_ms']:10.1f}{stats['max_ms']:10.1f}"
+                f"{stats['reads']:8.1f}{stats['writes']:8.1f}"
+            )
+    print(
+        f"session_state: {summary['session_kib']['mean']:.1f} KiB per session "
+        f"(max {summary['session_kib']['max']:.1f} KiB), peak RSS {summary['peak_rss_mib']:.0f} MiB"
+    )
+    for key, kib in list(summary["session_kib"]["by_key"].items())[:8]:
+        print(f"  {key:<36}{kib:8.1f} KiB")
+    for error in summary["errors"]:
+        print(f"ERROR {error}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    if summary["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
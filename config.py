@@ -1,12 +1,16 @@
 ## PATHS 
+import os
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent
 PATH_TO_NUTRITION_RDI = ROOT_DIR / "data/nutrition_rdi.csv"
+PATH_TO_MENU = ROOT_DIR / "data/menu_edr_dishes_only.json"
 PATH_TO_APP_USER_DATA = ROOT_DIR / "data/app_user_data.db"
 PATH_TO_CSS = ROOT_DIR / "styles/style.css"
 PATH_TO_LOTTIE = ROOT_DIR / "lottiefiles"
+PATH_TO_LOTTIE_CACHE = ROOT_DIR / ".cache/lottie"  # animations downloaded by load_lottieurl
 PATH_TO_IMAGES = ROOT_DIR / "images"
+PATH_TO_BACKGROUND = PATH_TO_IMAGES / "bg/background_opacity_100_new_bgcolor_shift.png"
 PATH_TO_HTML = ROOT_DIR / "apps/html"
 PATH_TO_HTML_CSS = ROOT_DIR / "apps/css"
 PATH_TO_FIREBASE_CONFIG = ROOT_DIR / "firebase"
@@ -14,6 +18,38 @@ PATH_TO_FIREBASE_CONFIG = ROOT_DIR / "firebase"
 # Firebase
 FIREBASE_APP_NAME = "streamlit-ourfood"
 
+## Static assets
+BACKGROUND_URL = os.environ.get("BACKGROUND_URL")  # background served elsewhere (default: see util.bg_image)
+ASSETS_RELOAD = os.environ.get("ASSETS_RELOAD") == "1"  # development: reload CSS/HTML files that changed
+LOTTIE_PRECISION = 3  # decimals kept of floats in minified lottie files
+LOTTIE_URL_TIMEOUT_S = 5  # timeout of lottie downloads
+LOTTIE_URL_CACHE_TTL_S = 7 * 24 * 3600  # downloaded lottie files are refreshed weekly
+
+## Warm-up
+READY_FILE = os.environ.get("READY_FILE", "/tmp/ourfood.ready")  # written once the server is warmed up
+
+## Profiling
+PROFILING = os.environ.get("PROFILING") == "1"  # time reruns (see util.profiling)
+PROFILING_LOG = os.environ.get("PROFILING_LOG", "/tmp/ourfood_profiling.jsonl")  # JSON line per rerun
+
+## Caches
+ANALYTICS_CACHE_MAX_BYTES = 64 * 1024 ** 2  # Analytics page summaries and figures
+
+## Organisation-wide dashboard
+ORG_DASHBOARD_MAX_WORKERS = 16  # concurrent Firestore reads when fanning out over users
+ORG_DASHBOARD_TTL_S = 10 * 60  # aggregates are recomputed at most every 10 minutes
+
+## Export
+EXPORT_PAGE_SIZE = 500  # meal logs read from Firestore/SQLite and written per page (Parquet row group)
+EXPORT_MAX_ROWS = 100_000  # larger exports are refused: the file is held in memory for the download
+
+## Charts
+CHART_WIDTH_PX = 1200  # width of a full-width chart in the wide page layout
+WEBGL_POINTS_THRESHOLD = 1000  # line charts of longer histories (before downsampling) use WebGL traces
+FIGURE_CACHE_SIZE = 256  # figures kept per memoized builder in util.plots
+FIGURE_CACHE_DECIMALS = 3  # float inputs are rounded to this many decimals before building
+NUTRITION_COMBINED_CHART = True  # one figure with the four nutrition donuts instead of four charts
+
 ## Menu
 MENU_BREAKFAST = ["粟米魚茸粥",
                   "白粥",
@@ -61,4 +97,12 @@ MENU_INTERNATIONAL = ['thai green curry brisket',
 MENU_DESSERT = ["乳酪",
                 "士多啤梨蛋糕",
                 "豆腐花",
-                "龜苓膏"]
\ No newline at end of file
+                "龜苓膏"]
+
+MENU_STATIONS = {
+    "Breakfast": MENU_BREAKFAST,
+    "Salad": MENU_SALAD_BAR,
+    "Asian": MENU_ASIAN,
+    "International": MENU_INTERNATIONAL,
+    "Dessert": MENU_DESSERT,
+}
@@ -0,0 +1,29 @@
+"""
+This script warms up the server and then starts the app in the same process.
+
+    python serve.py [streamlit run options, e.g. --server.port 8501]
+
+Running `streamlit run app.py` directly also works, the caches are then
+filled by the first sessions instead.
+"""
+
+import logging
+import sys
+
+from util import warmup
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    durations = warmup.warmup()
+    logging.info(
+        "Warm-up done: %s",
+        ", ".join(
+            f"{name} {'failed' if seconds is None else f'{seconds:.2f}s'}"
+            for name, seconds in durations.items()
+        ),
+    )
+
+    from streamlit import cli as stcli  # after warm-up, in the same process
+
+    sys.argv = ["streamlit", "run", "app.py"] + sys.argv[1:]
+    sys.exit(stcli.main())
@@ -1,2 +1,3 @@
 #!/bin/bash
-streamlit run --server.port 8501 --server.headless true app.py >/dev/null
\ No newline at end of file
+# Warm up the caches, then start streamlit in the same process
+python serve.py --server.port 8501 --server.headless true >/dev/null
\ No newline at end of file
@@ -0,0 +1,425 @@
+"""
+In-process stand-in for Firebase, to run the app's Firebase code paths offline
+in tests and in benchmarks.load_test.
+
+FakeBackend keeps the Firestore documents and the auth users in memory. Each
+call that would be a network round trip sleeps `latency_s` and is counted, with
+the documents it reads and writes, per operation and collection (document ids
+replaced by "*", e.g. ("stream", "usersmeallogs/*/meallogs")). Reads and writes
+are counted the way Firestore bills them: one read per document returned (at
+least one per query) and one write per document set or deleted.
+
+Its Firebase class has the interface of util.utils.Firebase (it only replaces
+the pyrebase app and the Firestore client), so check_user & co. run unchanged:
+
+    backend = FakeBackend(latency_s=0.02)
+    backend.add_user("someone@example.com", "password")
+    analytics.Firebase = backend.firebase_class()
+
+    with backend.budget(reads=3):  # AssertionError if the block reads more
+        analytics.main()
+
+Only the subset of the Firestore and pyrebase APIs used by the app is
+implemented: collection, document, get, set, delete, stream, list_documents,
+order_by/limit/start_after queries, batches, and email/password sign-in and
+create-user.
+"""
+
+import contextlib
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+from util.utils import Firebase
+
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+
+def collection_group(path):
+    """Collection path with the document ids replaced by "*", e.g. "usersmeallogs/*/meallogs"."""
+    return "/".join("*" if i % 2 else name for i, name in enumerate(path))
+
+
+@dataclass
+class OperationCounts:
+    """Round trips, documents read and documents written, per (operation, collection group)."""
+
+    round_trips: Counter = field(default_factory=Counter)
+    reads: Counter = field(default_factory=Counter)
+    writes: Counter = field(default_factory=Counter)
+
+    def add(self, operation, group, reads=0, writes=0):
+        key = (operation, group)
+        self.round_trips[key] += 1
+        if reads:
+            self.reads[key] += reads
+        if writes:
+            self.writes[key] += writes
+
+    def totals(self):
+        """(dict): Total round trips, reads and writes."""
+        return {
+            "round_trips": sum(self.round_trips.values()),
+            "reads": sum(self.reads.values()),
+            "writes": sum(self.writes.values()),
+        }
+
+    def check(self, reads=None, writes=None, round_trips=None):
+        """Raise AssertionError if a total is over its budget (None: no budget)."""
+        totals = self.totals()
+        budgets = {"reads": reads, "writes": writes, "round_trips": round_trips}
+        over = [
+            f"{name} {totals[name]} > {budget}"
+            for name, budget in budgets.items()
+            if budget is not None and totals[name] > budget
+        ]
+        if over:
+            raise AssertionError(f"Firebase budget exceeded: {', '.join(over)}\n{self}")
+
+    def __str__(self):
+        lines = []
+        for operation, group in sorted(self.round_trips):
+            key = (operation, group)
+            lines.append(
+                f"  {operation:<16}{group:<32}{self.round_trips[key]:>6} calls"
+                f"{self.reads[key]:>6} reads{self.writes[key]:>6} writes"
+            )
+        return "\n".join(lines)
+
+
+# ------------------------------------------------------------------
+# Firestore
+
+
+class DocumentSnapshot:
+    """Document read from the fake Firestore (to_dict() is None if it doesn't exist)."""
+
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return None if self._data is None else dict(self._data)
+
+    def get(self, field_path):
+        return self._data[field_path]
+
+
+class DocumentReference:
+    def __init__(self, backend, path):
+        self._backend = backend
+        self.path = path  # (collection, document, collection, document, ...)
+        self.id = path[-1]
+
+    def collection(self, name):
+        return CollectionReference(self._backend, self.path + (name,))
+
+    def get(self):
+        return DocumentSnapshot(self, self._backend.read(self.path))
+
+    def set(self, data, merge=False):
+        self._backend.commit([("set", self.path, dict(data), merge)])
+
+    def delete(self):
+        self._backend.commit([("delete", self.path, None, False)])
+
+
+class Query:
+    """order_by/limit/start_after query over the documents of a collection."""
+
+    def __init__(self, collection, orders=(), limit=None, start_after=None):
+        self._collection = collection
+        self._orders = orders  # ((field, direction), ...)
+        self._limit = limit
+        self._start_after = start_after
+
+    def _copy(self, **changes):
+        kwargs = dict(
+            orders=self._orders, limit=self._limit, start_after=self._start_after
+        )
+        kwargs.update(changes)
+        return Query(self._collection, **kwargs)
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, document_fields):
+        """Start after a DocumentSnapshot or a dict of the order_by fields."""
+        if isinstance(document_fields, DocumentSnapshot):
+            document_fields = document_fields.to_dict()
+        values = tuple(document_fields[field_path] for field_path, _ in self._orders)
+        return self._copy(start_after=values)
+
+    def _matches(self, items):
+        """Sort, skip and limit (document id, data) items like Firestore."""
+        for field_path, direction in reversed(self._orders):  # stable sorts: last key first
+            items = [item for item in items if field_path in item[1]]  # Firestore skips them
+            items.sort(key=lambda item: item[1][field_path], reverse=direction == DESCENDING)
+        if self._start_after is not None:
+            items = [
+                item
+                for item in items
+                if self._after(tuple(item[1][f] for f, _ in self._orders))
+            ]
+        return items[: self._limit] if self._limit is not None else items
+
+    def _after(self, values):
+        for value, cursor, (_, direction) in zip(values, self._start_after, self._orders):
+            if value != cursor:
+                return value > cursor if direction == ASCENDING else value < cursor
+        return False
+
+    def stream(self):
+        """Documents of the query (a single round trip)."""
+        collection = self._collection
+        items = collection._backend.query(collection.path, self._matches)
+        for doc_id, data in items:
+            yield DocumentSnapshot(collection.document(doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, backend, path):
+        super().__init__(self)
+        self._backend = backend
+        self.path = path  # (collection, document, ..., collection)
+        self.id = path[-1]
+
+    def document(self, document_id=None):
+        return DocumentReference(self._backend, self.path + (document_id or uuid.uuid4().hex,))
+
+    def list_documents(self):
+        """References to the documents of the collection, including the missing ones
+        that only have subcollections (as the Firestore API lists them)."""
+        for doc_id in self._backend.list_document_ids(self.path):
+            yield self.document(doc_id)
+
+
+class WriteBatch:
+    """Writes committed together in a single round trip."""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(("set", reference.path, dict(document_data), merge))
+
+    def delete(self, reference):
+        self._writes.append(("delete", reference.path, None, False))
+
+    def commit(self):
+        writes, self._writes = self._writes, []
+        if writes:
+            self._backend.commit(writes)
+
+
+class FakeFirestore:
+    """Firestore client of a FakeBackend."""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def collection(self, *collection_path):
+        path = tuple("/".join(collection_path).split("/"))
+        return CollectionReference(self._backend, path)
+
+    def batch(self):
+        return WriteBatch(self._backend)
+
+
+# ------------------------------------------------------------------
+# Auth
+
+
+class FakeAuth:
+    """pyrebase auth of a FakeBackend."""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def sign_in_with_email_and_password(self, email, password):
+        return self._backend.sign_in(email, password)
+
+    def create_user_with_email_and_password(self, email, password):
+        return self._backend.create_user(email, password)
+
+
+def auth_error(message):
+    """HTTPError as pyrebase raises it: strerror is the JSON error of the REST API."""
+    from requests.exceptions import HTTPError
+
+    return HTTPError(None, str({"error": {"code": 400, "message": message}}))
+
+
+# ------------------------------------------------------------------
+# Backend
+
+
+class FakeBackend:
+    """Thread-safe in-memory Firestore documents and auth users, with latency and counts."""
+
+    def __init__(self, latency_s=0.0):
+        """
+        Args:
+            latency_s (float, callable, optional): Time each round trip to Firebase takes,
+                or a function of the operation name returning it (e.g. random jitter).
+        """
+        self.latency_s = latency_s
+        self.counts = OperationCounts()  # since the backend was created, all threads
+        self._collections = {}  # collection path -> {document id: data}
+        self._users = {}  # email -> (password, user)
+        self._lock = threading.Lock()
+        self._active = []  # (OperationCounts, thread id or None for all) of the count() blocks
+
+    # ---- Latency and counts ----
+    def round_trip(self, operation, group, reads=0, writes=0):
+        latency_s = self.latency_s(operation) if callable(self.latency_s) else self.latency_s
+        if latency_s:
+            time.sleep(latency_s)
+        with self._lock:
+            self.counts.add(operation, group, reads, writes)
+            thread = threading.get_ident()
+            for counts, counted_thread in self._active:
+                if counted_thread is None or counted_thread == thread:
+                    counts.add(operation, group, reads, writes)
+
+    @contextlib.contextmanager
+    def count(self, this_thread=False):
+        """Count the Firebase calls made while the block runs.
+
+        Args:
+            this_thread (bool, optional): Only count the calls of the calling thread,
+                e.g. one of several concurrent sessions. Defaults to the calls of all
+                threads, including the workers the code under test starts.
+
+        Yields:
+            (OperationCounts): Filled as the calls are made.
+        """
+        entry = (OperationCounts(), threading.get_ident() if this_thread else None)
+        with self._lock:
+            self._active.append(entry)
+        try:
+            yield entry[0]
+        finally:
+            with self._lock:
+                self._active.remove(entry)
+
+    @contextlib.contextmanager
+    def budget(self, reads=None, writes=None, round_trips=None, this_thread=False):
+        """Assert that the block (see count) stays within a Firebase budget.
+
+        Args:
+            reads (int, optional): Maximum documents read.
+            writes (int, optional): Maximum documents written or deleted.
+            round_trips (int, optional): Maximum calls to Firebase.
+            this_thread (bool, optional): Only count the calls of the calling thread.
+
+        Yields:
+            (OperationCounts): Counts of the block.
+        """
+        with self.count(this_thread) as counts:
+            yield counts
+        counts.check(reads, writes, round_trips)
+
+    # ---- Firestore ----
+    def read(self, path):
+        with self._lock:
+            data = self._collections.get(path[:-1], {}).get(path[-1])
+        self.round_trip("get", collection_group(path[:-1]), reads=1)
+        return data
+
+    def query(self, path, matches):
+        """(document id, data) of the documents of a collection selected by `matches`."""
+        with self._lock:
+            items = list(self._collections.get(path, {}).items())
+        items = matches(sorted(items))
+        self.round_trip("stream", collection_group(path), reads=max(1, len(items)))
+        return items
+
+    def list_document_ids(self, path):
+        depth = len(path)
+        with self._lock:
+            ids = set(self._collections.get(path, {}))
+            ids.update(
+                other[depth]
+                for other, documents in self._collections.items()
+                if len(other) > depth and other[:depth] == path and documents
+            )
+        self.round_trip("list_documents", collection_group(path), reads=max(1, len(ids)))
+        return sorted(ids)
+
+    def commit(self, writes):
+        """Apply ("set" | "delete", path, data, merge) writes atomically."""
+        with self._lock:
+            for operation, path, data, merge in writes:
+                documents = self._collections.setdefault(path[:-1], {})
+                if operation == "delete":
+                    documents.pop(path[-1], None)
+                elif merge and path[-1] in documents:
+                    documents[path[-1]] = {**documents[path[-1]], **data}
+                else:
+                    documents[path[-1]] = data
+        operation = writes[0][0] if len(writes) == 1 else "batch"
+        groups = {collection_group(path[:-1]) for _, path, _, _ in writes}
+        self.round_trip(operation, groups.pop() if len(groups) == 1 else "*", writes=len(writes))
+
+    # ---- Auth ----
+    def add_user(self, email, password):
+        """Create an auth user without latency or counts (test setup).
+
+        Returns:
+            (dict): pyrebase user, with its "localId".
+        """
+        user = {
+            "kind": "identitytoolkit#SignupNewUserResponse",
+            "email": email,
+            "localId": uuid.uuid4().hex[:28],
+            "idToken": uuid.uuid4().hex,
+            "refreshToken": uuid.uuid4().hex,
+            "expiresIn": "3600",
+        }
+        with self._lock:
+            if email in self._users:
+                raise auth_error("EMAIL_EXISTS")
+            self._users[email] = (password, user)
+        return dict(user)
+
+    def create_user(self, email, password):
+        self.round_trip("create_user", "auth")
+        if len(password) < 6:
+            raise auth_error("WEAK_PASSWORD : Password should be at least 6 characters")
+        return self.add_user(email, password)
+
+    def sign_in(self, email, password):
+        self.round_trip("sign_in", "auth")
+        with self._lock:
+            stored_password, user = self._users.get(email, (None, None))
+        if user is None:
+            raise auth_error("EMAIL_NOT_FOUND")
+        if stored_password != password:
+            raise auth_error("INVALID_PASSWORD")
+        return dict(user, kind="identitytoolkit#VerifyPasswordResponse", registered=True)
+
+    def firebase_class(self):
+        """util.utils.Firebase subclass connected to this backend."""
+        backend = self
+
+        class FakeFirebase(Firebase):
+            def __init__(self):
+                self.auth = FakeAuth(backend)
+
+            def db(self):
+                return FakeFirestore(backend)
+
+        return FakeFirebase
@@ -0,0 +1,77 @@
+"""
+Tests of util.aggregator.PeriodAggregator.
+
+Adding or removing meal logs one by one must give the same totals as
+aggregating the whole meal log again with from_frame.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from util.aggregator import PERIODS, PeriodAggregator, period_start
+
+COLUMNS = ["CO2e", "Calories"]
+
+
+def meal_log(n_rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Datetime": pd.Timestamp("2022-01-27")
+            + pd.to_timedelta(np.sort(rng.integers(0, 60 * 86400, n_rows)), unit="s"),
+            "CO2e": rng.gamma(2.0, 0.5, n_rows),
+            "Calories": rng.normal(700, 150, n_rows),
+        }
+    )
+
+
+def assert_same_totals(aggregator, df, period):
+    pd.testing.assert_frame_equal(
+        aggregator.to_frame(),
+        PeriodAggregator.from_frame(df, period, COLUMNS).to_frame(),
+        check_freq=False,
+    )
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_add_matches_from_frame(period):
+    df = meal_log(200)
+    aggregator = PeriodAggregator(period, COLUMNS)
+    for row in df.itertuples(index=False):
+        aggregator.add(row.Datetime.to_pydatetime(), [row.CO2e, row.Calories])
+    assert_same_totals(aggregator, df, period)
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_remove_matches_from_frame(period):
+    df = meal_log(200)
+    aggregator = PeriodAggregator.from_frame(df, period, COLUMNS)
+    removed = df.iloc[::3]
+    for row in removed.itertuples(index=False):
+        aggregator.remove(row.Datetime.to_pydatetime(), [row.CO2e, row.Calories])
+    assert_same_totals(aggregator, df.drop(removed.index), period)
+
+
+def test_removing_the_last_meal_drops_the_period():
+    aggregator = PeriodAggregator("day", COLUMNS)
+    aggregator.add(datetime(2022, 3, 1, 12), [1.0, 500.0])
+    aggregator.remove(datetime(2022, 3, 1, 19), [1.0, 500.0])
+    assert aggregator.to_frame().empty
+
+
+@pytest.mark.parametrize(
+    "period, start",
+    [
+        ("day", datetime(2022, 3, 2)),
+        ("week", datetime(2022, 2, 28)),
+        ("month", datetime(2022, 3, 1)),
+    ],
+)
+def test_period_start(period, start):
+    assert period_start(datetime(2022, 3, 2, 18, 30), period) == start
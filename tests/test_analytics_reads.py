@@ -0,0 +1,59 @@
+"""
+Firestore read budgets of the Analytics page, on the in-process fake Firebase.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import pytest
+
+from apps import analytics
+from benchmarks import load_test
+from tests.fake_firebase import FakeBackend
+from util import utils
+
+HISTORY = 40  # meal logs of the user
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """Fake Firebase with one user of HISTORY meal logs, signed in a fake streamlit session."""
+    backend = FakeBackend()
+    email = load_test.seed_user(backend, 0, HISTORY, utils.get_menu_catalog())
+    monkeypatch.setattr(analytics, "st", load_test.StreamlitProxy())
+    monkeypatch.setattr(analytics, "Firebase", backend.firebase_class())
+    fake = load_test.FakeSession()
+    fake.session_state["firebase_user"] = backend.sign_in(email, load_test.PASSWORD)
+    load_test._local.session = fake
+    yield backend, fake
+    load_test._local.session = None
+
+
+def test_analytics_reads_each_meal_log_once(session):
+    backend, fake = session
+    localid = fake.session_state["firebase_user"]["localId"]
+    profile = backend.firebase_class()().check_user(localid)
+
+    with backend.budget(reads=HISTORY):
+        analytics.main(user_profile=profile)
+
+
+def test_analytics_reads_the_profile_when_not_given(session):
+    backend, _ = session
+    with backend.budget(reads=HISTORY + 1) as counts:
+        analytics.main()
+    assert counts.totals()["reads"] == HISTORY + 1
+
+
+def test_budget_counts_reads_of_worker_threads(session, monkeypatch):
+    from apps import org_dashboard
+
+    backend, _ = session
+    monkeypatch.setattr(org_dashboard, "Firebase", backend.firebase_class())
+    # get_org_aggregates reads the meal logs of each user in a thread pool
+    get_org_aggregates = getattr(
+        org_dashboard.get_org_aggregates, "__wrapped__", org_dashboard.get_org_aggregates
+    )
+    with pytest.raises(AssertionError, match="reads"):
+        with backend.budget(reads=HISTORY - 1):
+            get_org_aggregates()
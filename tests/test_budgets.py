@@ -0,0 +1,81 @@
+"""
+Tests of the budget adherence and streaks of util.budgets.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from util.budgets import (
+    BudgetAdherence,
+    budgets_from_profile,
+    calc_budget_adherence,
+    run_lengths,
+)
+
+
+@pytest.mark.parametrize(
+    "mask, lengths, starts",
+    [
+        ([], [], []),
+        ([False, False], [], []),
+        ([True, True, True], [3], [0]),
+        ([True, False, True, True, False, False, True], [1, 2, 1], [0, 2, 6]),
+    ],
+)
+def test_run_lengths(mask, lengths, starts):
+    got_lengths, got_starts, got_stops = run_lengths(np.array(mask, dtype=bool))
+    assert list(got_lengths) == lengths
+    assert list(got_starts) == starts
+    assert list(got_stops) == [start + length for start, length in zip(starts, lengths)]
+
+
+def daily(values):
+    """Daily CO2e totals from 2022-03-01, None for a day without logs."""
+    days = pd.date_range("2022-03-01", periods=len(values), freq="D")
+    logged = [value is not None for value in values]
+    return pd.DataFrame(
+        {"CO2e": [value for value in values if value is not None]}, index=days[logged]
+    )
+
+
+def test_streaks_and_overshoot():
+    adherence = calc_budget_adherence(daily([1, 2, 4, 1, 1, 1, 3, 2, 2]), {"CO2e": 2.5})
+
+    assert adherence == {
+        "CO2e": BudgetAdherence(
+            budget=2.5,
+            days_under=7,
+            days_over=2,
+            current_streak=2,
+            longest_streak=3,
+            average_overshoot=1.0,
+        )
+    }
+
+
+def test_day_without_logs_breaks_the_streak():
+    values = [1, 1, None, 1, 1, 1, None, 1]
+    adherence = calc_budget_adherence(daily(values), {"CO2e": 2.5})["CO2e"]
+    assert (adherence.days_under, adherence.days_over) == (6, 0)
+    assert (adherence.current_streak, adherence.longest_streak) == (1, 3)
+
+
+def test_current_streak_is_zero_after_a_day_over():
+    adherence = calc_budget_adherence(daily([1, 1, 3]), {"CO2e": 2.5})["CO2e"]
+    assert (adherence.current_streak, adherence.longest_streak) == (0, 2)
+
+
+def test_only_budgeted_metrics_in_the_totals():
+    budgets = {"CO2e": 2.5, "Calories": 2000, "Fat": None}
+    assert list(calc_budget_adherence(daily([1, 2]), budgets)) == ["CO2e"]
+    assert calc_budget_adherence(daily([]), budgets) == {}
+
+
+def test_budgets_from_profile():
+    profile = {"co2_budget": "2.72", "calories_budget": 2000, "fat_budget": None}
+    assert budgets_from_profile(profile) == {"CO2e": 2.72, "Calories": 2000.0}
+    assert budgets_from_profile(None) == {}
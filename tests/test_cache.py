@@ -0,0 +1,67 @@
+"""
+Tests of the byte-budget eviction of util.cache.MemoryBoundedCache.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+from util.cache import MemoryBoundedCache, estimate_size
+
+VALUE = b"x" * 1000
+SIZE = estimate_size(VALUE)
+
+
+def test_evicts_least_recently_used_beyond_the_budget():
+    cache = MemoryBoundedCache(max_bytes=3 * SIZE)
+    for key in "abc":
+        cache.set(key, VALUE)
+    cache.get("a")  # "b" is now the least recently used
+
+    cache.set("d", VALUE)
+
+    assert [key in cache for key in "abcd"] == [True, False, True, True]
+    assert cache.nbytes == 3 * SIZE
+
+
+def test_large_value_evicts_as_many_entries_as_needed():
+    cache = MemoryBoundedCache(max_bytes=3 * SIZE)
+    for key in "abc":
+        cache.set(key, VALUE)
+
+    large = b"x" * (2 * len(VALUE))
+    cache.set("large", large)
+
+    assert [key in cache for key in ("a", "b", "c", "large")] == [False, False, True, True]
+    assert cache.nbytes == SIZE + estimate_size(large) <= cache.max_bytes
+
+
+def test_value_larger_than_the_budget_is_not_cached():
+    cache = MemoryBoundedCache(max_bytes=2 * SIZE)
+    cache.set("a", VALUE)
+
+    cache.set("huge", b"x" * (3 * len(VALUE)))
+
+    assert "huge" not in cache
+    assert "a" in cache and cache.nbytes == SIZE
+
+
+def test_replacing_a_key_updates_its_size():
+    cache = MemoryBoundedCache(max_bytes=10 * SIZE)
+    cache.set("a", VALUE)
+    cache.set("a", b"x" * (2 * len(VALUE)))
+
+    assert len(cache) == 1
+    assert cache.nbytes == estimate_size(b"x" * (2 * len(VALUE)))
+
+
+def test_get_or_compute_computes_once():
+    cache = MemoryBoundedCache(max_bytes=10 * SIZE)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return VALUE
+
+    assert cache.get_or_compute("a", compute) == VALUE
+    assert cache.get_or_compute("a", compute) == VALUE
+    assert len(calls) == 1
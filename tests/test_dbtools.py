@@ -0,0 +1,120 @@
+"""
+Tests of the SQLite meal log tables of util.utils.DBTools.
+
+Pins the triggers that keep `usersdailysummary` in step with `usersmeallogs`,
+the backfill of meal logs written before the triggers existed, and the covering
+index of the range queries. Each test runs on a fresh in-memory database.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from util.utils import DBTools
+
+
+@pytest.fixture
+def db(monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    monkeypatch.setattr(DBTools, "conn", conn)
+    monkeypatch.setattr(DBTools, "c", conn.cursor())
+    DBTools.create_usersmeallogs()
+    DBTools.create_usersdailysummary()
+    yield conn
+    conn.close()
+
+
+def add_meal(username, when, co2, calories=500.0):
+    DBTools.add_usermealdata(
+        username, when, "Meat", "beef stew", "200", co2, calories, 50.0, 30.0, 20.0
+    )
+
+
+def summary(username):
+    """{day: (nmeals, co2, calories)} of a user's daily summary."""
+    return {
+        day: (nmeals, pytest.approx(co2), pytest.approx(calories))
+        for day, nmeals, co2, calories, *_ in DBTools.view_userdailysummary(username)
+    }
+
+
+def test_insert_adds_to_the_day(db):
+    add_meal("alice", "2022-03-01 08:00:00", 1.0)
+    add_meal("alice", "2022-03-01 19:30:00", 2.5)
+    add_meal("alice", "2022-03-02 12:00:00", 0.5)
+    add_meal("bob", "2022-03-01 12:00:00", 4.0)
+
+    assert summary("alice") == {
+        "2022-03-01": (2, 3.5, 1000.0),
+        "2022-03-02": (1, 0.5, 500.0),
+    }
+    assert summary("bob") == {"2022-03-01": (1, 4.0, 500.0)}
+
+
+def test_delete_subtracts_and_drops_empty_days(db):
+    add_meal("alice", "2022-03-01 08:00:00", 1.0)
+    add_meal("alice", "2022-03-01 19:30:00", 2.5)
+    add_meal("alice", "2022-03-02 12:00:00", 0.5)
+
+    DBTools.delete_user_meal_log("alice", "2022-03-01 08:00:00")
+    DBTools.delete_user_meal_log("alice", "2022-03-02 12:00:00")
+
+    assert summary("alice") == {"2022-03-01": (1, 2.5, 500.0)}
+
+
+def test_update_moves_the_meal_to_its_new_day(db):
+    add_meal("alice", "2022-03-01 08:00:00", 1.0)
+    add_meal("alice", "2022-03-02 12:00:00", 0.5)
+
+    DBTools.c.execute(
+        "UPDATE usersmeallogs SET datetime=?,co2=? WHERE username=? AND datetime=?",
+        ("2022-03-02 08:00:00", 2.0, "alice", "2022-03-01 08:00:00"),
+    )
+
+    assert summary("alice") == {"2022-03-02": (2, 2.5, 1000.0)}
+
+
+def test_backfill_of_logs_written_before_the_triggers(monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    monkeypatch.setattr(DBTools, "conn", conn)
+    monkeypatch.setattr(DBTools, "c", conn.cursor())
+    DBTools.create_usersmeallogs()
+    add_meal("alice", "2022-03-01 08:00:00", 1.0)
+    add_meal("alice", "2022-03-01 19:30:00", 2.5)
+
+    DBTools.create_usersdailysummary()
+    assert summary("alice") == {"2022-03-01": (2, 3.5, 1000.0)}
+
+    DBTools.create_usersdailysummary()  # no second backfill on the next start
+    assert summary("alice") == {"2022-03-01": (2, 3.5, 1000.0)}
+
+
+def test_summary_totals_match_the_meal_logs(db):
+    now = datetime.now()
+    add_meal("alice", now.strftime("%Y-%m-%d 00:00:01"), 1.0)
+    add_meal("alice", now.strftime("%Y-%m-%d 00:00:02"), 2.0)
+    add_meal("alice", "2001-01-01 12:00:00", 4.0)
+
+    assert DBTools.view_usersummary_today("alice")[:2] == pytest.approx((2, 3.0))
+    assert DBTools.view_usersummary_this_month("alice")[:2] == pytest.approx((2, 3.0))
+    assert DBTools.view_usersummary_total("alice")[:3] == pytest.approx((2, 3, 7.0))
+
+
+def test_range_query_is_index_only(db):
+    add_meal("alice", "2022-03-01 08:00:00", 1.0)
+    add_meal("alice", "2022-03-05 08:00:00", 2.0)
+    start, _ = DBTools.view_usermeallog_range("alice")[0][:2]
+
+    rows = DBTools.view_usermeallog_range("alice", start + 1)
+    assert [row[2] for row in rows] == [2.0]
+
+    plan = db.execute(
+        "EXPLAIN QUERY PLAN SELECT epoch,daynum,co2,calories,carbs,protein,fat "
+        "FROM usersmeallogs WHERE username=? AND epoch>=? AND epoch<? ORDER BY epoch",
+        ("alice", 0, 2**62),
+    ).fetchall()
+    assert "COVERING INDEX usersmeallogs_username_epoch" in " ".join(row[-1] for row in plan)
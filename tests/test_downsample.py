@@ -0,0 +1,78 @@
+"""
+Tests of the downsampling of util.downsample.
+
+Both methods must keep the first and last point (the chart spans the whole
+history) and return increasing indices (the line is drawn in x order).
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from util.downsample import downsample_for_plot, lttb_indices, minmax_indices
+
+
+def series(n):
+    rng = np.random.default_rng(0)
+    return np.arange(n, dtype=float), rng.gamma(2.0, 0.5, n)
+
+
+def assert_endpoints_and_increasing(indices, n):
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.parametrize("n, n_out", [(1000, 100), (1000, 3), (101, 100), (10, 9)])
+def test_lttb_keeps_endpoints_and_is_increasing(n, n_out):
+    x, y = series(n)
+    indices = lttb_indices(x, y, n_out)
+    assert len(indices) == n_out
+    assert_endpoints_and_increasing(indices, n)
+
+
+def test_lttb_keeps_a_spike():
+    x, y = series(1000)
+    y[500] = 100.0
+    assert 500 in lttb_indices(x, y, 50)
+
+
+@pytest.mark.parametrize("n_out", [2, 10, 20])
+def test_lttb_returns_all_points_when_there_is_nothing_to_drop(n_out):
+    x, y = series(10)
+    np.testing.assert_array_equal(lttb_indices(x, y, n_out), np.arange(10))
+
+
+@pytest.mark.parametrize("n, n_buckets", [(1000, 50), (1001, 7), (25, 12)])
+def test_minmax_keeps_endpoints_and_is_increasing(n, n_buckets):
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(n, 3))
+    values[::17, 1] = np.nan
+    indices = minmax_indices(values, n_buckets)
+    assert len(indices) <= 2 * 3 * n_buckets + 2
+    assert_endpoints_and_increasing(indices, n)
+
+
+def test_minmax_keeps_the_peaks_of_every_series():
+    values = np.zeros((1000, 2))
+    values[123, 0] = 5.0
+    values[877, 1] = -5.0
+    indices = minmax_indices(values, 20)
+    assert {123, 877} <= set(indices)
+
+
+def test_downsample_for_plot_sorts_and_fits_the_width():
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "Datetime": pd.date_range("2022-01-01", periods=n, freq="8h"),
+            "CO2e": series(n)[1],
+        }
+    ).sample(frac=1, random_state=0)
+    out = downsample_for_plot(df, x="Datetime", y="CO2e", width_px=300)
+    assert len(out) == 300
+    assert out["Datetime"].is_monotonic_increasing
+    assert out["Datetime"].iloc[0] == df["Datetime"].min()
+    assert out["Datetime"].iloc[-1] == df["Datetime"].max()
@@ -0,0 +1,89 @@
+"""
+Tests of the incremental refit of util.forecast.CO2Forecaster.
+
+Feeding the completed days one update at a time must leave the model in the
+same state as fitting the whole history at once, and an edit of a day that
+was already fed must refit it from scratch.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from util.forecast import CO2Forecaster
+
+
+def daily_totals(n_days):
+    rng = np.random.default_rng(0)
+    days = pd.date_range("2022-01-03", periods=n_days, freq="D")
+    daily = pd.Series(rng.gamma(2.0, 1.0, n_days), index=days)
+    return daily.drop(days[5::9])  # days without logs
+
+
+def fitted(daily, today):
+    forecaster = CO2Forecaster()
+    forecaster.update(daily, today)
+    return forecaster
+
+
+def assert_same_state(forecaster, expected):
+    assert forecaster.last_day == expected.last_day
+    assert forecaster.level == pytest.approx(expected.level)
+    np.testing.assert_allclose(forecaster.weekday_effect, expected.weekday_effect)
+    assert forecaster.fitted_total == pytest.approx(expected.fitted_total)
+
+
+def test_incremental_updates_match_a_full_fit():
+    daily = daily_totals(60)
+    today = pd.Timestamp("2022-03-04")
+    forecaster = CO2Forecaster()
+    for day in pd.date_range(end=today, periods=11, freq="5D"):  # an update every 5 days
+        forecaster.update(daily[daily.index <= day], day)
+
+    assert_same_state(forecaster, fitted(daily, today))
+
+
+@pytest.mark.parametrize("edit", ["add", "delete", "change"])
+def test_edit_of_a_fed_day_refits(edit):
+    daily = daily_totals(60)
+    today = pd.Timestamp("2022-02-20")
+    forecaster = fitted(daily, today)
+
+    edited = daily.copy()
+    if edit == "add":
+        edited[pd.Timestamp("2022-01-08")] = 5.0  # a day without logs until now
+        edited = edited.sort_index()
+    elif edit == "delete":
+        edited = edited.drop(pd.Timestamp("2022-01-20"))
+    else:
+        edited[pd.Timestamp("2022-02-01")] += 1.0
+    later = today + pd.Timedelta(days=3)
+    forecaster.update(edited, later)
+
+    assert_same_state(forecaster, fitted(edited, later))
+
+
+def test_no_completed_day_resets():
+    daily = daily_totals(10)
+    forecaster = fitted(daily, pd.Timestamp("2022-01-20"))
+    forecaster.update(daily[daily.index >= "2022-01-10"], pd.Timestamp("2022-01-10"))
+    assert forecaster.level is None and forecaster.last_day is None
+    assert forecaster.predict(pd.Timestamp("2022-01-10")) == 0.0
+
+
+def test_forecast_adds_predictions_of_the_remaining_days():
+    daily = daily_totals(60)
+    today = pd.Timestamp("2022-02-20")
+    forecaster = fitted(daily, today)
+    forecast = forecaster.forecast(daily, today)
+
+    past = daily["2022-02-01":"2022-02-19"].sum()
+    expected_today = max(daily.get(today, 0.0), forecaster.predict(today))
+    remaining = pd.date_range("2022-02-21", "2022-02-28", freq="D")
+    assert forecast.month_end == pytest.approx(
+        past + expected_today + forecaster.predict_days(remaining).sum()
+    )
+    assert forecast.year_end > forecast.month_end
@@ -0,0 +1,68 @@
+"""
+Tests of util.meal_logs.explode_meal_logs and rank_dish_contributions.
+
+Dishes missing from the menu catalog (renamed or removed since they were
+logged) stay in the exploded rows with NaN metrics, so per-dish counts still
+see them, and are left out of the metric rankings.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+
+from util.meal_logs import (
+    CATALOG_PER_100G_COLUMNS,
+    explode_meal_logs,
+    rank_dish_contributions,
+)
+
+CATALOG = pd.DataFrame(
+    {
+        "MenuItemName": ["豆腐花", "beef stew", "rice"],
+        **{
+            column: [per_100g] * 3
+            for per_100g, column in zip(
+                [1.0, 100.0, 10.0, 5.0, 2.0], CATALOG_PER_100G_COLUMNS.values()
+            )
+        },
+    }
+)
+CATALOG["CarbonLabelMenuItemPer100g"] = [0.5, 2.0, 0.2]
+
+MEAL_LOGS = pd.DataFrame(
+    {
+        "Datetime": pd.to_datetime(["2022-03-01 12:00", "2022-03-02 12:00", "2022-03-03 12:00"]),
+        "DishNames": ["beef stew;rice", "old special;豆腐花", "old special;rice;rice"],
+        "Amount": ["200;100", "150;50", "100;100"],  # the last log is malformed
+    }
+)
+
+
+def test_explode_keeps_unknown_dishes_with_nan_metrics():
+    df = explode_meal_logs(MEAL_LOGS, CATALOG)
+
+    assert list(df["Log"]) == [0, 0, 1, 1]
+    assert list(df["DishName"].astype(str)) == ["beef stew", "rice", "old special", "豆腐花"]
+    assert list(df["DishName"].cat.categories) == ["豆腐花", "beef stew", "rice", "old special"]
+    assert list(df["Grams"]) == [200, 100, 150, 50]
+    np.testing.assert_allclose(df["CO2e"], [4.0, 0.2, np.nan, 0.25])
+    unknown = df[df["DishName"] == "old special"]
+    assert unknown[list(CATALOG_PER_100G_COLUMNS)].isna().all(axis=None)
+    assert list(df["Station"]) == ["Other", "Other", "Other", "Dessert"]
+
+
+def test_explode_without_unknown_dishes_keeps_the_catalog_categories():
+    df = explode_meal_logs(MEAL_LOGS.iloc[:1], CATALOG)
+    assert list(df["DishName"].cat.categories) == list(CATALOG["MenuItemName"])
+    assert df["CO2e"].notna().all()
+
+
+def test_rank_drops_unknown_dishes():
+    df_rank = rank_dish_contributions(explode_meal_logs(MEAL_LOGS, CATALOG))
+
+    assert list(df_rank.index) == ["beef stew", "豆腐花", "rice"]
+    np.testing.assert_allclose(df_rank["CO2e"], [4.0, 0.25, 0.2])
+    assert np.isclose(df_rank["Share"].sum(), 1.0)
+    assert list(df_rank["Servings"]) == [1, 1, 1]
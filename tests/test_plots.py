@@ -0,0 +1,111 @@
+"""
+Checks of the figures built by util.plots.
+
+Each builder is run through what st.plotly_chart does with its result
+(plotly.tools.return_figure_from_figure_or_data), cached figures must come out
+of it unchanged, as they are shared between sessions.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.tools
+import pytest
+
+import config
+from util import plots
+
+
+def meal_log(n_rows):
+    """Meal log with n_rows meals, one every 8 hours."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Datetime": pd.date_range("2022-01-01", periods=n_rows, freq=pd.Timedelta(hours=8)),
+            "CO2e": rng.gamma(2.0, 0.5, n_rows),
+            "Calories": rng.normal(700, 150, n_rows),
+            "Carbs": rng.normal(80, 20, n_rows),
+            "Fat": rng.normal(25, 8, n_rows),
+            "Protein": rng.normal(30, 10, n_rows),
+        }
+    )
+
+
+SHORT_HISTORY = meal_log(50)
+LONG_HISTORY = meal_log(config.WEBGL_POINTS_THRESHOLD + 1)  # WebGL traces
+
+# Memoized builders, called through the cache and as .uncached
+MEMOIZED_CASES = {
+    "donut_chart_carbon": (
+        plots.donut_chart_carbon,
+        (("Beef", "Rice", "Onion"), (2.5, 0.3, 0.1)),
+    ),
+    "gauge_chart_carbon": (plots.gauge_chart_carbon, (0.8, 3.2, "4")),
+    "gauge_chart_carbon_budget": (plots.gauge_chart_carbon_budget, (1.8, 4.08, 2.72)),
+    "donut_chart_nutrition": (
+        plots.donut_chart_nutrition,
+        (123.4, 2000, "Energy", "serving", ("lightsalmon", "lightgray")),
+    ),
+    "donut_chart_nutrition_combined": (
+        plots.donut_chart_nutrition_combined,
+        (
+            (650.0, 80.0, 30.0, 25.0),
+            (2000, 275, 50, 78),
+            ("Energy", "Carbs", "Protein", "Fat"),
+            "serving",
+            ("lightsalmon", "lightblue", "lightgreen", "khaki"),
+        ),
+    ),
+}
+
+# Line chart builders over a short (SVG) and a long (WebGL) history
+LINE_CASES = {
+    f"{builder.__name__}[{len(df)}]": (builder, df)
+    for builder in (plots.plot_user_CO2e, plots.plot_user_calories, plots.plot_user_macros)
+    for df in (SHORT_HISTORY, LONG_HISTORY)
+}
+
+
+def render(figure):
+    """What st.plotly_chart does with a figure before serializing it."""
+    return plotly.tools.return_figure_from_figure_or_data(figure, True)
+
+
+@pytest.mark.parametrize("name", MEMOIZED_CASES)
+@pytest.mark.parametrize("cached", [True, False], ids=["memoized", "uncached"])
+def test_memoized_figure_renders(name, cached):
+    builder, args = MEMOIZED_CASES[name]
+    build = builder if cached else builder.uncached
+    for _ in range(2):  # build, then hit the cache
+        figure = build(*args)
+        assert isinstance(figure, go.Figure)
+        render(figure)
+
+
+@pytest.mark.parametrize("name", MEMOIZED_CASES)
+def test_memoized_figure_is_not_changed_by_rendering(name):
+    builder, args = MEMOIZED_CASES[name]
+    figure = builder(*args)
+    before = figure.to_dict()
+    render(figure)
+    assert builder(*args) is figure
+    assert figure.to_dict() == before
+
+
+@pytest.mark.parametrize("name", LINE_CASES)
+def test_line_figure_renders(name):
+    builder, df = LINE_CASES[name]
+    figure = builder(df)
+    render(figure)
+    expected = "scattergl" if len(df) > config.WEBGL_POINTS_THRESHOLD else "scatter"
+    assert {trace.type for trace in figure.data} == {expected}
+
+
+def test_gauge_chart_carbon_multidish_renders(monkeypatch):
+    monkeypatch.setattr(
+        plots.st, "session_state", {"max_CO2": 4.08, "daily_food_CO2_budget": 2.72}
+    )
+    render(plots.gauge_chart_carbon_multidish(1.8))
@@ -0,0 +1,45 @@
+"""
+Tests of the RDI record of util.rdi.
+
+NutritionRDI.vector() is compared element-wise with the nutrition values of a
+dish (calories, carbs, fat, protein), so its order is pinned here against the
+raw columns of the RDI file.
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import csv
+
+import numpy as np
+
+import config
+from util.rdi import NUTRITION_ORDER, RAW_COLUMNS, NutritionRDI, load_rdi
+
+
+def raw_row():
+    with open(config.PATH_TO_NUTRITION_RDI, newline="", encoding="utf-8-sig") as f:
+        return next(csv.DictReader(f))
+
+
+def test_vector_is_in_the_order_of_the_dish_nutrition_values():
+    assert NUTRITION_ORDER == ("energy_kcal", "carbs_g", "fat_g", "protein_g")
+    row = raw_row()
+    expected = [
+        float(row[column])
+        for column in ("Energ_Kcal", "Carbohydrt_(g)", "Lipid_Tot_(g)", "Protein_(g)")
+    ]
+    np.testing.assert_array_equal(load_rdi().vector(), expected)
+
+
+def test_every_field_maps_to_a_column_of_the_file():
+    assert list(RAW_COLUMNS) == list(NutritionRDI._fields)
+    assert set(RAW_COLUMNS.values()) <= set(raw_row())
+
+
+def test_empty_cells_are_none():
+    rdi = load_rdi()
+    row = raw_row()
+    for field, column in RAW_COLUMNS.items():
+        if field != "source":
+            assert (getattr(rdi, field) is None) == (row[column].strip() == "")
@@ -0,0 +1,127 @@
+"""
+This module keeps running totals of meal log metrics per day, week or month.
+
+New or deleted meal logs only update the bucket they fall in, so the
+period views don't have to resample the whole history on every change.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+PERIODS = ["day", "week", "month"]
+
+
+def period_start(when, period):
+    """Start date of the day, week (Monday) or month containing `when`.
+
+    Args:
+        when (datetime): Time of the meal.
+        period (str): One of PERIODS.
+
+    Returns:
+        (datetime): Midnight at the start of the period.
+    """
+    day = datetime(when.year, when.month, when.day)
+    if period == "day":
+        return day
+    elif period == "week":
+        return day - timedelta(days=day.weekday())
+    elif period == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Period must be one of {PERIODS}")
+
+
+class PeriodAggregator:
+    """Running sums of meal log metrics per period."""
+
+    def __init__(self, period, columns):
+        """
+        Args:
+            period (str): One of PERIODS.
+            columns (list): Names of the metrics to sum, e.g. ["CO2e", "Calories"].
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Period must be one of {PERIODS}")
+        self.period = period
+        self.columns = list(columns)
+        self._sums = {}  # period start -> np.ndarray of sums
+        self._counts = {}  # period start -> number of meals
+
+    @classmethod
+    def from_frame(cls, df, period, columns, datetime_column="Datetime"):
+        """Fill a new aggregator from a whole meal log at once (vectorised).
+
+        Args:
+            df (pd.DataFrame): User's meal log dataframe.
+            period (str): One of PERIODS.
+            columns (list): Names of the metrics to sum.
+            datetime_column (str, optional): Column with the meal datetimes. Defaults to "Datetime".
+
+        Returns:
+            (PeriodAggregator): Aggregator holding the totals of `df`.
+        """
+        aggregator = cls(period, columns)
+        day = df[datetime_column].dt.normalize()
+        if period == "week":
+            start = day - pd.to_timedelta(day.dt.weekday, unit="D")
+        elif period == "month":
+            start = day - pd.to_timedelta(day.dt.day - 1, unit="D")
+        else:
+            start = day
+        grouped = df[aggregator.columns].groupby(start)
+        sums = grouped.sum()
+        counts = grouped.size()
+        for key, values, count in zip(sums.index, sums.values, counts.values):
+            aggregator._sums[key.to_pydatetime()] = values.astype(float)
+            aggregator._counts[key.to_pydatetime()] = int(count)
+        return aggregator
+
+    def add(self, when, values):
+        """Add one meal log to the bucket containing `when`.
+
+        Args:
+            when (datetime): Time of the meal.
+            values (array): Metric values in the order of `columns`.
+        """
+        key = period_start(when, self.period)
+        values = np.asarray(values, dtype=float)
+        if key in self._sums:
+            self._sums[key] = self._sums[key] + values
+            self._counts[key] += 1
+        else:
+            self._sums[key] = values
+            self._counts[key] = 1
+
+    def remove(self, when, values):
+        """Remove one meal log from the bucket containing `when`.
+
+        Args:
+            when (datetime): Time of the meal.
+            values (array): Metric values in the order of `columns`.
+        """
+        key = period_start(when, self.period)
+        if key not in self._sums:
+            return
+        self._counts[key] -= 1
+        if self._counts[key] <= 0:
+            del self._sums[key]
+            del self._counts[key]
+        else:
+            self._sums[key] = self._sums[key] - np.asarray(values, dtype=float)
+
+    def to_frame(self):
+        """Totals per period.
+
+        Returns:
+            (pd.DataFrame): One row per period (sorted), with the metric sums and a "Meals" count.
+        """
+        keys = sorted(self._sums)
+        df = pd.DataFrame(
+            [self._sums[key] for key in keys],
+            index=pd.DatetimeIndex(keys, name="Period"),
+            columns=self.columns,
+        )
+        df["Meals"] = [self._counts[key] for key in keys]
+        return df
@@ -0,0 +1,106 @@
+"""
+This module keeps the static CSS and HTML assets of the app in memory.
+
+Every asset is read and minified once when the module is imported,
+so reruns don't touch the disk. With config.ASSETS_RELOAD (development), an
+asset whose file changed since it was loaded is loaded again.
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import config
+
+
+@dataclass(frozen=True)
+class Asset:
+    """A minified static asset.
+
+    Attributes:
+        path (Path): Source file.
+        text (str): Minified content.
+        mtime_ns (int): Modification time of the source file when it was loaded.
+    """
+
+    path: Path
+    text: str
+    mtime_ns: int
+
+
+def minify_css(text):
+    """Strip comments and the whitespace that has no meaning in CSS."""
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    return text.replace(";}", "}").strip()
+
+
+def minify_html(text):
+    """Collapse whitespace, dropping it between tags."""
+    text = re.sub(r">\s+<", "><", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# File suffix -> minifier
+MINIFIERS = {".css": minify_css, ".html": minify_html}
+
+# Asset name -> source file
+ASSET_PATHS = {
+    "style.css": config.PATH_TO_CSS,
+    "home.css": config.PATH_TO_HTML_CSS / "home.css",
+    "design_your_meal.css": config.PATH_TO_HTML_CSS / "design_your_meal.css",
+    "home.html": config.PATH_TO_HTML / "home.html",
+    "login.html": config.PATH_TO_HTML / "login.html",
+    "signup.html": config.PATH_TO_HTML / "signup.html",
+}
+
+
+def load_asset(path):
+    """Read and minify an asset file.
+
+    Args:
+        path (str, Path): Asset file.
+
+    Returns:
+        (Asset): The loaded asset.
+    """
+    path = Path(path)
+    mtime_ns = path.stat().st_mtime_ns
+    text = path.read_text(encoding="utf-8")
+    minify = MINIFIERS.get(path.suffix)
+    if minify is not None:
+        text = minify(text)
+    return Asset(path=path, text=text, mtime_ns=mtime_ns)
+
+
+class AssetRegistry:
+    """Static assets by name, loaded once."""
+
+    def __init__(self, paths, reload=False):
+        """
+        Args:
+            paths (dict): Asset name -> source file.
+            reload (bool, optional): Reload assets whose file changed. Defaults to False.
+        """
+        self.reload = reload
+        self._assets = {name: load_asset(path) for name, path in paths.items()}
+
+    def get(self, name):
+        """Asset by name (reloaded first if its file changed and reload is on)."""
+        asset = self._assets[name]
+        if self.reload and asset.path.stat().st_mtime_ns != asset.mtime_ns:
+            asset = load_asset(asset.path)
+            self._assets[name] = asset  # atomic, no lock needed
+        return asset
+
+    def text(self, name):
+        """Minified content of an asset."""
+        return self.get(name).text
+
+    def style(self, name):
+        """A CSS asset as a <style> block for st.markdown."""
+        return f"<style>{self.get(name).text}</style>"
+
+
+ASSETS = AssetRegistry(ASSET_PATHS, reload=config.ASSETS_RELOAD)
@@ -1,23 +1,145 @@
-import streamlit as st
+"""
+This module sets the background image of the app.
+
+The background is referenced by URL, so browsers download it once and cache
+it. Streamlit 1.4 has no option to serve the app's own files, but it serves
+everything in its package's static folder, so the build step recompresses the
+image to WebP and copies it there (under STATIC_DIR_NAME):
+
+    python -m util.bg_image
+
+config.BACKGROUND_URL (e.g. a CDN or the reverse proxy in front of the app)
+takes precedence. When neither is available (e.g. `streamlit run` without the
+build step), the image is inlined as a data URI built once per process.
+"""
+
 import base64
+import functools
+import hashlib
+import shutil
+import sys
+from pathlib import Path
+
+import streamlit as st
+import config
+
+MIME_TYPES = {".png": "image/png", ".webp": "image/webp", ".jpg": "image/jpeg"}
+
+STATIC_DIR_NAME = "ourfood"  # folder of the app's files in streamlit's static folder
+
+
+def compressed_path(image_file):
+    """Path of the build-time WebP version of an image."""
+    return Path(image_file).with_suffix(".webp")
+
+
+def static_path(image_file):
+    """Path of the copy of an image served by streamlit (at /STATIC_DIR_NAME/<name>)."""
+    from streamlit import file_util
+
+    return Path(file_util.get_static_dir()) / STATIC_DIR_NAME / compressed_path(image_file).name
+
+
+@functools.lru_cache(maxsize=None)
+def background_url(image_file):
+    """URL the background image is served at, or None to inline it.
+
+    Args:
+        image_file (str): Path to the background image.
+
+    Returns:
+        (str, None): config.BACKGROUND_URL, else the URL of the copy installed in
+            streamlit's static folder (relative to the page, versioned by its
+            content so it can be cached), else None.
+    """
+    if config.BACKGROUND_URL:
+        return config.BACKGROUND_URL
+    path = static_path(image_file)
+    if not path.exists():
+        return None
+    digest = hashlib.sha1(path.read_bytes()).hexdigest()[:12]
+    return f"{STATIC_DIR_NAME}/{path.name}?v={digest}"
+
 
-@st.cache(allow_output_mutation=True)
+@functools.lru_cache(maxsize=None)
 def get_base64_of_bin_file(bin_file):
-    with open(bin_file, 'rb') as f:
+    with open(bin_file, "rb") as f:
         data = f.read()
     return base64.b64encode(data).decode()
 
-def set_png_as_page_bg(png_file):
-    bin_str = get_base64_of_bin_file(png_file)
-    page_bg_img = '''
+
+@functools.lru_cache(maxsize=None)
+def background_css(image_file, url=None):
+    """CSS setting the background of the app, built once per image and url.
+
+    Args:
+        image_file (str): Path to the background image.
+        url (str, optional): URL the image is served at. Defaults to inlining the image.
+
+    Returns:
+        (str): <style> block.
+    """
+    if url is None:
+        path = Path(image_file)
+        if compressed_path(path).exists():
+            path = compressed_path(path)
+        url = f"data:{MIME_TYPES[path.suffix]};base64,{get_base64_of_bin_file(str(path))}"
+    return """
     <style>
     .stApp {
-    background-image: url("data:image/png;base64,%s");
+    background-image: url("%s");
     background-size: cover;
     background-repeat: no-repeat;
     }
     </style>
-    ''' % bin_str
-    
-    st.markdown(page_bg_img, unsafe_allow_html=True)
-    return
\ No newline at end of file
+    """ % url
+
+
+def set_png_as_page_bg(png_file):
+    st.markdown(
+        background_css(str(png_file), background_url(str(png_file))),
+        unsafe_allow_html=True,
+    )
+    return
+
+
+def recompress(image_file, quality=80):
+    """Write a WebP version of an image next to it (build step).
+
+    Args:
+        image_file (str): Path to the image.
+        quality (int, optional): WebP quality. Defaults to 80.
+
+    Returns:
+        (Path): Path to the WebP image.
+    """
+    from PIL import Image  # installed with streamlit
+
+    output = compressed_path(image_file)
+    with Image.open(image_file) as image:
+        image.save(output, "WEBP", quality=quality, method=6)
+    return output
+
+
+def install_static(image_file):
+    """Copy the WebP version of an image into streamlit's static folder (build step).
+
+    Args:
+        image_file (str): Path to the image.
+
+    Returns:
+        (Path): Path to the copy served by streamlit.
+    """
+    output = static_path(image_file)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(compressed_path(image_file), output)
+    return output
+
+
+if __name__ == "__main__":
+    for image_file in sys.argv[1:] or [config.PATH_TO_BACKGROUND]:
+        output = recompress(image_file)
+        print(
+            f"{image_file}: {Path(image_file).stat().st_size} B -> "
+            f"{output}: {output.stat().st_size} B, served from {install_static(image_file)}"
+        )
@@ -0,0 +1,111 @@
+"""
+This module compares a user's daily totals with their carbon and nutrition budgets.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Meal log metric -> budget field of the user profile (firestore `userstable`)
+BUDGET_FIELDS = {
+    "CO2e": "co2_budget",
+    "Calories": "calories_budget",
+    "Carbs": "carbs_budget",
+    "Protein": "protein_budget",
+    "Fat": "fat_budget",
+}
+
+
+@dataclass(frozen=True)
+class BudgetAdherence:
+    """How well the daily totals of one metric kept to its budget.
+
+    Attributes:
+        budget (float): Daily budget.
+        days_under (int): Logged days at or under the budget.
+        days_over (int): Logged days over the budget.
+        current_streak (int): Consecutive days under budget up to the most recent logged day.
+        longest_streak (int): Longest run of consecutive days under budget.
+        average_overshoot (float): Mean amount above budget on the days over it.
+    """
+
+    budget: float
+    days_under: int
+    days_over: int
+    current_streak: int
+    longest_streak: int
+    average_overshoot: float
+
+
+def run_lengths(mask):
+    """Run-length encoding of the True runs of a boolean array.
+
+    Args:
+        mask (np.ndarray): Boolean array.
+
+    Returns:
+        (tuple): lengths, starts and stops (exclusive) of each run of True values.
+    """
+    padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, stops = changes[::2], changes[1::2]
+    return stops - starts, starts, stops
+
+
+def calc_budget_adherence(daily, budgets):
+    """Days under/over budget, streaks and overshoot for every budgeted metric.
+
+    Streaks count consecutive calendar days, so a day without any meal log ends a streak.
+
+    Args:
+        daily (pd.DataFrame): Totals per day, indexed by day (see AnalyticsSummary.daily).
+        budgets (dict): Daily budget of each metric, e.g. {"CO2e": 2.72, "Calories": 2000}.
+
+    Returns:
+        (dict): BudgetAdherence of each metric in `budgets` that is in `daily`.
+    """
+    if len(daily) == 0:
+        return {}
+    calendar = pd.date_range(daily.index.min(), daily.index.max(), freq="D")
+    daily = daily.reindex(calendar)  # days without logs become NaN
+
+    adherence = {}
+    for metric, budget in budgets.items():
+        if metric not in daily or budget is None:
+            continue
+        values = daily[metric].values.astype(float)
+        logged = ~np.isnan(values)
+        under = logged & (values <= budget)
+        over = logged & (values > budget)
+
+        lengths, _, stops = run_lengths(under)
+        current = int(lengths[-1]) if len(lengths) and stops[-1] == len(under) else 0
+        overshoot = values[over] - budget
+        adherence[metric] = BudgetAdherence(
+            budget=float(budget),
+            days_under=int(under.sum()),
+            days_over=int(over.sum()),
+            current_streak=current,
+            longest_streak=int(lengths.max()) if len(lengths) else 0,
+            average_overshoot=float(overshoot.mean()) if len(overshoot) else 0.0,
+        )
+    return adherence
+
+
+def budgets_from_profile(doc_dict):
+    """Daily budgets of each metric from a user profile document.
+
+    Args:
+        doc_dict (dict, None): User profile from firestore `userstable`.
+
+    Returns:
+        (dict): Daily budget of each metric (empty if there is no profile).
+    """
+    if not doc_dict:
+        return {}
+    return {
+        metric: float(doc_dict[field])
+        for metric, field in BUDGET_FIELDS.items()
+        if doc_dict.get(field) is not None
+    }
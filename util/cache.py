@@ -0,0 +1,83 @@
+"""
+Process-level caches shared by all sessions of the app.
+
+Unlike `st.cache`, entries are evicted by their estimated memory footprint
+rather than by count, so a few users with long meal histories cannot push
+the server out of memory.
+"""
+
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+
+def estimate_size(value):
+    """Estimate the memory footprint of a cached value.
+
+    Args:
+        value (object): Value to be cached.
+
+    Returns:
+        (int): Size in bytes of the pickled value (falls back to sys.getsizeof).
+    """
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class MemoryBoundedCache:
+    """Thread-safe LRU cache bounded by the estimated size of its entries."""
+
+    def __init__(self, max_bytes):
+        """
+        Args:
+            max_bytes (int): Evict least recently used entries once the cache grows beyond this size.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def set(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return  # too large to ever fit, don't flush the whole cache for it
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, calling `compute()` and caching its result on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+_MISSING = object()
@@ -0,0 +1,115 @@
+"""
+This module downsamples long time series before they are sent to the browser.
+
+A chart can't show more points than it has pixels, so meal histories are
+reduced to about one point per pixel column while keeping visual peaks.
+
+Reference:
+1) LTTB: Steinarsson, S. (2013). Downsampling Time Series for Visual Representation. University of Iceland.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling of a single series.
+
+    Args:
+        x (np.ndarray): Sorted x values (numeric).
+        y (np.ndarray): y values.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        (np.ndarray): Indices of the points to keep, first and last point included.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 inner buckets
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0  # point selected in the previous bucket
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        # Area of the triangle (previous point, candidate, average of next bucket)
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        indices[i + 1] = a
+    return indices
+
+
+def minmax_indices(values, n_buckets):
+    """Min/max bucketing of one or more series sharing the same x values.
+
+    Args:
+        values (np.ndarray): Array of shape (n,) or (n, n_series).
+        n_buckets (int): Number of buckets, each keeps its minimum and maximum of every series.
+
+    Returns:
+        (np.ndarray): Sorted indices of the points to keep, first and last point included.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n = len(values)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)  # ceil
+    pad = size * n_buckets - n
+    low = np.where(np.isnan(values), np.inf, values)
+    high = np.where(np.isnan(values), -np.inf, values)
+    low = np.pad(low, ((0, pad), (0, 0)), constant_values=np.inf)
+    high = np.pad(high, ((0, pad), (0, 0)), constant_values=-np.inf)
+    low = low.reshape(n_buckets, size, -1)
+    high = high.reshape(n_buckets, size, -1)
+
+    offsets = (np.arange(n_buckets) * size)[:, None]
+    indices = np.concatenate(
+        [
+            (low.argmin(axis=1) + offsets).ravel(),
+            (high.argmax(axis=1) + offsets).ravel(),
+            [0, n - 1],
+        ]
+    )
+    return np.unique(indices[indices < n])
+
+
+def downsample_for_plot(df, x, y, width_px):
+    """Reduce a dataframe to about one point per pixel column of the chart.
+
+    A single series is downsampled with LTTB; several series sharing the x axis
+    with min/max bucketing, so every series keeps its peaks.
+
+    Args:
+        df (pd.DataFrame): Data to plot.
+        x (str): Column name of the x axis.
+        y (str, list): Column name(s) of the y axis.
+        width_px (int): Width of the chart in pixels.
+
+    Returns:
+        (pd.DataFrame): Rows of `df` to plot, sorted by `x`.
+    """
+    if not df[x].is_monotonic_increasing:
+        df = df.sort_values(x)
+    if len(df) <= width_px:
+        return df
+
+    if isinstance(y, str):
+        x_values = df[x].values
+        if np.issubdtype(x_values.dtype, np.datetime64):
+            x_values = x_values.astype("datetime64[ns]").astype(np.int64)
+        indices = lttb_indices(x_values, df[y].values, n_out=width_px)
+    else:
+        indices = minmax_indices(df[y].values, n_buckets=max(width_px // 2, 1))
+    return df.iloc[indices]
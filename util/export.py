@@ -0,0 +1,227 @@
+"""
+This module exports meal logs to CSV or Parquet files.
+
+Meal logs are read in pages (Firestore queries or SQLite cursors), so no
+query returns the whole history at once. The file itself is built in memory,
+because st.download_button holds the whole file anyway, so memory use is
+bounded by config.EXPORT_MAX_ROWS rather than by the paging.
+"""
+
+import csv
+import io
+
+import config
+
+EXPORT_COLUMNS = [
+    "localID",
+    "email",
+    "Datetime",
+    "Epoch",
+    "DayNum",
+    "DishTypes",
+    "DishNames",
+    "Amount",
+    "CO2e",
+    "Calories",
+    "Carbs",
+    "Protein",
+    "Fat",
+]
+
+EXPORT_FORMATS = {"CSV": ("csv", "text/csv"), "Parquet": ("parquet", "application/octet-stream")}
+
+# usersmeallogs columns in the order of EXPORT_COLUMNS (no localID in sqlite)
+SQLITE_EXPORT_COLUMNS = {
+    "email": "username",
+    "Datetime": "datetime",
+    "Epoch": "epoch",
+    "DayNum": "daynum",
+    "DishTypes": "dishtypes",
+    "DishNames": "dishnames",
+    "Amount": "amount",
+    "CO2e": "co2",
+    "Calories": "calories",
+    "Carbs": "carbs",
+    "Protein": "protein",
+    "Fat": "fat",
+}
+
+
+def iter_firestore_meal_log_pages(firebase_db, user_localid, page_size=config.EXPORT_PAGE_SIZE):
+    """Meal logs of one user from firestore, one page at a time.
+
+    Args:
+        firebase_db (firestore.Client): Firestore database.
+        user_localid (str): user localId (created by Firebase create_user).
+        page_size (int, optional): Number of documents per page.
+
+    Yields:
+        (list): Meal log documents as dicts, ordered by Datetime.
+    """
+    query = (
+        firebase_db.collection("usersmeallogs")
+        .document(user_localid)
+        .collection("meallogs")
+        .order_by("Datetime")
+        .limit(page_size)
+    )
+    last_doc = None
+    while True:
+        page_query = query if last_doc is None else query.start_after(last_doc)
+        docs = list(page_query.stream())
+        if not docs:
+            return
+        yield [doc.to_dict() for doc in docs]
+        if len(docs) < page_size:
+            return
+        last_doc = docs[-1]
+
+
+def iter_org_meal_log_pages(firebase_db, page_size=config.EXPORT_PAGE_SIZE):
+    """Meal logs of all users from firestore, one page at a time.
+
+    Args:
+        firebase_db (firestore.Client): Firestore database.
+        page_size (int, optional): Number of documents per page.
+
+    Yields:
+        (list): Meal log documents as dicts.
+    """
+    for doc_ref in firebase_db.collection("usersmeallogs").list_documents():
+        yield from iter_firestore_meal_log_pages(firebase_db, doc_ref.id, page_size)
+
+
+def iter_sqlite_meal_log_pages(conn, username=None, page_size=config.EXPORT_PAGE_SIZE):
+    """Meal logs from the local sqlite3 database, one page at a time.
+
+    Args:
+        conn (sqlite3.Connection): Database connection (e.g. DBTools.conn).
+        username (str, optional): Only export this user. Defaults to all users.
+        page_size (int, optional): Number of rows per page.
+
+    Yields:
+        (list): Meal logs as dicts with EXPORT_COLUMNS keys.
+    """
+    columns = list(SQLITE_EXPORT_COLUMNS)
+    query = f"SELECT {','.join(SQLITE_EXPORT_COLUMNS.values())} FROM usersmeallogs"
+    cursor = conn.cursor()  # own cursor, so paging doesn't clobber DBTools.c
+    try:
+        if username is None:
+            cursor.execute(query + " ORDER BY username,epoch")
+        else:
+            cursor.execute(query + " WHERE username=? ORDER BY epoch", (username,))
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                return
+            yield [dict(zip(columns, row)) for row in rows]
+    finally:
+        cursor.close()
+
+
+def write_csv(pages, fileobj, columns=EXPORT_COLUMNS):
+    """Write pages of meal logs to a CSV file.
+
+    Args:
+        pages (iterable): Pages (lists of dicts) of meal logs.
+        fileobj (file): Text file opened for writing.
+        columns (list, optional): Columns to export. Defaults to EXPORT_COLUMNS.
+
+    Returns:
+        (int): Number of rows written.
+    """
+    writer = csv.DictWriter(fileobj, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    n_rows = 0
+    for page in pages:
+        writer.writerows(page)
+        n_rows += len(page)
+    return n_rows
+
+
+def write_parquet(pages, fileobj, columns=EXPORT_COLUMNS):
+    """Write pages of meal logs to a Parquet file, one row group per page.
+
+    Args:
+        pages (iterable): Pages (lists of dicts) of meal logs.
+        fileobj (file): Binary file opened for writing.
+        columns (list, optional): Columns to export. Defaults to EXPORT_COLUMNS.
+
+    Returns:
+        (int): Number of rows written.
+    """
+    import pyarrow as pa  # installed with streamlit
+    import pyarrow.parquet as pq
+
+    types = {
+        "Epoch": pa.int64(),
+        "DayNum": pa.int64(),
+        "CO2e": pa.float64(),
+        "Calories": pa.float64(),
+        "Carbs": pa.float64(),
+        "Protein": pa.float64(),
+        "Fat": pa.float64(),
+    }
+    schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+    n_rows = 0
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for page in pages:
+            table = pa.Table.from_pydict(
+                {column: [row.get(column) for row in page] for column in columns},
+                schema=schema,
+            )
+            writer.write_table(table)
+            n_rows += len(page)
+    return n_rows
+
+
+def limit_rows(pages, max_rows):
+    """Pass pages of meal logs through, stopping once there are more than max_rows.
+
+    Args:
+        pages (iterable): Pages (lists of dicts) of meal logs.
+        max_rows (int): Maximum number of rows.
+
+    Yields:
+        (list): Pages of meal logs.
+
+    Raises:
+        ValueError: Before reading past the page that goes over max_rows.
+    """
+    n_rows = 0
+    for page in pages:
+        n_rows += len(page)
+        if n_rows > max_rows:
+            raise ValueError(f"Exports are limited to {max_rows:,} meal logs.")
+        yield page
+
+
+def export_meal_logs(
+    pages, file_format="CSV", columns=EXPORT_COLUMNS, max_rows=config.EXPORT_MAX_ROWS
+):
+    """Export pages of meal logs to a file in memory.
+
+    Args:
+        pages (iterable): Pages (lists of dicts) of meal logs.
+        file_format (str, optional): One of EXPORT_FORMATS. Defaults to "CSV".
+        columns (list, optional): Columns to export. Defaults to EXPORT_COLUMNS.
+        max_rows (int, optional): Refuse exports with more rows. Defaults to config.EXPORT_MAX_ROWS.
+
+    Returns:
+        (tuple): Content of the file (bytes), number of rows written.
+
+    Raises:
+        ValueError: If the format is unknown or there are more than max_rows meal logs.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format must be one of {list(EXPORT_FORMATS)}")
+    pages = limit_rows(pages, max_rows)
+    fileobj = io.BytesIO()
+    if file_format == "CSV":
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+        n_rows = write_csv(pages, text, columns)
+        text.flush()
+        text.detach()  # keep fileobj open
+    else:
+        n_rows = write_parquet(pages, fileobj, columns)
+    return fileobj.getvalue(), n_rows
@@ -0,0 +1,132 @@
+"""
+This module forecasts a user's food carbon footprint from their daily totals.
+
+The model is exponential smoothing of a level plus a day-of-week effect
+(additive Holt-Winters without trend, season of 7 days). Its state is a
+handful of floats, so it is refitted incrementally: only the days completed
+since the last update are fed to it. Days without logs are fed as 0.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class CO2Forecast:
+    """Projected food carbon footprint (kgCO2e).
+
+    Attributes:
+        month_end (float): Projected total for the current month.
+        year_end (float): Projected total for the current year.
+    """
+
+    month_end: float
+    year_end: float
+
+
+class CO2Forecaster:
+    """Exponential smoothing with a weekday effect, updated one completed day at a time."""
+
+    def __init__(self, alpha=0.2, gamma=0.1):
+        """
+        Args:
+            alpha (float, optional): Smoothing factor of the level. Defaults to 0.2.
+            gamma (float, optional): Smoothing factor of the weekday effects. Defaults to 0.1.
+        """
+        self.alpha = alpha
+        self.gamma = gamma
+        self.reset()
+
+    def reset(self):
+        self.level = None
+        self.weekday_effect = np.zeros(7)
+        self.last_day = None  # last day fed to the model
+        self.fitted_total = 0.0  # sum of the values fed to the model, to detect edits
+
+    def _step(self, day, value):
+        weekday = day.weekday()
+        if self.level is None:
+            self.level = value
+        else:
+            effect = self.weekday_effect[weekday]
+            self.level = self.alpha * (value - effect) + (1 - self.alpha) * self.level
+        self.weekday_effect[weekday] = (
+            self.gamma * (value - self.level)
+            + (1 - self.gamma) * self.weekday_effect[weekday]
+        )
+        self.last_day = day
+        self.fitted_total += value
+
+    def update(self, daily, today):
+        """Feed the days completed since the last update (refit from scratch if older days changed).
+
+        Days without logs count as 0, from the first logged day to yesterday, so the
+        level is a mean per calendar day rather than per logged day.
+
+        Args:
+            daily (pd.Series): CO2e total per logged day, indexed by day.
+            today (pd.Timestamp): Current day, still incomplete so it isn't fed to the model.
+        """
+        complete = daily[daily.index < today]
+        if complete.empty:
+            self.reset()
+            return
+        calendar = pd.date_range(complete.index.min(), today - timedelta(days=1), freq="D")
+        complete = complete.reindex(calendar, fill_value=0.0)
+        if self.last_day is not None:
+            fitted = complete[complete.index <= self.last_day]
+            if not np.isclose(fitted.sum(), self.fitted_total):
+                self.reset()  # a past meal log was added or deleted
+        if self.last_day is not None:
+            complete = complete[complete.index > self.last_day]
+        for day, value in complete.items():
+            self._step(day, float(value))
+
+    def predict(self, day):
+        """Expected CO2e of a day (0 before any data)."""
+        if self.level is None:
+            return 0.0
+        return max(self.level + self.weekday_effect[day.weekday()], 0.0)
+
+    def predict_days(self, days):
+        """Expected CO2e of each day of a pd.DatetimeIndex."""
+        if self.level is None or len(days) == 0:
+            return np.zeros(len(days))
+        return np.clip(self.level + self.weekday_effect[days.weekday], 0.0, None)
+
+    def forecast(self, daily, today):
+        """Project the month-end and year-end totals.
+
+        Actual totals are used up to today; today counts at least its predicted value,
+        and each remaining day of the month/year adds its predicted value.
+
+        Args:
+            daily (pd.Series): CO2e total per logged day, indexed by day.
+            today (pd.Timestamp): Current day.
+
+        Returns:
+            (CO2Forecast): Projected totals.
+        """
+        today = pd.Timestamp(today).normalize()
+        actual_today = float(daily.get(today, 0.0))
+        expected_today = max(actual_today, self.predict(today))
+
+        month_start = today.replace(day=1)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        year_start = today.replace(month=1, day=1)
+        next_year = year_start.replace(year=today.year + 1)
+
+        def projected(start, end):
+            past = daily[(daily.index >= start) & (daily.index < today)].sum()
+            remaining = pd.date_range(
+                today + timedelta(days=1), end - timedelta(days=1), freq="D"
+            )
+            return float(past + expected_today + self.predict_days(remaining).sum())
+
+        return CO2Forecast(
+            month_end=projected(month_start, next_month),
+            year_end=projected(year_start, next_year),
+        )
@@ -1,23 +1,132 @@
-""" 
+"""
 This module manages lottie animations in the app.
 
-Reference: 
+Lottie files are parsed once per process. At build time they can be minified
+(floats rounded, names and metadata stripped) next to the originals, which
+are then loaded instead:
+
+    python -m util.lottie
+
+Reference:
 1) GitHub: https://github.com/andfanilo/streamlit-lottie
 2) Lottie Files: https://lottiefiles.com/
 
 """
 
+import functools
+import hashlib
 import json
-import requests  # pip install requests
+import os
+import sys
+import time
+from pathlib import Path
+
+import config
+
+# Keys the player doesn't need: layer/shape names, match names and metadata
+UNUSED_KEYS = {"nm", "mn", "meta"}
+
+
+@functools.lru_cache(maxsize=None)
+def http_session():
+    """requests.Session shared by load_lottieurl calls, to reuse connections."""
+    import requests  # pip install requests (imported on first download)
+
+    return requests.Session()
+
+
+def minified_path(filepath):
+    """Path of the build-time minified version of a lottie file."""
+    filepath = Path(filepath)
+    return filepath.with_name(f"{filepath.stem}.min.json")
+
 
+def minify_lottie(data, precision=config.LOTTIE_PRECISION):
+    """Round floats and strip the keys the player doesn't need.
 
+    Args:
+        data (dict, list): Lottie animation (or part of it).
+        precision (int, optional): Decimals kept of floats.
+
+    Returns:
+        (dict, list): Minified copy.
+    """
+    if isinstance(data, dict):
+        return {
+            key: minify_lottie(value, precision)
+            for key, value in data.items()
+            if key not in UNUSED_KEYS
+        }
+    if isinstance(data, list):
+        return [minify_lottie(value, precision) for value in data]
+    if isinstance(data, float):
+        value = round(data, precision)
+        return int(value) if value.is_integer() else value
+    return data
+
+
+@functools.lru_cache(maxsize=None)
 def load_lottiefile(filepath: str):
+    """Lottie animation from a file, parsed once per process (don't modify it).
+
+    The minified version written at build time is loaded when it exists.
+    """
+    if minified_path(filepath).exists():
+        filepath = minified_path(filepath)
     with open(filepath, "r") as f:
         return json.load(f)
 
 
 def load_lottieurl(url: str):
-    r = requests.get(url)
-    if r.status_code != 200:
+    """Lottie animation from a URL, cached on disk for config.LOTTIE_URL_CACHE_TTL_S.
+
+    Returns:
+        (dict, None): Animation, or None if it can't be downloaded (and isn't cached).
+    """
+    cache_file = Path(config.PATH_TO_LOTTIE_CACHE) / (
+        hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json"
+    )
+    if cache_file.exists():
+        age = time.time() - cache_file.stat().st_mtime
+        if age < config.LOTTIE_URL_CACHE_TTL_S:
+            with open(cache_file, "r") as f:
+                return json.load(f)
+
+    import requests
+
+    try:
+        r = http_session().get(url, timeout=config.LOTTIE_URL_TIMEOUT_S)
+        data = r.json() if r.status_code == 200 else None
+    except (requests.RequestException, ValueError):  # e.g. an HTML page of a captive portal
+        data = None
+    if data is None:
+        if cache_file.exists():  # stale, but better than nothing
+            with open(cache_file, "r") as f:
+                return json.load(f)
         return None
-    return r.json()
+
+    # Write then rename, so a reader never sees a partly written file
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_file, cache_file)
+    return data
+
+
+if __name__ == "__main__":
+    filepaths = sys.argv[1:] or [
+        path
+        for path in Path(config.PATH_TO_LOTTIE).glob("*.json")
+        if not path.name.endswith(".min.json")
+    ]
+    for filepath in filepaths:
+        with open(filepath, "r") as f:
+            data = json.load(f)
+        output = minified_path(filepath)
+        with open(output, "w") as f:
+            json.dump(minify_lottie(data), f, separators=(",", ":"))
+        print(
+            f"{filepath}: {Path(filepath).stat().st_size} B -> "
+            f"{output}: {output.stat().st_size} B"
+        )
@@ -0,0 +1,108 @@
+"""
+This module splits saved meal logs back into the dishes they contain.
+
+A meal log stores its dishes as ';'-joined strings (DishTypes, DishNames and
+Amount), while the menu catalog has the carbon and nutrition values per 100g.
+"""
+
+import numpy as np
+import pandas as pd
+import config
+
+# Per-100g catalog columns of the metrics of a meal log
+CATALOG_PER_100G_COLUMNS = {
+    "CO2e": "CarbonLabelMenuItemPer100g",
+    "Calories": "NutritionLabelMenuItemPer100g.Calories",
+    "Carbs": "NutritionLabelMenuItemPer100g.Carbohydrate",
+    "Protein": "NutritionLabelMenuItemPer100g.Protein",
+    "Fat": "NutritionLabelMenuItemPer100g.Fat",
+}
+
+# Canteen station of each dish on the menu
+DISH_STATIONS = {
+    name.lower(): station
+    for station, names in config.MENU_STATIONS.items()
+    for name in names
+}
+
+
+def explode_meal_logs(df_meal_log, df_catalog):
+    """One row per dish of each meal log, with the metrics of the amount eaten.
+
+    The ';'-joined fields are split with vectorised string methods, and dish names
+    are mapped to catalog rows through a categorical code, so there is no Python
+    loop over meal logs or dishes.
+
+    Args:
+        df_meal_log (pd.DataFrame): Meal logs with Datetime, DishNames and Amount columns.
+        df_catalog (pd.DataFrame): Menu catalog with lower case MenuItemName.
+
+    Returns:
+        (pd.DataFrame): Columns Log (row of df_meal_log), Datetime, DishName (categorical
+            over the catalog dishes followed by the dishes missing from it), Station,
+            Grams and the CATALOG_PER_100G_COLUMNS metrics (NaN if not in the catalog).
+    """
+    df_catalog = df_catalog.drop_duplicates("MenuItemName")
+    df_meal_log = df_meal_log.reset_index(drop=True)
+    amounts = df_meal_log["Amount"].astype(str)
+    # Skip malformed logs whose dish names and amounts don't line up
+    aligned = (
+        df_meal_log["DishNames"].str.count(";") == amounts.str.count(";")
+    ).values
+    df_meal_log = df_meal_log[aligned]
+
+    names = df_meal_log["DishNames"].str.split(";").explode()
+    grams = amounts[aligned].str.split(";").explode()
+    categories = pd.Index(df_catalog["MenuItemName"])
+    codes = categories.get_indexer(names.values)  # row of each dish in df_catalog, -1 if unknown
+    if (codes < 0).any():
+        # keep the names of dishes missing from the catalog as extra categories
+        unknown = pd.unique(names.values[(codes < 0) & names.notna().values])
+        categories = categories.append(pd.Index(unknown))
+    dish_names = pd.Categorical(names.values, categories=categories)
+
+    df_dishes = pd.DataFrame(
+        {
+            "Log": names.index,
+            "Datetime": df_meal_log["Datetime"].reindex(names.index).values,
+            "DishName": dish_names,
+            "Grams": pd.to_numeric(grams.values, errors="coerce"),
+        }
+    )
+    stations = pd.Series(df_catalog["MenuItemName"].map(DISH_STATIONS).fillna("Other"))
+    df_dishes["Station"] = np.where(codes >= 0, stations.values[codes], "Other")
+
+    grams_over_100 = df_dishes["Grams"].values / 100
+    for metric, column in CATALOG_PER_100G_COLUMNS.items():
+        # append NaN so that code -1 (unknown dish) looks up NaN
+        per_100g = np.append(df_catalog[column].values.astype(float), np.nan)
+        df_dishes[metric] = per_100g[codes] * grams_over_100
+    return df_dishes
+
+
+def rank_dish_contributions(df_dishes, metric="CO2e", top_n=10):
+    """Dishes ranked by their total contribution to a metric.
+
+    Args:
+        df_dishes (pd.DataFrame): Output of explode_meal_logs (optionally filtered, e.g. to this month).
+        metric (str, optional): Metric to rank by. Defaults to "CO2e".
+        top_n (int, optional): Number of dishes to keep. Defaults to 10.
+
+    Returns:
+        (pd.DataFrame): Indexed by DishName, with the metric total, its share of the
+            overall total, grams and servings, sorted in descending order.
+    """
+    df_dishes = df_dishes[df_dishes[metric].notna()]  # drops dishes missing from the catalog
+    grouped = df_dishes.groupby("DishName", observed=True)
+    df_rank = pd.DataFrame(
+        {
+            metric: grouped[metric].sum(),
+            "Grams": grouped["Grams"].sum(),
+            "Servings": grouped.size(),
+        }
+    )
+    total = df_rank[metric].sum()
+    df_rank["Share"] = df_rank[metric] / total if total else 0.0
+    df_rank = df_rank.sort_values(metric, ascending=False).head(top_n)
+    df_rank.index = df_rank.index.astype(str)
+    return df_rank
@@ -6,128 +6,319 @@ Reference:
 
 """
 
+import functools
+import numbers
 import streamlit as st
 import plotly.express as px  # pip install plotly-express
 import plotly.graph_objects as go  # other graph objects
+import plotly.io as pio
+from util import profiling
+from util.downsample import downsample_for_plot
+import config
+
+
+# ---------------------------------------------------------------------------- #
+# Templates: shared styling, registered once per process
+# ---------------------------------------------------------------------------- #
+def register_template(name, base, **layout):
+    """Register a plotly template extending `base` with layout properties."""
+    template = go.layout.Template(pio.templates[base])
+    template.layout.update(layout)
+    pio.templates[name] = template
+
+
+TEMPLATE = "ourfood"
+register_template(
+    TEMPLATE,
+    "plotly",
+    margin=dict(l=20, r=20, t=20, b=20),
+    paper_bgcolor="rgba(0,0,0,0)",  # transparrent background
+    plot_bgcolor="rgba(0,0,0,0)",  # transparrent background
+    annotationdefaults=dict(
+        xref="paper",
+        yref="paper",
+        font=dict(family="Arial", size=14),
+        showarrow=False,
+    ),
+)
+
+# Line and bar charts over time: light axis line, horizontal grid only
+LINES_TEMPLATE = "ourfood_lines"
+register_template(
+    LINES_TEMPLATE,
+    TEMPLATE,
+    xaxis=dict(
+        showline=True,
+        showgrid=False,
+        showticklabels=True,
+        linecolor="rgb(204, 204, 204)",
+        linewidth=2,
+        ticks="outside",
+        tickfont=dict(
+            family="Arial",
+            size=12,
+            color="rgb(82, 82, 82)",
+        ),
+    ),
+    yaxis=dict(
+        showgrid=True,
+        zeroline=False,
+        showline=False,
+        showticklabels=True,
+    ),
+    legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, title=""),
+)
+
+pio.templates.default = TEMPLATE
+
+# Layout of the small line and bar charts of the Analytics page
+NUTRITION_ANALYTICS_LAYOUT = dict(
+    template=LINES_TEMPLATE,
+    autosize=False,
+    margin=dict(
+        autoexpand=False,
+        l=40,
+        r=20,
+        t=30,
+        b=150,
+    ),
+)
+
+
+# ---------------------------------------------------------------------------- #
+# Memoized figures
+# ---------------------------------------------------------------------------- #
+def _freeze(value, decimals):
+    """Hashable version of a figure input, with floats rounded to `decimals`."""
+    if isinstance(value, numbers.Integral) or isinstance(value, str):
+        return value
+    if isinstance(value, numbers.Real):
+        return round(float(value), decimals)
+    if isinstance(value, (list, tuple)) or hasattr(value, "tolist"):
+        return tuple(_freeze(item, decimals) for item in value)
+    return value
+
+
+def memoize_figure(maxsize=config.FIGURE_CACHE_SIZE, decimals=config.FIGURE_CACHE_DECIMALS):
+    """Cache the figures of a builder, keyed by its inputs rounded to `decimals`.
+
+    Inputs are rounded before the figure is built, so a cached figure is exactly the
+    one that would be built again. Cached figures are shared between reruns and
+    sessions: st.plotly_chart only reads them (Figure.to_dict, no validation as
+    they are already plotly objects), so treat them as read-only.
+    The builder itself stays available as `.uncached`.
 
+    Args:
+        maxsize (int, optional): Number of figures kept per builder.
+        decimals (int, optional): Decimals kept of float inputs.
+    """
 
-def donut_chart_carbon(labels, values):
-    """Donut chart for CO2 emissions of different ingredients.
+    def decorator(build):
+        cached_build = functools.lru_cache(maxsize=maxsize)(build)
+
+        @functools.wraps(build)
+        def wrapper(*args, **kwargs):
+            return cached_build(
+                *(_freeze(arg, decimals) for arg in args),
+                **{key: _freeze(value, decimals) for key, value in kwargs.items()},
+            )
+
+        wrapper.cache_info = cached_build.cache_info
+        wrapper.cache_clear = cached_build.cache_clear
+        wrapper.uncached = build
+        return wrapper
+
+    return decorator
+
+
+# ---------------------------------------------------------------------------- #
+# Figure helpers: each figure is built (and validated by plotly) in one call
+# ---------------------------------------------------------------------------- #
+def donut_figure(
+    labels,
+    values,
+    text,
+    hole=0.75,
+    textinfo="percent",
+    showlegend=False,
+    marker_colors=None,
+    sort=False,
+    **layout,
+):
+    """Donut chart with a text in its hole.
 
     Args:
-        labels (array): Ingrdients
-        values (array): CO2 emissions (kg CO2eq) based on whole recipe amounts.
+        labels (array): Slice labels.
+        values (array): Slice values.
+        text (str): Text inside the donut.
+        hole (float, optional): Fraction of the radius cut out. Defaults to 0.75.
+        textinfo (str, optional): Text on the slices. Defaults to "percent".
+        showlegend (bool, optional): Show the legend. Defaults to False.
+        marker_colors (array, optional): Slice colors.
+        sort (bool, optional): Sort the slices by value. Defaults to False.
+        **layout: other layout properties, like width and height.
 
     Returns:
         fig: plotly object.
     """
-    fig = go.Figure(
-        data=[
-            go.Pie(
-                labels=labels,
-                values=values,
-                direction="clockwise",
-                hole=0.5,
-                marker_colors=px.colors.sequential.RdBu,
-                sort=True,
-            )
-        ]
-    )
-
-    annotations = []
-    annotations.append(
-        dict(
-            xref="paper",
-            yref="paper",
-            x=0.5,
-            y=0.5,
-            xanchor="center",
-            yanchor="middle",
-            text="<b>CO2e OF<br> Ingredients (kg)</b>",
-            font=dict(family="Arial", size=14),
-            showarrow=False,
-        )
-    )
-
-    fig.update_traces(
-        textposition="inside",
-        textinfo="label+percent",
-        showlegend=True,
-    )
-
-    fig.update_layout(
-        annotations=annotations,
-        margin=dict(l=20, r=20, t=20, b=20),
-        paper_bgcolor="rgba(0,0,0,0)",  # transparrent background
-        plot_bgcolor="rgba(0,0,0,0)",  # transparrent background
+    return go.Figure(
+        go.Pie(
+            labels=labels,
+            values=values,
+            direction="clockwise",
+            hole=hole,
+            sort=sort,
+            textposition="inside",
+            textinfo=textinfo,
+            showlegend=showlegend,
+            marker_colors=marker_colors,
+        ),
+        layout=dict(
+            annotations=[
+                dict(x=0.5, y=0.5, xanchor="center", yanchor="middle", text=text)
+            ],
+            **layout,
+        ),
     )
-    return fig
 
 
-def gauge_chart_carbon(value_per_100g, value_per_recipe, nServings):
-    """Gauge chart for carbon label of dish per 100g.
+def gauge_figure(value, axis_max, steps, threshold, title, name, annotation, **layout):
+    """Gauge with traffic light steps.
 
     Args:
-        value_per_100g (float): Total CO2 emissions per 100g of recipe.
-        value_per_recipe (float): Total CO2 emissions for whole recipe.
-        nServings (str): Number of servings.
+        value (float): Gauge value.
+        axis_max (float): Upper end of the gauge.
+        steps (list): (start, end, color) of each step.
+        threshold (float): Value marked by the red threshold line.
+        title (str): Title above the gauge.
+        name (str): Trace name.
+        annotation (dict): Annotation below the gauge (x, y, xanchor, yanchor and text).
+        **layout: other layout properties, like margin.
 
     Returns:
-        fig : plotly object.
+        fig: plotly object.
     """
-    daily_food_CO2_budget = 2.72  # based on LiveLCA threshold
-    fig = go.Figure(
+    return go.Figure(
         go.Indicator(
             domain={"x": [0, 1], "y": [0, 1]},
-            value=value_per_100g,
-            title={
-                "text": f"CO2e total: {value_per_recipe:.0f} kg <br> Servings: {nServings}",
-                "font": {"size": 18},
-            },
-            mode="gauge+number",  # gauge+number+delta
-            # delta = {'reference': 1},
-            name="kg CO2e / 100g",
+            value=value,
+            title={"text": title, "font": {"size": 18}},
+            mode="gauge+number",
+            name=name,
             gauge={
-                "axis": {"range": [None, 3]},
+                "axis": {"range": [None, axis_max]},
                 "steps": [
-                    {"range": [0, 0.4], "color": "lightgreen"},
-                    {"range": [0.4, 1.4], "color": "lightsalmon"},
-                    {"range": [1.4, 3], "color": "crimson"},
-                ],  # Swedish meat GHG emissions traffic light system
+                    {"range": [start, end], "color": color} for start, end, color in steps
+                ],
                 "bar": {"color": "#CCCCCC"},
                 "threshold": {
                     "line": {"color": "red", "width": 4},
                     "thickness": 0.75,
-                    "value": 2.9,
+                    "value": threshold,
                 },
             },
-        )
+        ),
+        layout=dict(annotations=[annotation], **layout),
     )
 
-    annotations = []
-    annotations.append(
-        dict(
-            xref="paper",
-            yref="paper",
+
+def line_figure(df, x, y, title=None, render_mode="svg", **layout):
+    """Line chart like px.line, built with a single validation of its traces and layout.
+
+    Args:
+        df (pd.DataFrame): Data to plot.
+        x (str): Column of the x axis.
+        y (str, list): Column(s) of the y axis, one line each.
+        title (str, optional): Chart title.
+        render_mode (str, optional): "svg" or "webgl". Defaults to "svg".
+        **layout: other layout properties.
+
+    Returns:
+        fig: plotly object.
+    """
+    columns = [y] if isinstance(y, str) else list(y)
+    trace_type = "scattergl" if render_mode == "webgl" else "scatter"
+    data = [
+        {
+            "type": trace_type,
+            "mode": "lines",
+            "name": column,
+            "x": df[x].values,
+            "y": df[column].values,
+            "hovertemplate": f"{x}=%{{x}}<br>{column}=%{{y}}<extra></extra>",
+            "showlegend": len(columns) > 1,
+        }
+        for column in columns
+    ]
+    y_title = y if isinstance(y, str) else "value"
+    layout = {
+        "template": LINES_TEMPLATE,
+        "xaxis": {"title": {"text": x}},
+        "yaxis": {"title": {"text": y_title}},
+        **layout,
+    }
+    if title is not None:
+        layout["title"] = {"text": title}
+    return go.Figure(data=data, layout=layout)
+
+
+@memoize_figure()
+def donut_chart_carbon(labels, values):
+    """Donut chart for CO2 emissions of different ingredients.
+
+    Args:
+        labels (array): Ingrdients
+        values (array): CO2 emissions (kg CO2eq) based on whole recipe amounts.
+
+    Returns:
+        fig: plotly object.
+    """
+    return donut_figure(
+        labels,
+        values,
+        text="<b>CO2e OF<br> Ingredients (kg)</b>",
+        hole=0.5,
+        textinfo="label+percent",
+        showlegend=True,
+        marker_colors=px.colors.sequential.RdBu,
+        sort=True,
+    )
+
+
+@memoize_figure()
+def gauge_chart_carbon(value_per_100g, value_per_recipe, nServings):
+    """Gauge chart for carbon label of dish per 100g.
+
+    Args:
+        value_per_100g (float): Total CO2 emissions per 100g of recipe.
+        value_per_recipe (float): Total CO2 emissions for whole recipe.
+        nServings (str): Number of servings.
+
+    Returns:
+        fig: plotly object.
+    """
+    daily_food_CO2_budget = 2.72  # based on LiveLCA threshold
+    return gauge_figure(
+        value_per_100g,
+        axis_max=3,
+        steps=[
+            (0, 0.4, "lightgreen"),
+            (0.4, 1.4, "lightsalmon"),
+            (1.4, 3, "crimson"),
+        ],  # Swedish meat GHG emissions traffic light system
+        threshold=2.9,
+        title=f"CO2e total: {value_per_recipe:.0f} kg <br> Servings: {nServings}",
+        name="kg CO2e / 100g",
+        annotation=dict(
             x=0.5,
             y=0.0,
             xanchor="center",
             yanchor="bottom",
             text=f"<b>kg CO2e / 100g <br> You can consume {daily_food_CO2_budget/value_per_100g*100:.0f} g of this dish <br> to exhaust your daily food CO2e budget.</b>",
-            font=dict(family="Arial", size=14),
-            showarrow=False,
-        )
-    )
-
-    fig.update_layout(
-        annotations=annotations,
-        margin=dict(l=20, r=20, t=25, b=20),
-        paper_bgcolor="rgba(0,0,0,0)",  # transparrent background
-        plot_bgcolor="rgba(0,0,0,0)",  # transparrent background
+        ),
+        margin=dict(t=25),
     )
 
-    return fig
-
 
 def gauge_chart_carbon_multidish(value_per_custom_amount):
     """Gauge chart for carbon label of dish per serving or custom amount.
@@ -136,61 +327,45 @@ def gauge_chart_carbon_multidish(value_per_custom_amount):
         value_per_serving (float): Total CO2 emissions for whole recipe.
 
     Returns:
-        fig : plotly object.
+        fig: plotly object.
     """
-    max_CO2 = st.session_state["max_CO2"]
-    daily_food_CO2_budget = st.session_state["daily_food_CO2_budget"]
-    fig = go.Figure(
-        go.Indicator(
-            domain={"x": [0, 1], "y": [0, 1]},
-            value=value_per_custom_amount,
-            title={"text": f"CO2e per serving:", "font": {"size": 18}},
-            mode="gauge+number",  # gauge+number+delta
-            # delta = {'reference': 1},
-            name="kg CO2e / serving",
-            gauge={
-                "axis": {"range": [None, max_CO2]},
-                "steps": [
-                    {"range": [0, daily_food_CO2_budget * 0.5], "color": "lightgreen"},
-                    {
-                        "range": [
-                            daily_food_CO2_budget * 0.5,
-                            daily_food_CO2_budget * 0.9,
-                        ],
-                        "color": "lightsalmon",
-                    },
-                    {
-                        "range": [daily_food_CO2_budget * 0.9, max_CO2],
-                        "color": "crimson",
-                    },
-                ],  # Daily food CO2 budget traffic light system
-                "bar": {"color": "#CCCCCC"},
-                "threshold": {
-                    "line": {"color": "red", "width": 4},
-                    "thickness": 0.75,
-                    "value": daily_food_CO2_budget,
-                },
-            },
-        )
+    return gauge_chart_carbon_budget(
+        value_per_custom_amount,
+        max_CO2=st.session_state["max_CO2"],
+        daily_food_CO2_budget=st.session_state["daily_food_CO2_budget"],
     )
 
-    annotations = []
-    annotations.append(
-        dict(
-            xref="paper",
-            yref="paper",
+
+@memoize_figure()
+def gauge_chart_carbon_budget(value_per_custom_amount, max_CO2, daily_food_CO2_budget):
+    """Gauge chart for carbon label of dishes against the user's daily food CO2e budget.
+
+    Args:
+        value_per_custom_amount (float): Total CO2 emissions of the selected amounts.
+        max_CO2 (float): Upper end of the gauge.
+        daily_food_CO2_budget (float): User's daily food CO2e budget.
+
+    Returns:
+        fig: plotly object.
+    """
+    return gauge_figure(
+        value_per_custom_amount,
+        axis_max=max_CO2,
+        steps=[
+            (0, daily_food_CO2_budget * 0.5, "lightgreen"),
+            (daily_food_CO2_budget * 0.5, daily_food_CO2_budget * 0.9, "lightsalmon"),
+            (daily_food_CO2_budget * 0.9, max_CO2, "crimson"),
+        ],  # Daily food CO2 budget traffic light system
+        threshold=daily_food_CO2_budget,
+        title="CO2e per serving:",
+        name="kg CO2e / serving",
+        annotation=dict(
             x=0.5,
             y=-0.1,
             xanchor="center",
             yanchor="bottom",
             text=f"<b>kg CO2e / serving <br> You have {(daily_food_CO2_budget - value_per_custom_amount):.1f} kg of food CO2e budget left today.</b>",
-            font=dict(family="Arial", size=14),
-            showarrow=False,
-        )
-    )
-
-    fig.update_layout(
-        annotations=annotations,
+        ),
         margin=dict(
             autoexpand=False,
             l=40,
@@ -198,15 +373,12 @@ def gauge_chart_carbon_multidish(value_per_custom_amount):
             t=50,
             b=100,
         ),
-        paper_bgcolor="rgba(0,0,0,0)",  # transparrent background
-        plot_bgcolor="rgba(0,0,0,0)",  # transparrent background
     )
 
-    return fig
-
 
+@memoize_figure()
 def donut_chart_nutrition(
-    nutrient_value, rdi_value, nutrient_label, per="100g", **kwargs
+    nutrient_value, rdi_value, nutrient_label, per="100g", marker_colors=None
 ):
     """Donut chart for nutrition of different ingredients.
 
@@ -215,88 +387,93 @@ def donut_chart_nutrition(
         rdi_value (float): RDI value for this nutrient.
         nutrient_label (str): Name of nutrient.
         per (str, optional): Nutrient per some quantity. Defaults to 100g
-        **kwargs: other arguments for the go.Pie function, like marker_colors.
+        marker_colors (array, optional): Colors of the nutrient and of what is left.
 
     Returns:
         fig: plotly object.
     """
-    values = [nutrient_value, rdi_value - nutrient_value]
-    labels = [nutrient_label, nutrient_label + " left"]
-    fig = go.Figure(
-        data=[
-            go.Pie(
-                labels=labels,
-                values=values,
-                direction="clockwise",
-                hole=0.75,
-                sort=False,
-                **kwargs,
-            )
-        ]
+    return donut_figure(
+        labels=[nutrient_label, nutrient_label + " left"],
+        values=[nutrient_value, rdi_value - nutrient_value],
+        # text= f'<b> {nutrient_value:.1f} {unit} <br> {nutrient_label} per 100g </b>', # value and label inside donut
+        text=f"<b> {nutrient_label} <br> per {per} </b>",  # just label inside donut
+        marker_colors=marker_colors,
+        width=200,
+        height=200,
     )
 
-    annotations = []
-    annotations.append(
-        dict(
-            xref="paper",
-            yref="paper",
-            x=0.5,
-            y=0.5,
-            xanchor="center",
-            yanchor="middle",
-            # text= f'<b> {nutrient_value:.1f} {unit} <br> {nutrient_label} per 100g </b>', # value and label inside donut
-            text=f"<b> {nutrient_label} <br> per {per} </b>",  # just label inside donut
-            font=dict(family="Arial", size=14),
-            showarrow=False,
+
+@memoize_figure()
+def donut_chart_nutrition_combined(
+    nutrient_values, rdi_values, nutrient_labels, per="100g", marker_colors=None
+):
+    """Donut charts of several nutrients side by side in a single figure.
+
+    The donuts are domain-typed pies in one row, as make_subplots with "domain"
+    specs would lay them out, so the browser mounts one chart instead of one each.
+
+    Args:
+        nutrient_values (array): Nutrient values in dish per 100g or serving.
+        rdi_values (array): RDI value of each nutrient.
+        nutrient_labels (array): Name of each nutrient.
+        per (str, optional): Nutrient per some quantity. Defaults to 100g
+        marker_colors (array, optional): Color of each nutrient.
+
+    Returns:
+        fig: plotly object.
+    """
+    n = len(nutrient_labels)
+    gap = 0.04  # horizontal space between donuts, as a fraction of the width
+    width = (1 - gap * (n - 1)) / n
+    data, annotations = [], []
+    for i, (value, rdi_value, label) in enumerate(
+        zip(nutrient_values, rdi_values, nutrient_labels)
+    ):
+        fig = donut_chart_nutrition.uncached(
+            value,
+            rdi_value,
+            label,
+            per,
+            None if marker_colors is None else (marker_colors[i], "lightgray"),
         )
-    )
+        x0 = i * (width + gap)
+        pie = fig.data[0]
+        pie.domain = {"x": [x0, x0 + width], "y": [0, 1]}
+        annotation = fig.layout.annotations[0]
+        annotation.x = x0 + width / 2
+        data.append(pie)
+        annotations.append(annotation)
+    return go.Figure(data=data, layout=dict(annotations=annotations, height=200))
 
-    fig.update_traces(
-        textposition="inside",
-        textinfo="percent",
-        showlegend=False,
-    )
 
-    fig.update_layout(
-        annotations=annotations,
-        margin=dict(l=20, r=20, t=20, b=20),
-        width=200,
-        height=200,
-        paper_bgcolor="rgba(0,0,0,0)",  # transparrent background
-        plot_bgcolor="rgba(0,0,0,0)",  # transparrent background
-    )
-    return fig
+def line_render_mode(df):
+    """Use WebGL traces once a history has too many points for SVG to stay responsive.
+
+    Args:
+        df (pd.DataFrame): History before downsampling, whose length tells how dense
+            the chart is (after downsampling it is capped by the chart width).
+    """
+    return "webgl" if len(df) > config.WEBGL_POINTS_THRESHOLD else "svg"
 
 
-def plot_user_CO2e(df):
+def plot_user_CO2e(df, width_px=config.CHART_WIDTH_PX):
     """Plot user CO2e trend.
 
     Args:
         df (pd.DataFrame): User's meal log dataframe.
+        width_px (int, optional): Chart width in pixels, the history is downsampled to fit it.
+
+    Returns:
+        fig: plotly object.
     """
-    fig = px.line(
-        df, x="Datetime", y="CO2e", title="Your Food Carbon Footprint History (kgCO2e)"
-    )
-    fig.update_layout(
-        xaxis=dict(
-            showline=True,
-            showgrid=False,
-            showticklabels=True,
-            linecolor="rgb(204, 204, 204)",
-            linewidth=2,
-            ticks="outside",
-            tickfont=dict(
-                family="Arial",
-                size=12,
-                color="rgb(82, 82, 82)",
-            ),
-        ),
-        yaxis=dict(
-            showgrid=True,
-            zeroline=False,
-            showline=False,
-            showticklabels=True,
-        ),
+    render_mode = line_render_mode(df)
+    df = downsample_for_plot(df, x="Datetime", y="CO2e", width_px=width_px)
+    return line_figure(
+        df,
+        x="Datetime",
+        y="CO2e",
+        title="Your Food Carbon Footprint History (kgCO2e)",
+        render_mode=render_mode,
         autosize=False,
         margin=dict(
             autoexpand=False,
@@ -306,40 +483,53 @@ def plot_user_CO2e(df):
             b=100,
         ),
         showlegend=False,
-        paper_bgcolor="rgba(0,0,0,0)",  # transparrent background
-        plot_bgcolor="rgba(0,0,0,0)",  # transparrent background
     )
-    return fig
 
 
-def plot_user_calories(df):
+def plot_user_calories(df, width_px=config.CHART_WIDTH_PX // 2):
     """Plot user calories trend.
 
     Args:
         df (pd.DataFrame): User's meal log dataframe.
+        width_px (int, optional): Chart width in pixels, the history is downsampled to fit it.
+
+    Returns:
+        fig: plotly object.
     """
-    fig = px.line(
+    render_mode = line_render_mode(df)
+    df = downsample_for_plot(df, x="Datetime", y="Calories", width_px=width_px)
+    return line_figure(
         df,
         x="Datetime",
         y="Calories",
+        render_mode=render_mode,
+        **NUTRITION_ANALYTICS_LAYOUT,
+        showlegend=False,
     )
-    format_plot_layout_nutrition_analytics(fig)
-    return fig
 
 
-def plot_user_macros(df):
+def plot_user_macros(df, width_px=config.CHART_WIDTH_PX // 2):
     """Plot user carbs, fat, protein trend.
 
     Args:
         df (pd.DataFrame): User's meal log dataframe.
+        width_px (int, optional): Chart width in pixels, the history is downsampled to fit it.
+
+    Returns:
+        fig: plotly object.
     """
-    fig = px.line(
+    render_mode = line_render_mode(df)
+    df = downsample_for_plot(
+        df, x="Datetime", y=["Carbs", "Fat", "Protein"], width_px=width_px
+    )
+    return line_figure(
         df,
         x="Datetime",
-        y=["Carbs","Fat","Protein"],
+        y=["Carbs", "Fat", "Protein"],
+        render_mode=render_mode,
+        **NUTRITION_ANALYTICS_LAYOUT,
+        showlegend=True,
     )
-    format_plot_layout_nutrition_analytics(fig, showlegend=True)
-    return fig
 
 def plot_user_carbs(df):
     """Plot user carbs trend.
@@ -385,6 +575,79 @@ def plot_user_protein(df):
     format_plot_layout_nutrition_analytics(fig)
     return fig
 
+def plot_user_period_totals(df_period, y, period):
+    """Bar chart of a metric summed per day, week or month.
+
+    Args:
+        df_period (pd.DataFrame): Totals per period, indexed by the start of each period.
+        y (str): Metric to plot, e.g. "CO2e" or "Calories".
+        period (str): "day", "week" or "month".
+
+    Returns:
+        fig: plotly object.
+    """
+    units = {"CO2e": "kgCO2e", "Calories": "kcal"}
+    fig = px.bar(
+        df_period.reset_index(),
+        x=df_period.index.name or "index",
+        y=y,
+        title=f"Your {y} per {period} ({units.get(y, 'g')})",
+    )
+    fig.update_traces(marker_color="#716657")
+    format_plot_layout_nutrition_analytics(fig)
+    fig.update_layout(margin=dict(autoexpand=False, l=40, r=20, t=50, b=100))
+    return fig
+
+
+def bar_chart_totals(df, y, title):
+    """Bar chart of totals indexed by day, station or dish.
+
+    Args:
+        df (pd.DataFrame): Totals, the index is used as the x axis.
+        y (str, list): Column(s) to plot, stacked if several.
+        title (str): Chart title.
+
+    Returns:
+        fig: plotly object.
+    """
+    x = df.index.name or "index"
+    fig = px.bar(df.reset_index(), x=x, y=y, title=title)
+    format_plot_layout_nutrition_analytics(fig, showlegend=not isinstance(y, str))
+    fig.update_layout(margin=dict(autoexpand=False, l=40, r=20, t=50, b=100))
+    return fig
+
+
+def bar_chart_dish_contributions(df_rank, metric="CO2e", title=None):
+    """Horizontal bar chart of dishes ranked by their contribution to a metric.
+
+    Args:
+        df_rank (pd.DataFrame): Dishes indexed by name, sorted in descending order of `metric`.
+        metric (str, optional): Metric to plot. Defaults to "CO2e".
+        title (str, optional): Chart title.
+
+    Returns:
+        fig: plotly object.
+    """
+    fig = go.Figure(
+        go.Bar(
+            x=df_rank[metric].values[::-1],  # largest contribution at the top
+            y=df_rank.index.values[::-1],
+            orientation="h",
+            marker_color="#716657",
+            text=[f"{value:.2f}" for value in df_rank[metric].values[::-1]],
+            textposition="auto",
+        )
+    )
+    fig.update_layout(
+        title=title,
+        xaxis=dict(showgrid=True, zeroline=False),
+        yaxis=dict(showgrid=False, automargin=True),
+        margin=dict(l=20, r=20, t=50, b=20),
+        height=max(250, 35 * len(df_rank) + 70),
+    )
+    return fig
+
+
 def plot_user_macro_split(df, **kwargs):
     """Donut donut chart for macro split.
 
@@ -418,16 +681,12 @@ def plot_user_macro_split(df, **kwargs):
     annotations = []
     annotations.append(
         dict(
-            xref="paper",
-            yref="paper",
             x=0.5,
             y=0.5,
             xanchor="center",
             yanchor="middle",
             # text= f'<b> {nutrient_value:.1f} {unit} <br> {nutrient_label} per 100g </b>', # value and label inside donut
             text=f"<b> {int(calories_total)} <br> kcal </b>",  # just label inside donut
-            font=dict(family="Arial", size=14),
-            showarrow=False,
         )
     )
 
@@ -439,49 +698,36 @@ def plot_user_macro_split(df, **kwargs):
 
     fig.update_layout(
         annotations=annotations,
-        margin=dict(l=20, r=20, t=35, b=0),
+        margin=dict(t=35, b=0),
         width=300,
         height=300,
-        paper_bgcolor="rgba(0,0,0,0)",  # transparrent background
-        plot_bgcolor="rgba(0,0,0,0)",  # transparrent background
     )
     return fig
 
 def format_plot_layout_nutrition_analytics(fig, showlegend=False):
-    return fig.update_layout(
-        xaxis=dict(
-            showline=True,
-            showgrid=False,
-            showticklabels=True,
-            linecolor="rgb(204, 204, 204)",
-            linewidth=2,
-            ticks="outside",
-            tickfont=dict(
-                family="Arial",
-                size=12,
-                color="rgb(82, 82, 82)",
-            ),
-        ),
-        yaxis=dict(
-            showgrid=True,
-            zeroline=False,
-            showline=False,
-            showticklabels=True,
-        ),
-        autosize=False,
-        margin=dict(
-            autoexpand=False,
-            l=40,
-            r=20,
-            t=30,
-            b=150,
-        ),
-        showlegend=showlegend,
-        legend=dict(yanchor="top",
-                    y=0.99,
-                    xanchor="left",
-                    x=0.01,
-                    title=""),
-        paper_bgcolor="rgba(0,0,0,0)",  # transparrent background
-        plot_bgcolor="rgba(0,0,0,0)",  # transparrent background
-    )
\ No newline at end of file
+    return fig.update_layout(**NUTRITION_ANALYTICS_LAYOUT, showlegend=showlegend)
+
+
+# Time every figure builder when profiling is on (see util.profiling)
+profiling.time_functions(
+    globals(),
+    [
+        "donut_chart_carbon",
+        "gauge_chart_carbon",
+        "gauge_chart_carbon_multidish",
+        "gauge_chart_carbon_budget",
+        "donut_chart_nutrition",
+        "donut_chart_nutrition_combined",
+        "plot_user_CO2e",
+        "plot_user_calories",
+        "plot_user_macros",
+        "plot_user_carbs",
+        "plot_user_fat",
+        "plot_user_protein",
+        "plot_user_period_totals",
+        "bar_chart_totals",
+        "bar_chart_dish_contributions",
+        "plot_user_macro_split",
+    ],
+    prefix="plots",
+)
@@ -0,0 +1,190 @@
+"""
+This module times what a rerun spends its time on (Firestore and SQLite calls,
+catalog load, pandas steps, figure builders).
+
+Profiling is enabled with the PROFILING=1 environment variable (config.PROFILING),
+read at import time. When it is off, `timed` returns the functions unchanged and
+`timer` returns a shared no-op context manager, so instrumented code runs at full
+speed.
+
+When it is on, the timings of a rerun (the thread running the script) are
+aggregated by name, appended as one JSON line to config.PROFILING_LOG and shown
+to the admin in a sidebar panel (see app.py).
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import threading
+import time
+
+import config
+
+ENABLED = config.PROFILING
+
+_local = threading.local()  # timings of the rerun running in this thread
+_log_lock = threading.Lock()
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class _Timer:
+    """Context manager adding its duration to the current rerun."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        records = getattr(_local, "records", None)
+        if records is not None:  # outside a rerun (e.g. warm-up): not recorded
+            records.append((self.name, time.perf_counter() - self.start))
+        return False
+
+
+def timer(name):
+    """Time a block of code: `with timer("firestore.stream"): ...`.
+
+    Args:
+        name (str): Name the duration is aggregated under.
+    """
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def timed(name=None):
+    """Decorator timing every call of a function (no-op when profiling is off).
+
+    Args:
+        name (str, optional): Name the durations are aggregated under.
+            Defaults to the function's qualified name.
+    """
+
+    def decorator(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_class(prefix):
+    """Class decorator timing every method defined in the class body.
+
+    Args:
+        prefix (str): Prefix of the names, e.g. "DBTools".
+    """
+
+    def decorator(cls):
+        if not ENABLED:
+            return cls
+        for attr, value in list(vars(cls).items()):
+            if inspect.isfunction(value) and not attr.startswith("__"):
+                setattr(cls, attr, timed(f"{prefix}.{attr}")(value))
+        return cls
+
+    return decorator
+
+
+def time_functions(namespace, names, prefix):
+    """Replace functions of a module namespace by timed versions.
+
+    Args:
+        namespace (dict): Module globals().
+        names (list): Names of the functions to time.
+        prefix (str): Prefix of the names, e.g. "plots".
+    """
+    if not ENABLED:
+        return
+    for name in names:
+        namespace[name] = timed(f"{prefix}.{name}")(namespace[name])
+
+
+def start_rerun():
+    """Start collecting the timings of a rerun in this thread."""
+    if ENABLED:
+        _local.records = []
+        _local.start = time.perf_counter()
+
+
+def session_state_sizes(session_state):
+    """Estimated memory of each session_state value (pickled size, see cache.estimate_size).
+
+    Args:
+        session_state (Mapping): st.session_state of a session.
+
+    Returns:
+        (dict): Key -> size in bytes.
+    """
+    from util.cache import estimate_size
+
+    return {str(key): estimate_size(value) for key, value in session_state.items()}
+
+
+def end_rerun(session_state=None, **fields):
+    """Stop collecting, aggregate the timings of the rerun and log them as a JSON line.
+
+    Args:
+        session_state (Mapping, optional): st.session_state, whose size per key is
+            logged as "session_bytes".
+        **fields: Extra fields of the JSON line, e.g. user="admin".
+
+    Returns:
+        (dict, None): Timings by name ("calls", "total_ms", "max_ms"), the
+            rerun's "rerun_ms" and "session_bytes", or None if profiling is off.
+    """
+    if not ENABLED or getattr(_local, "records", None) is None:
+        return None
+    records, _local.records = _local.records, None
+    timings = {}
+    for name, seconds in records:
+        timing = timings.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        timing["calls"] += 1
+        timing["total_ms"] += seconds * 1e3
+        timing["max_ms"] = max(timing["max_ms"], seconds * 1e3)
+    summary = {
+        "time": time.time(),
+        "rerun_ms": (time.perf_counter() - _local.start) * 1e3,
+        "timings": timings,
+        "session_bytes": None if session_state is None else session_state_sizes(session_state),
+        **fields,
+    }
+    if config.PROFILING_LOG:
+        line = json.dumps(summary, default=str)
+        with _log_lock, open(config.PROFILING_LOG, "a") as f:
+            f.write(line + "\n")
+    return summary
+
+
+def show_panel(summary):
+    """Sidebar panel with the timings of the last rerun (admin only, see app.py).
+
+    Args:
+        summary (dict): Output of end_rerun.
+    """
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander(f"Profiling: last rerun {summary['rerun_ms']:.0f} ms"):
+        df_timings = pd.DataFrame.from_dict(summary["timings"], orient="index")
+        if df_timings.empty:
+            st.write("Nothing timed.")
+        else:
+            st.dataframe(df_timings.sort_values("total_ms", ascending=False).round(2))
+        if summary.get("session_bytes"):
+            sizes = pd.Series(summary["session_bytes"], name="bytes").sort_values(ascending=False)
+            st.write(f"Session state: {sizes.sum() / 1024:.1f} KiB")
+            st.dataframe(sizes)
@@ -0,0 +1,152 @@
+"""
+This module loads the recommended daily intake (RDI) of each nutrient.
+
+The RDI file (data/nutrition_rdi.csv) is a single row with raw column names,
+e.g. "Carbohydrt_(g)" or "Copper_mg)". It is parsed once per process into an
+immutable NutritionRDI record with clean names (nutrient and unit).
+"""
+
+import csv
+import functools
+from typing import NamedTuple, Optional
+
+import numpy as np
+import config
+
+
+class NutritionRDI(NamedTuple):
+    """Recommended daily intake of each nutrient (None if the source gives none)."""
+
+    water_g: Optional[float]
+    energy_kcal: Optional[float]
+    protein_g: Optional[float]
+    fat_g: Optional[float]
+    ash_g: Optional[float]
+    carbs_g: Optional[float]
+    fiber_g: Optional[float]
+    sugar_g: Optional[float]
+    calcium_mg: Optional[float]
+    iron_mg: Optional[float]
+    magnesium_mg: Optional[float]
+    phosphorus_mg: Optional[float]
+    potassium_mg: Optional[float]
+    sodium_mg: Optional[float]
+    zinc_mg: Optional[float]
+    copper_mg: Optional[float]
+    manganese_mg: Optional[float]
+    selenium_ug: Optional[float]
+    vit_c_mg: Optional[float]
+    thiamin_mg: Optional[float]
+    riboflavin_mg: Optional[float]
+    niacin_mg: Optional[float]
+    pantothenic_acid_mg: Optional[float]
+    vit_b6_mg: Optional[float]
+    folate_total_ug: Optional[float]
+    folic_acid_ug: Optional[float]
+    food_folate_ug: Optional[float]
+    folate_dfe_ug: Optional[float]
+    choline_mg: Optional[float]
+    vit_b12_ug: Optional[float]
+    vit_a_iu: Optional[float]
+    vit_a_rae_ug: Optional[float]
+    retinol_ug: Optional[float]
+    alpha_carotene_ug: Optional[float]
+    beta_carotene_ug: Optional[float]
+    beta_cryptoxanthin_ug: Optional[float]
+    lycopene_ug: Optional[float]
+    lutein_zeaxanthin_ug: Optional[float]
+    vit_e_mg: Optional[float]
+    vit_d_ug: Optional[float]
+    vit_d_iu: Optional[float]
+    vit_k_ug: Optional[float]
+    fat_saturated_g: Optional[float]
+    fat_monounsaturated_g: Optional[float]
+    fat_polyunsaturated_g: Optional[float]
+    cholesterol_mg: Optional[float]
+    source: str
+
+    def vector(self):
+        """RDI of the nutrients of a meal, in NUTRITION_ORDER (calories, carbs, fat, protein)."""
+        return np.array([getattr(self, field) for field in NUTRITION_ORDER], dtype=float)
+
+
+# Order of the nutrition values of a dish or meal (see get_nutrition_label_for_dish_per_100g)
+NUTRITION_ORDER = ("energy_kcal", "carbs_g", "fat_g", "protein_g")
+
+# Raw column name of each NutritionRDI field in the RDI file
+RAW_COLUMNS = dict(
+    zip(
+        NutritionRDI._fields,
+        [
+            "Water_(g)",
+            "Energ_Kcal",
+            "Protein_(g)",
+            "Lipid_Tot_(g)",
+            "Ash_(g)",
+            "Carbohydrt_(g)",
+            "Fiber_TD_(g)",
+            "Sugar_Tot_(g)",
+            "Calcium_(mg)",
+            "Iron_(mg)",
+            "Magnesium_(mg)",
+            "Phosphorus_(mg)",
+            "Potassium_(mg)",
+            "Sodium_(mg)",
+            "Zinc_(mg)",
+            "Copper_mg)",
+            "Manganese_(mg)",
+            "Selenium_(µg)",
+            "Vit_C_(mg)",
+            "Thiamin_(mg)",
+            "Riboflavin_(mg)",
+            "Niacin_(mg)",
+            "Panto_Acid_mg)",
+            "Vit_B6_(mg)",
+            "Folate_Tot_(µg)",
+            "Folic_Acid_(µg)",
+            "Food_Folate_(µg)",
+            "Folate_DFE_(µg)",
+            "Choline_Tot_ (mg)",
+            "Vit_B12_(µg)",
+            "Vit_A_IU",
+            "Vit_A_RAE",
+            "Retinol_(µg)",
+            "Alpha_Carot_(µg)",
+            "Beta_Carot_(µg)",
+            "Beta_Crypt_(µg)",
+            "Lycopene_(µg)",
+            "Lut+Zea_ (µg)",
+            "Vit_E_(mg)",
+            "Vit_D_µg",
+            "Vit_D_IU",
+            "Vit_K_(µg)",
+            "FA_Sat_(g)",
+            "FA_Mono_(g)",
+            "FA_Poly_(g)",
+            "Cholestrl_(mg)",
+            "Source",
+        ],
+    )
+)
+
+
+@functools.lru_cache(maxsize=None)
+def load_rdi(path_to_csv=config.PATH_TO_NUTRITION_RDI):
+    """Parse the RDI file, once per process.
+
+    Args:
+        path_to_csv (str, Path, optional): RDI file. Defaults to config.PATH_TO_NUTRITION_RDI.
+
+    Returns:
+        (NutritionRDI): RDI of each nutrient.
+    """
+    with open(path_to_csv, newline="", encoding="utf-8-sig") as f:
+        row = next(csv.DictReader(f))
+    values = {}
+    for field, column in RAW_COLUMNS.items():
+        value = row[column].strip()
+        if field == "source":
+            values[field] = value
+        else:
+            values[field] = float(value) if value else None
+    return NutritionRDI(**values)
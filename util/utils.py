@@ -6,14 +6,21 @@ import json  # json file
 import streamlit as st  # pip install streamlit
 import sqlite3  # Database management
 import hashlib  # Security (other libraries include: passlib,hashlib,bcrypt,scrypt)
+import calendar  # epoch timestamps
+import functools
+import time
 import config  # paths to files
-import pyrebase  # Python wrapper for Firebase
-from google.cloud import firestore  # Python wrapper for Firebase
-from google.oauth2 import service_account  # Python wrapper for Google auth
+from util import profiling  # timings per rerun (no-op unless PROFILING=1)
 
+# pyrebase, google.cloud.firestore and google.oauth2 are imported on first use
+# (in Firebase), so anonymous visitors of the Home page don't pay for them.
 
+
+@profiling.timed_class("Firebase")
 class Firebase:
     def __init__(self):
+        import pyrebase  # Python wrapper for Firebase
+
         cred = json.loads(
             st.secrets["appConfigKey"]
         )  # use streamlit secrets to hide sensitive information
@@ -38,16 +45,8 @@ class Firebase:
         return user
 
     def db(self):
-        """Connect to firestore database."""
-        service_account_dict = json.loads(st.secrets["serviceAccountKey"])
-        creds = service_account.Credentials.from_service_account_info(
-            service_account_dict
-        )
-        # db = firestore.Client.from_service_account_json(config.PATH_TO_FIREBASE_CONFIG+'firebase_service_account.json')
-        db = firestore.Client(
-            credentials=creds, project=config.FIREBASE_APP_NAME
-        )  # use streamlit secrets to hide sensitive information
-        return db
+        """Connect to firestore database (one thread-safe client per process)."""
+        return get_firestore_client()
 
     def check_user(self, user_localid):
         """Check that the user with `user_localid` exists in firestore db.
@@ -85,11 +84,39 @@ class Firebase:
         return success, message
 
 
+@profiling.timed("utils.get_firestore_client")
+@functools.lru_cache(maxsize=None)
+def get_firestore_client():
+    """Firestore client, created once per process and shared by all sessions."""
+    from google.cloud import firestore  # Python wrapper for Firebase
+    from google.oauth2 import service_account  # Python wrapper for Google auth
+
+    service_account_dict = json.loads(st.secrets["serviceAccountKey"])
+    creds = service_account.Credentials.from_service_account_info(
+        service_account_dict
+    )
+    # db = firestore.Client.from_service_account_json(config.PATH_TO_FIREBASE_CONFIG+'firebase_service_account.json')
+    db = firestore.Client(
+        credentials=creds, project=config.FIREBASE_APP_NAME
+    )  # use streamlit secrets to hide sensitive information
+    return db
+
+
 # ---- READ JSON data ----
 @st.cache(allow_output_mutation=True)
 def get_data_from_json(path_to_json):
     data = load_json(path_to_json)
-    df = pd.json_normalize(data)
+    with profiling.timer("pandas.json_normalize"):
+        df = pd.json_normalize(data)
+    return df
+
+
+@profiling.timed("utils.get_menu_catalog")
+@st.cache(allow_output_mutation=True)
+def get_menu_catalog():
+    """Dishes of the menu, with lower case MenuItemName (as shown in the app and saved in meal logs)."""
+    df = get_data_from_json(config.PATH_TO_MENU).copy()
+    df["MenuItemName"] = df["MenuItemName"].str.lower()
     return df
 
 
@@ -99,6 +126,21 @@ def load_json(path_to_file):
     return data
 
 
+def datetime_to_epoch(datetime_str):
+    """Convert a meal log datetime string to integer epoch and day numbers.
+
+    The wall-clock time is counted as if it were UTC, so `daynum` changes at local midnight.
+
+    Args:
+        datetime_str (str): Datetime string in format YYYY-MM-DD HH:MM:SS.
+
+    Returns:
+        (tuple): seconds since 1970-01-01 00:00:00, days since 1970-01-01.
+    """
+    epoch = calendar.timegm(time.strptime(datetime_str, "%Y-%m-%d %H:%M:%S"))
+    return epoch, epoch // 86400
+
+
 def read_html(path_to_html):
     f = open(path_to_html, "r")
     contents = f.read()
@@ -126,6 +168,7 @@ class Security:
         return False
 
 
+@profiling.timed_class("DBTools")
 class DBTools:
     """Database functions to create, add, login, and view users."""
 
@@ -160,8 +203,98 @@ class DBTools:
         Table of meal logs for each user.
         """
         DBTools.c.execute(
-            "CREATE TABLE IF NOT EXISTS usersmeallogs(username TEXT,datetime TEXT,dishtypes TEXT,dishnames TEXT,amount TEXT,co2 REAL,calories REAL,carbs REAL,protein REAL,fat REAL)"
+            "CREATE TABLE IF NOT EXISTS usersmeallogs(username TEXT,datetime TEXT,dishtypes TEXT,dishnames TEXT,amount TEXT,co2 REAL,calories REAL,carbs REAL,protein REAL,fat REAL,epoch INTEGER,daynum INTEGER)"
+        )
+        # Migrate tables created before the integer epoch/daynum columns existed
+        DBTools.c.execute("PRAGMA table_info(usersmeallogs)")
+        columns = [row[1] for row in DBTools.c.fetchall()]
+        if "epoch" not in columns:
+            DBTools.c.execute("ALTER TABLE usersmeallogs ADD COLUMN epoch INTEGER")
+            DBTools.c.execute("ALTER TABLE usersmeallogs ADD COLUMN daynum INTEGER")
+            DBTools.c.execute(
+                "UPDATE usersmeallogs SET epoch=CAST(strftime('%s',datetime) AS INTEGER),daynum=CAST(strftime('%s',datetime) AS INTEGER)/86400"
+            )
+        # Covering index: range scans over a user's logs never touch the table rows
+        DBTools.c.execute(
+            "CREATE INDEX IF NOT EXISTS usersmeallogs_username_epoch ON usersmeallogs(username,epoch,daynum,co2,calories,carbs,protein,fat)"
+        )
+        DBTools.conn.commit()
+
+    def create_usersdailysummary():
+        """
+        Table of daily carbon and nutrition totals for each user.
+
+        The table is kept up to date by triggers on `usersmeallogs`, so the
+        analytics queries only touch one row per day instead of one row per meal.
+        """
+        DBTools.c.execute(
+            "CREATE TABLE IF NOT EXISTS usersdailysummary(username TEXT,day TEXT,nmeals INTEGER,co2 REAL,calories REAL,carbs REAL,protein REAL,fat REAL,PRIMARY KEY (username,day))"
+        )
+        DBTools.c.execute(
+            """CREATE TRIGGER IF NOT EXISTS usersmeallogs_summary_insert
+            AFTER INSERT ON usersmeallogs
+            BEGIN
+                INSERT INTO usersdailysummary(username,day,nmeals,co2,calories,carbs,protein,fat)
+                VALUES (NEW.username,date(NEW.datetime),1,NEW.co2,NEW.calories,NEW.carbs,NEW.protein,NEW.fat)
+                ON CONFLICT(username,day) DO UPDATE SET
+                    nmeals=nmeals+1,
+                    co2=co2+excluded.co2,
+                    calories=calories+excluded.calories,
+                    carbs=carbs+excluded.carbs,
+                    protein=protein+excluded.protein,
+                    fat=fat+excluded.fat;
+            END"""
+        )
+        DBTools.c.execute(
+            """CREATE TRIGGER IF NOT EXISTS usersmeallogs_summary_delete
+            AFTER DELETE ON usersmeallogs
+            BEGIN
+                UPDATE usersdailysummary SET
+                    nmeals=nmeals-1,
+                    co2=co2-OLD.co2,
+                    calories=calories-OLD.calories,
+                    carbs=carbs-OLD.carbs,
+                    protein=protein-OLD.protein,
+                    fat=fat-OLD.fat
+                WHERE username=OLD.username AND day=date(OLD.datetime);
+                DELETE FROM usersdailysummary
+                WHERE username=OLD.username AND day=date(OLD.datetime) AND nmeals<=0;
+            END"""
+        )
+        DBTools.c.execute(
+            """CREATE TRIGGER IF NOT EXISTS usersmeallogs_summary_update
+            AFTER UPDATE ON usersmeallogs
+            BEGIN
+                UPDATE usersdailysummary SET
+                    nmeals=nmeals-1,
+                    co2=co2-OLD.co2,
+                    calories=calories-OLD.calories,
+                    carbs=carbs-OLD.carbs,
+                    protein=protein-OLD.protein,
+                    fat=fat-OLD.fat
+                WHERE username=OLD.username AND day=date(OLD.datetime);
+                DELETE FROM usersdailysummary
+                WHERE username=OLD.username AND day=date(OLD.datetime) AND nmeals<=0;
+                INSERT INTO usersdailysummary(username,day,nmeals,co2,calories,carbs,protein,fat)
+                VALUES (NEW.username,date(NEW.datetime),1,NEW.co2,NEW.calories,NEW.carbs,NEW.protein,NEW.fat)
+                ON CONFLICT(username,day) DO UPDATE SET
+                    nmeals=nmeals+1,
+                    co2=co2+excluded.co2,
+                    calories=calories+excluded.calories,
+                    carbs=carbs+excluded.carbs,
+                    protein=protein+excluded.protein,
+                    fat=fat+excluded.fat;
+            END"""
         )
+        # Backfill the summary from meal logs written before the triggers existed
+        DBTools.c.execute("SELECT COUNT(*) FROM usersdailysummary")
+        if DBTools.c.fetchone()[0] == 0:
+            DBTools.c.execute(
+                """INSERT INTO usersdailysummary(username,day,nmeals,co2,calories,carbs,protein,fat)
+                SELECT username,date(datetime),COUNT(*),TOTAL(co2),TOTAL(calories),TOTAL(carbs),TOTAL(protein),TOTAL(fat)
+                FROM usersmeallogs GROUP BY username,date(datetime)"""
+            )
+        DBTools.conn.commit()
 
     def add_userdata(username, password):
         DBTools.c.execute(
@@ -196,8 +329,9 @@ class DBTools:
         protein,
         fat,
     ):
+        epoch, daynum = datetime_to_epoch(datetime)
         DBTools.c.execute(
-            "INSERT INTO usersmeallogs(username,datetime,dishtypes,dishnames,amount,co2,calories,carbs,protein,fat) VALUES (?,?,?,?,?,?,?,?,?,?)",
+            "INSERT INTO usersmeallogs(username,datetime,dishtypes,dishnames,amount,co2,calories,carbs,protein,fat,epoch,daynum) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
             (
                 username,
                 datetime,
@@ -209,6 +343,8 @@ class DBTools:
                 carbs,
                 protein,
                 fat,
+                epoch,
+                daynum,
             ),
         )
         DBTools.conn.commit()
@@ -242,6 +378,55 @@ class DBTools:
         data = DBTools.c.fetchall()
         return data
 
+    def view_usermeallog_range(username, start_epoch=0, end_epoch=2**62):
+        """Return the (epoch, daynum, co2, calories, carbs, protein, fat) rows of a user
+        with start_epoch <= epoch < end_epoch, ordered by time.
+
+        Only columns of the covering index are selected, so this is an index-only range scan.
+        """
+        DBTools.c.execute(
+            "SELECT epoch,daynum,co2,calories,carbs,protein,fat FROM usersmeallogs WHERE username=? AND epoch>=? AND epoch<? ORDER BY epoch",
+            (username, start_epoch, end_epoch),
+        )
+        data = DBTools.c.fetchall()
+        return data
+
+    def view_userdailysummary(username):
+        """Return the per-day totals (day, nmeals, co2, calories, carbs, protein, fat) of a user."""
+        DBTools.c.execute(
+            "SELECT day,nmeals,co2,calories,carbs,protein,fat FROM usersdailysummary WHERE username=? ORDER BY day",
+            (username,),
+        )
+        data = DBTools.c.fetchall()
+        return data
+
+    def view_usersummary_today(username):
+        """Return today's totals (nmeals, co2, calories, carbs, protein, fat) of a user."""
+        DBTools.c.execute(
+            "SELECT TOTAL(nmeals),TOTAL(co2),TOTAL(calories),TOTAL(carbs),TOTAL(protein),TOTAL(fat) FROM usersdailysummary WHERE username=? AND day=date('now','localtime')",
+            (username,),
+        )
+        data = DBTools.c.fetchone()
+        return data
+
+    def view_usersummary_this_month(username):
+        """Return this month's totals (nmeals, co2, calories, carbs, protein, fat) of a user."""
+        DBTools.c.execute(
+            "SELECT TOTAL(nmeals),TOTAL(co2),TOTAL(calories),TOTAL(carbs),TOTAL(protein),TOTAL(fat) FROM usersdailysummary WHERE username=? AND day>=date('now','localtime','start of month')",
+            (username,),
+        )
+        data = DBTools.c.fetchone()
+        return data
+
+    def view_usersummary_total(username):
+        """Return the all-time totals (ndays, nmeals, co2, calories, carbs, protein, fat) of a user."""
+        DBTools.c.execute(
+            "SELECT COUNT(*),TOTAL(nmeals),TOTAL(co2),TOTAL(calories),TOTAL(carbs),TOTAL(protein),TOTAL(fat) FROM usersdailysummary WHERE username=?",
+            (username,),
+        )
+        data = DBTools.c.fetchone()
+        return data
+
     def view_all_users():
         DBTools.c.execute("SELECT * FROM userstable")
         data = DBTools.c.fetchall()
@@ -0,0 +1,125 @@
+"""
+This module warms up the server process before it accepts its first session.
+
+warmup() fills the process-level caches (menu catalog, RDI, static assets,
+lottie animation, background CSS, Firestore client) and imports the page
+modules, then marks the process as ready: READY is set and config.READY_FILE
+is written, so a health check or load balancer only routes traffic once the
+first user won't pay for any of it. serve.py runs it before starting streamlit.
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+READY = threading.Event()
+
+# Page modules imported on first use by the app (see apps.main and apps.login)
+PAGE_MODULES = [
+    "apps.home",
+    "apps.login",
+    "apps.signup",
+    "apps.design_your_meal",
+    "apps.analytics",
+    "apps.profile",
+    "apps.org_dashboard",
+]
+
+
+def warm_catalog():
+    from util import utils
+
+    utils.get_menu_catalog()
+
+
+def warm_rdi():
+    from util import rdi
+
+    rdi.load_rdi()
+
+
+def warm_assets():
+    from util import assets  # loads every asset on import
+
+    assets.ASSETS.text("style.css")
+
+
+def warm_lottie():
+    from util import lottie
+
+    lottie.load_lottiefile(f"{config.PATH_TO_LOTTIE}/walking-avocado.json")
+
+
+def warm_background():
+    from util import bg_image
+
+    image_file = str(config.PATH_TO_BACKGROUND)
+    bg_image.background_css(image_file, bg_image.background_url(image_file))
+
+
+def warm_pages():
+    for module in PAGE_MODULES:
+        importlib.import_module(module)
+
+
+def warm_firestore():
+    from util import utils
+
+    utils.get_firestore_client()
+
+
+# Warm-up steps, in order: name -> function
+STEPS = {
+    "catalog": warm_catalog,
+    "rdi": warm_rdi,
+    "assets": warm_assets,
+    "lottie": warm_lottie,
+    "background": warm_background,
+    "pages": warm_pages,
+    "firestore": warm_firestore,
+}
+
+
+def is_ready():
+    """Whether warm-up is done in this process."""
+    return READY.is_set()
+
+
+def warmup(steps=None):
+    """Run the warm-up steps and mark the process as ready.
+
+    A failing step is logged and skipped: its cache is then filled by the first
+    session that needs it, as without warm-up.
+
+    Args:
+        steps (list, optional): Names of the STEPS to run. Defaults to all of them.
+
+    Returns:
+        (dict): Duration in seconds of each step, None for the steps that failed.
+    """
+    if os.path.exists(config.READY_FILE):
+        os.remove(config.READY_FILE)  # left over from a previous process
+    READY.clear()
+
+    durations = {}
+    for name in steps or STEPS:
+        start = time.perf_counter()
+        try:
+            STEPS[name]()
+        except Exception:
+            logger.exception("Warm-up step %r failed", name)
+            durations[name] = None
+            continue
+        durations[name] = time.perf_counter() - start
+        logger.info("Warm-up step %r took %.3f s", name, durations[name])
+
+    READY.set()
+    with open(config.READY_FILE, "w") as f:
+        f.write(str(os.getpid()))
+    return durations